@@ -6,41 +6,176 @@ This module provides alternative data sources for Bitcoin price data.
 """
 
 import os
-import time
 import json
+import time
 import datetime
+import threading
 import pandas as pd
 import numpy as np
-import requests
 import logging
 import csv
 from io import StringIO
+from http_client import get_client
+from logging_setup import setup_logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("alt_data_source.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger("AlternativeDataSource")
 
+class CoinIdIndex:
+    """
+    Persistent CoinGecko symbol to coin ID index, refreshed in the background when stale.
+    
+    The index is a JSON file loaded into a dict at startup, so lookups are O(1) and the
+    multi-MB /coins/list download happens at most once per TTL instead of per lookup.
+    """
+    
+    def __init__(self, path, fetch_coins, ttl=86400, miss_refresh_interval=3600):
+        """
+        Load the index from disk and schedule a refresh if it is missing or stale.
+        
+        Args:
+            path (str): Index file
+            fetch_coins (callable): Returns the /coins/list entries ({'id', 'symbol', ...} dicts)
+            ttl (float): Seconds before the index is refreshed (default: 86400)
+            miss_refresh_interval (float): Minimum seconds between refreshes triggered by an
+                unknown symbol (default: 3600)
+        """
+        self.path = path
+        self.fetch_coins = fetch_coins
+        self.ttl = ttl
+        self.miss_refresh_interval = miss_refresh_interval
+        self.ids = {}
+        self.fetched_at = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+        
+        self.load()
+        if self.fetched_at is not None and self.stale():
+            self.refresh_in_background()
+    
+    def load(self):
+        """
+        Load the index file, if present.
+        
+        Returns:
+            bool: True if an index was loaded
+        """
+        try:
+            with open(self.path) as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable coin ID index {self.path}: {e}")
+            return False
+        
+        self.ids = index['ids']
+        self.fetched_at = index['fetched_at']
+        logger.info(f"Loaded {len(self.ids)} CoinGecko coin IDs from {self.path}")
+        return True
+    
+    def stale(self, max_age=None):
+        """
+        Check whether the index is missing or older than max_age.
+        
+        Args:
+            max_age (float, optional): Maximum age in seconds (default: ttl)
+            
+        Returns:
+            bool: True if the index should be refreshed
+        """
+        max_age = self.ttl if max_age is None else max_age
+        return self.fetched_at is None or time.time() - self.fetched_at >= max_age
+    
+    def refresh(self):
+        """
+        Download the coin list, rebuild the index and write it to disk atomically.
+        
+        Returns:
+            int: Number of symbols in the index
+        """
+        ids = {}
+        for coin in self.fetch_coins():
+            # The first coin listed for a symbol wins, as in the original linear scan
+            ids.setdefault(coin['symbol'].lower(), coin['id'])
+        fetched_at = time.time()
+        
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{self.path}.tmp"
+        try:
+            with open(temporary, 'w') as f:
+                json.dump({'fetched_at': fetched_at, 'ids': ids}, f)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            logger.error(f"Error writing coin ID index {self.path}: {e}")
+        
+        # Swapping the dict is atomic, so lookups never see a partial index
+        self.ids, self.fetched_at = ids, fetched_at
+        logger.info(f"Refreshed CoinGecko coin ID index: {len(ids)} symbols")
+        return len(ids)
+    
+    def refresh_in_background(self):
+        """
+        Refresh the index on a daemon thread unless a refresh is already running.
+        """
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        
+        def run():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Background refresh of the coin ID index failed: {e}")
+            finally:
+                self._refreshing = False
+        
+        threading.Thread(target=run, name='coin-id-refresh', daemon=True).start()
+    
+    def lookup(self, symbol):
+        """
+        Get the coin ID of a symbol.
+        
+        Without an index the coin list is downloaded first. An unknown symbol triggers a
+        refresh at most once per miss_refresh_interval, in case the coin was listed since.
+        
+        Args:
+            symbol (str): Coin symbol, any case
+            
+        Returns:
+            str: Coin ID, or None if the symbol is unknown
+        """
+        symbol = symbol.lower()
+        coin_id = self.ids.get(symbol)
+        if coin_id is None and self.stale(self.miss_refresh_interval):
+            with self._lock:
+                # Another caller may have refreshed while this one waited
+                if self.stale(self.miss_refresh_interval):
+                    self.refresh()
+            coin_id = self.ids.get(symbol)
+        elif self.stale():
+            self.refresh_in_background()
+        return coin_id
+
 class CryptoCompareDataSource:
     """
     Class to collect Bitcoin price data from CryptoCompare API.
     """
     
-    def __init__(self, data_dir='data'):
+    def __init__(self, data_dir='data', base_url=None, client=None):
         """
         Initialize the data source.
         
         Args:
             data_dir (str): Directory to store data (default: 'data')
+            base_url (str, optional): API root, e.g. a local stub server (default: https://min-api.cryptocompare.com/data)
+            client (HttpClient, optional): HTTP client (default: the shared client)
         """
         self.data_dir = data_dir
-        self.base_url = "https://min-api.cryptocompare.com/data"
+        self.base_url = base_url or "https://min-api.cryptocompare.com/data"
+        self.client = client or get_client()
         
         # Create data directory if it doesn't exist
         if not os.path.exists(data_dir):
@@ -48,7 +183,7 @@ class CryptoCompareDataSource:
             
         logger.info("CryptoCompare data source initialized")
     
-    def fetch_historical_minute_data(self, symbol='BTC', to_symbol='USDT', limit=2000, to_ts=None):
+    def fetch_historical_minute_data(self, symbol='BTC', to_symbol='USDT', limit=2000, to_ts=None, exchange=None):
         """
         Fetch historical minute OHLCV data.
         
@@ -57,6 +192,8 @@ class CryptoCompareDataSource:
             to_symbol (str): Quote currency (default: 'USDT')
             limit (int): Number of data points to fetch (max 2000)
             to_ts (int, optional): End timestamp in seconds
+            exchange (str, optional): Single exchange such as 'Binance' (default: the CCCAGG aggregate,
+                whose volume covers all exchanges)
             
         Returns:
             pandas.DataFrame: DataFrame with OHLCV data
@@ -72,11 +209,12 @@ class CryptoCompareDataSource:
         
         if to_ts:
             params['toTs'] = to_ts
+        if exchange:
+            params['e'] = exchange
         
         try:
             logger.info(f"Fetching historical minute data for {symbol}/{to_symbol}")
-            response = requests.get(endpoint, params=params)
-            data = response.json()
+            data = self.client.get_json(endpoint, params=params)
             
             if data.get('Response') == 'Error':
                 logger.error(f"API error: {data.get('Message')}")
@@ -106,6 +244,30 @@ class CryptoCompareDataSource:
             logger.error(f"Error fetching historical minute data: {e}")
             raise
     
+    def fetch_range(self, start, end, symbol='BTC', to_symbol='USDT', exchange=None):
+        """
+        Fetch the minute candles between two times, e.g. to backfill a gap, without saving them.
+        
+        Args:
+            start (pandas.Timestamp): First candle open time (naive UTC)
+            end (pandas.Timestamp): Last candle open time (naive UTC)
+            symbol (str): Trading symbol (default: 'BTC')
+            to_symbol (str): Quote currency (default: 'USDT')
+            exchange (str, optional): Single exchange such as 'Binance' (default: the CCCAGG aggregate)
+            
+        Returns:
+            pandas.DataFrame: DataFrame with OHLCV data
+        """
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        df = self.fetch_historical_minute_data(
+            symbol=symbol,
+            to_symbol=to_symbol,
+            limit=int((end - start).total_seconds() // 60) + 1,
+            to_ts=int(end.timestamp()),
+            exchange=exchange
+        )
+        return df.loc[start:end, ['open', 'high', 'low', 'close', 'volume']]
+    
     def fetch_historical_data(self, start_date, end_date=None, symbol='BTC', to_symbol='USDT'):
         """
         Fetch historical OHLCV data for the specified period.
@@ -147,9 +309,6 @@ class CryptoCompareDataSource:
                 
                 # Update timestamp for next batch (oldest timestamp in current batch minus 1)
                 current_timestamp = df['unix_time'].min() - 1
-                
-                # Respect rate limits
-                time.sleep(0.5)
             
             # Combine all data
             if all_data:
@@ -226,8 +385,7 @@ class CryptoCompareDataSource:
         }
         
         try:
-            response = requests.get(endpoint, params=params)
-            data = response.json()
+            data = self.client.get_json(endpoint, params=params)
             
             if to_symbol in data:
                 price = float(data[to_symbol])
@@ -246,20 +404,27 @@ class CoinGeckoDataSource:
     Class to collect Bitcoin price data from CoinGecko API.
     """
     
-    def __init__(self, data_dir='data'):
+    def __init__(self, data_dir='data', base_url=None, client=None):
         """
         Initialize the data source.
         
         Args:
             data_dir (str): Directory to store data (default: 'data')
+            base_url (str, optional): API root, e.g. a local stub server (default: https://api.coingecko.com/api/v3)
+            client (HttpClient, optional): HTTP client (default: the shared client)
         """
         self.data_dir = data_dir
-        self.base_url = "https://api.coingecko.com/api/v3"
+        self.base_url = base_url or "https://api.coingecko.com/api/v3"
+        self.client = client or get_client()
         
         # Create data directory if it doesn't exist
         if not os.path.exists(data_dir):
             os.makedirs(data_dir)
             
+        # Symbol to coin ID index kept on disk; the coin list is only downloaded when it is stale
+        self.coin_ids = CoinIdIndex(os.path.join(data_dir, 'coingecko_coin_ids.json'),
+                                    lambda: self.client.get_json(f"{self.base_url}/coins/list"))
+        
         logger.info("CoinGecko data source initialized")
     
     def get_coin_id(self, symbol):
@@ -285,21 +450,17 @@ class CoinGeckoDataSource:
         if symbol in mappings:
             return mappings[symbol]
         
-        # Fetch from API if not in common mappings
+        # Look up everything else in the cached coin list
         try:
-            response = requests.get(f"{self.base_url}/coins/list")
-            coins = response.json()
-            
-            for coin in coins:
-                if coin['symbol'].lower() == symbol:
-                    return coin['id']
-            
-            logger.error(f"Coin ID not found for symbol {symbol}")
-            raise Exception(f"Coin ID not found for symbol {symbol}")
-            
+            coin_id = self.coin_ids.lookup(symbol)
         except Exception as e:
             logger.error(f"Error getting coin ID: {e}")
             raise
+        
+        if coin_id is None:
+            logger.error(f"Coin ID not found for symbol {symbol}")
+            raise Exception(f"Coin ID not found for symbol {symbol}")
+        return coin_id
     
     def fetch_historical_data(self, start_date, end_date=None, symbol='BTC', to_symbol='USD'):
         """
@@ -334,8 +495,7 @@ class CoinGeckoDataSource:
                 'to': end_timestamp
             }
             
-            response = requests.get(endpoint, params=params)
-            data = response.json()
+            data = self.client.get_json(endpoint, params=params)
             
             # Process price data
             prices = data.get('prices', [])
@@ -444,8 +604,7 @@ class CoinGeckoDataSource:
                 'vs_currencies': vs_currency
             }
             
-            response = requests.get(endpoint, params=params)
-            data = response.json()
+            data = self.client.get_json(endpoint, params=params)
             
             if coin_id in data and vs_currency in data[coin_id]:
                 price = float(data[coin_id][vs_currency])
@@ -554,6 +713,8 @@ class AlternativeDataCollector:
         )
 
 if __name__ == "__main__":
+    setup_logging("alt_data_source.log")
+    
     # Example usage
     collector = AlternativeDataCollector(data_source='cryptocompare')
     
@@ -6,25 +6,21 @@ This module implements backtesting functionality for the Bitcoin trading signal
 """
 
 import os
+import sys
 import json
+import itertools
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 import logging
 from data_collector import BitcoinDataCollector
 from indicators import TechnicalIndicators
 from signal_generator import SignalGenerator
+from signal_core import SignalCore
+from performance_metrics import PerformanceMetrics
+from trade_log import TradeLog, BacktestResults
+from logging_setup import setup_logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("backtest.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger("Backtester")
 
 class Backtester:
@@ -32,16 +28,39 @@ class Backtester:
     Class to backtest the Bitcoin trading signal strategy.
     """
     
-    def __init__(self, data_dir='data', results_dir='backtest_results'):
+    # Strategy parameters that run_backtest reads and grid search may vary
+    PARAMETERS = (
+        'expiry_minutes', 'max_daily_signals', 'rsi_oversold', 'rsi_overbought', 'stoch_oversold',
+        'stoch_overbought', 'bb_tolerance'
+    )
+    
+    def __init__(self, data_dir='data', results_dir='backtest_results', expiry_minutes=1, max_daily_signals=6,
+                 rsi_oversold=30, rsi_overbought=70, stoch_oversold=20, stoch_overbought=80,
+                 bb_tolerance=0.0):
         """
         Initialize the backtester.
         
         Args:
             data_dir (str): Directory with price data (default: 'data')
             results_dir (str): Directory to store backtest results (default: 'backtest_results')
+            expiry_minutes (int): Minutes a position is held before it is closed (default: 1)
+            max_daily_signals (int): Maximum signals per day (default: 6)
+            rsi_oversold (float): RSI level a buy reversal crosses upward (default: 30)
+            rsi_overbought (float): RSI level a sell reversal crosses downward (default: 70)
+            stoch_oversold (float): Stochastic ceiling for a buy crossover (default: 20)
+            stoch_overbought (float): Stochastic floor for a sell crossover (default: 80)
+            bb_tolerance (float): Fraction the close may stay inside the Bollinger band and still
+                count as touching it (default: 0.0)
         """
         self.data_dir = data_dir
         self.results_dir = results_dir
+        self.expiry_minutes = expiry_minutes
+        self.max_daily_signals = max_daily_signals
+        self.rsi_oversold = rsi_oversold
+        self.rsi_overbought = rsi_overbought
+        self.stoch_oversold = stoch_oversold
+        self.stoch_overbought = stoch_overbought
+        self.bb_tolerance = bb_tolerance
         
         # Create results directory if it doesn't exist
         if not os.path.exists(results_dir):
@@ -100,11 +119,26 @@ class Backtester:
         # Add indicators
         data_with_indicators = TechnicalIndicators.add_all_indicators(data)
         
-        # Initialize results
-        results = []
+        # Evaluate the strict buy/sell checks for every bar in one pass
+        buy_strength, sell_strength = SignalCore.strict_signals(
+            SignalCore.extract(data_with_indicators),
+            rsi_oversold=self.rsi_oversold,
+            rsi_overbought=self.rsi_overbought,
+            stoch_oversold=self.stoch_oversold,
+            stoch_overbought=self.stoch_overbought,
+            bb_tolerance=self.bb_tolerance
+        )
+        decisions = SignalCore.strict_decisions(buy_strength, sell_strength)
+        closes = data_with_indicators['close'].to_numpy()
+        timestamps = data_with_indicators.index
+        
+        # Preallocate per-bar results; bars outside the time windows are not recorded
         capital = initial_capital
         position = None
-        trades = []
+        trades = TradeLog()
+        equity = np.full(len(closes), np.nan)
+        sides = np.zeros(len(closes), dtype=np.int8)
+        recorded = np.zeros(len(closes), dtype=bool)
         
         # Set up time windows for signal generation (6 per day)
         time_windows = [
@@ -122,8 +156,8 @@ class Backtester:
         
         # Process each data point
         for i in range(100, len(data_with_indicators)):  # Start after warmup period
-            current_row = data_with_indicators.iloc[i]
-            timestamp = data_with_indicators.index[i]
+            close_price = closes[i]
+            timestamp = timestamps[i]
             
             # Check if we're in a new day
             if current_date != timestamp.date():
@@ -138,58 +172,33 @@ class Backtester:
                     in_time_window = True
                     break
             
-            # Skip if not in time window or already have 6 signals today
-            if not in_time_window or daily_signal_count >= 6:
+            # Skip if not in time window or the daily signal limit is reached
+            if not in_time_window or daily_signal_count >= self.max_daily_signals:
                 continue
             
-            # Check for signals
-            window_data = data_with_indicators.iloc[i-100:i+1]
-            
-            # Check for buy signal
-            buy_signal, buy_strength = self.signal_generator.check_buy_signal(window_data)
-            
-            # Check for sell signal
-            sell_signal, sell_strength = self.signal_generator.check_sell_signal(window_data)
-            
             # Execute trades based on signals
             if position is None:  # No active position
-                if buy_signal and (not sell_signal or buy_strength == "Strong"):
-                    # Generate buy signal
-                    risk_params = self.signal_generator.calculate_risk_management(window_data, "BUY")
+                if decisions[i] != 0:
+                    if decisions[i] == SignalCore.BUY:
+                        signal_type, strength = 'BUY', buy_strength[i]
+                    else:
+                        signal_type, strength = 'SELL', sell_strength[i]
                     
-                    # Calculate position size
-                    position_size = capital * risk_params['position_size']
-                    entry_price = current_row['close']
-                    stop_loss = risk_params['stop_loss']
-                    target = risk_params['primary_target']
-                    
-                    # Open position
-                    position = {
-                        'type': 'BUY',
-                        'entry_time': timestamp,
-                        'entry_price': entry_price,
-                        'size': position_size,
-                        'stop_loss': stop_loss,
-                        'target': target,
-                        'strength': risk_params['signal_strength']
-                    }
-                    
-                    daily_signal_count += 1
-                    logger.info(f"BUY signal at {timestamp} - Price: {entry_price}")
-                    
-                elif sell_signal and (not buy_signal or sell_strength == "Strong"):
-                    # Generate sell signal
-                    risk_params = self.signal_generator.calculate_risk_management(window_data, "SELL")
+                    risk_params = self.signal_generator.calculate_risk_management(
+                        data_with_indicators.iloc[:i + 1],
+                        signal_type,
+                        signal_strength=SignalCore.STRENGTH_LABELS[int(strength)]
+                    )
                     
                     # Calculate position size
                     position_size = capital * risk_params['position_size']
-                    entry_price = current_row['close']
+                    entry_price = close_price
                     stop_loss = risk_params['stop_loss']
                     target = risk_params['primary_target']
                     
                     # Open position
                     position = {
-                        'type': 'SELL',
+                        'type': signal_type,
                         'entry_time': timestamp,
                         'entry_price': entry_price,
                         'size': position_size,
@@ -199,13 +208,13 @@ class Backtester:
                     }
                     
                     daily_signal_count += 1
-                    logger.info(f"SELL signal at {timestamp} - Price: {entry_price}")
+                    logger.info(f"{signal_type} signal at {timestamp} - Price: {entry_price}")
             
             elif position is not None:  # Active position
-                # Check if 1 minute has passed (contract expiry)
-                if timestamp >= position['entry_time'] + timedelta(minutes=1):
+                # Check if the contract has expired
+                if timestamp >= position['entry_time'] + timedelta(minutes=self.expiry_minutes):
                     # Close position at current price
-                    exit_price = current_row['close']
+                    exit_price = close_price
                     
                     # Calculate profit/loss
                     if position['type'] == 'BUY':
@@ -217,35 +226,36 @@ class Backtester:
                     capital += pnl
                     
                     # Record trade
-                    trade = {
-                        'type': position['type'],
-                        'entry_time': position['entry_time'],
-                        'entry_price': position['entry_price'],
-                        'exit_time': timestamp,
-                        'exit_price': exit_price,
-                        'size': position['size'],
-                        'pnl': pnl,
-                        'pnl_percent': pnl / position['size'] * 100,
-                        'strength': position['strength']
-                    }
-                    trades.append(trade)
+                    pnl_percent = pnl / position['size'] * 100
+                    trades.append(
+                        type=position['type'],
+                        entry_time=position['entry_time'],
+                        entry_price=position['entry_price'],
+                        exit_time=timestamp,
+                        exit_price=exit_price,
+                        size=position['size'],
+                        pnl=pnl,
+                        pnl_percent=pnl_percent,
+                        strength=position['strength']
+                    )
                     
-                    logger.info(f"Closed {position['type']} position at {timestamp} - P&L: {pnl:.2f} ({trade['pnl_percent']:.2f}%)")
+                    logger.info(f"Closed {position['type']} position at {timestamp} - P&L: {pnl:.2f} ({pnl_percent:.2f}%)")
                     
                     # Reset position
                     position = None
             
             # Record results
-            results.append({
-                'timestamp': timestamp,
-                'close': current_row['close'],
-                'capital': capital,
-                'position': position['type'] if position else None
-            })
-        
-        # Convert results to DataFrame
-        results_df = pd.DataFrame(results)
-        results_df.set_index('timestamp', inplace=True)
+            equity[i] = capital
+            recorded[i] = True
+            if position:
+                sides[i] = SignalCore.BUY if position['type'] == 'BUY' else SignalCore.SELL
+        
+        # Build the results DataFrame from the recorded bars
+        results_df = pd.DataFrame({
+            'close': closes[recorded],
+            'capital': equity[recorded],
+            'position': TradeLog.position_labels(sides[recorded])
+        }, index=timestamps[recorded].rename('timestamp'))
         
         # Calculate performance metrics
         performance_metrics = self._calculate_performance_metrics(trades, initial_capital)
@@ -257,88 +267,13 @@ class Backtester:
         Calculate performance metrics from backtest results.
         
         Args:
-            trades (list): List of trade dictionaries
+            trades (TradeLog): Trade log
             initial_capital (float): Initial capital
             
         Returns:
             dict: Performance metrics
         """
-        if not trades:
-            return {
-                'total_trades': 0,
-                'win_rate': 0,
-                'avg_profit': 0,
-                'avg_loss': 0,
-                'profit_factor': 0,
-                'max_drawdown': 0,
-                'sharpe_ratio': 0,
-                'total_return': 0,
-                'annualized_return': 0
-            }
-        
-        # Calculate basic metrics
-        total_trades = len(trades)
-        winning_trades = [t for t in trades if t['pnl'] > 0]
-        losing_trades = [t for t in trades if t['pnl'] <= 0]
-        
-        win_rate = len(winning_trades) / total_trades if total_trades > 0 else 0
-        
-        avg_profit = np.mean([t['pnl'] for t in winning_trades]) if winning_trades else 0
-        avg_loss = np.mean([t['pnl'] for t in losing_trades]) if losing_trades else 0
-        
-        total_profit = sum([t['pnl'] for t in winning_trades]) if winning_trades else 0
-        total_loss = sum([t['pnl'] for t in losing_trades]) if losing_trades else 0
-        
-        profit_factor = abs(total_profit / total_loss) if total_loss != 0 else float('inf')
-        
-        # Calculate equity curve
-        equity_curve = [initial_capital]
-        for trade in trades:
-            equity_curve.append(equity_curve[-1] + trade['pnl'])
-        
-        # Calculate drawdown
-        max_equity = initial_capital
-        drawdowns = []
-        
-        for equity in equity_curve:
-            if equity > max_equity:
-                max_equity = equity
-            drawdown = (max_equity - equity) / max_equity
-            drawdowns.append(drawdown)
-        
-        max_drawdown = max(drawdowns) if drawdowns else 0
-        
-        # Calculate returns
-        total_return = (equity_curve[-1] - initial_capital) / initial_capital
-        
-        # Calculate Sharpe ratio (simplified)
-        returns = np.diff(equity_curve) / np.array(equity_curve[:-1])
-        sharpe_ratio = np.mean(returns) / np.std(returns) * np.sqrt(252) if len(returns) > 0 and np.std(returns) > 0 else 0
-        
-        # Calculate annualized return (assuming 252 trading days)
-        if trades:
-            first_trade_date = trades[0]['entry_time']
-            last_trade_date = trades[-1]['exit_time']
-            trading_days = (last_trade_date - first_trade_date).days / 365 * 252
-            
-            if trading_days > 0:
-                annualized_return = (1 + total_return) ** (252 / trading_days) - 1
-            else:
-                annualized_return = 0
-        else:
-            annualized_return = 0
-        
-        return {
-            'total_trades': total_trades,
-            'win_rate': win_rate,
-            'avg_profit': avg_profit,
-            'avg_loss': avg_loss,
-            'profit_factor': profit_factor,
-            'max_drawdown': max_drawdown,
-            'sharpe_ratio': sharpe_ratio,
-            'total_return': total_return,
-            'annualized_return': annualized_return
-        }
+        return PerformanceMetrics.from_trades(trades, initial_capital)
     
     def plot_results(self, results_df, trades, performance_metrics):
         """
@@ -346,12 +281,14 @@ class Backtester:
         
         Args:
             results_df (pandas.DataFrame): DataFrame with backtest results
-            trades (list): List of trade dictionaries
+            trades (TradeLog): Trade log
             performance_metrics (dict): Performance metrics
             
         Returns:
             str: Path to saved plot file
         """
+        import matplotlib.pyplot as plt
+        
         # Create figure
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10), gridspec_kw={'height_ratios': [3, 1]})
         
@@ -359,13 +296,11 @@ class Backtester:
         ax1.plot(results_df.index, results_df['close'], label='BTC/USDT', color='black', alpha=0.7)
         
         # Plot buy and sell signals
-        for trade in trades:
-            if trade['type'] == 'BUY':
-                ax1.scatter(trade['entry_time'], trade['entry_price'], marker='^', color='green', s=100)
-                ax1.scatter(trade['exit_time'], trade['exit_price'], marker='o', color='blue', s=50)
-            else:  # SELL
-                ax1.scatter(trade['entry_time'], trade['entry_price'], marker='v', color='red', s=100)
-                ax1.scatter(trade['exit_time'], trade['exit_price'], marker='o', color='blue', s=50)
+        columns = trades.arrays()
+        buys = columns['type'] == 'BUY'
+        ax1.scatter(columns['entry_time'][buys], columns['entry_price'][buys], marker='^', color='green', s=100)
+        ax1.scatter(columns['entry_time'][~buys], columns['entry_price'][~buys], marker='v', color='red', s=100)
+        ax1.scatter(columns['exit_time'], columns['exit_price'], marker='o', color='blue', s=50)
         
         # Plot equity curve
         ax2.plot(results_df.index, results_df['capital'], label='Capital', color='blue')
@@ -401,6 +336,29 @@ class Backtester:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f"{self.results_dir}/backtest_results_{timestamp}.png"
         plt.savefig(filename)
+        plt.close(fig)
+        
+        logger.info(f"Saved backtest plot to {filename}")
+        
+        return filename
+    
+    def save_results(self, results_df, trades, performance_metrics):
+        """
+        Save backtest results: per-bar equity and the trade log to a compressed NumPy
+        archive, and the performance metrics to JSON.
+        
+        Args:
+            results_df (pandas.DataFrame): DataFrame with backtest results
+            trades (TradeLog): Trade log
+            performance_metrics (dict): Performance metrics
+            
+        Returns:
+            str: Path to saved results archive
+        """
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = BacktestResults.save(
+            f"{self.results_dir}/backtest_results_{timestamp}.npz", results_df, trades, performance_metrics
+        )
         
         # Save metrics to file
         metrics_file = f"{self.results_dir}/backtest_metrics_{timestamp}.json"
@@ -411,27 +369,77 @@ class Backtester:
         
         return filename
     
-    def run_parameter_optimization(self, data, parameter_grid):
+    @staticmethod
+    def _parameter_combinations(parameter_grid):
+        """
+        Expand a parameter grid into all combinations.
+        
+        Args:
+            parameter_grid (dict): Parameter name to list of values
+            
+        Returns:
+            list: One dict per combination
+        """
+        names = list(parameter_grid)
+        return [dict(zip(names, values)) for values in itertools.product(*(parameter_grid[name] for name in names))]
+    
+    def set_parameters(self, **params):
+        """
+        Set strategy parameters.
+        
+        Args:
+            **params: Values for any of PARAMETERS
+        """
+        for name, value in params.items():
+            if name not in self.PARAMETERS:
+                raise ValueError(f"Unknown parameter '{name}', expected one of {self.PARAMETERS}")
+            setattr(self, name, value)
+    
+    def get_parameters(self):
+        """
+        Get the current strategy parameters.
+            
+        Returns:
+            dict: Parameter name to value
+        """
+        return {name: getattr(self, name) for name in self.PARAMETERS}
+    
+    def run_parameter_optimization(self, data, parameter_grid, metric='sharpe_ratio', min_trades=1):
         """
         Run parameter optimization using grid search.
         
         Args:
             data (pandas.DataFrame): DataFrame with historical price data
-            parameter_grid (dict): Dictionary of parameter ranges to test
+            parameter_grid (dict): Parameter name (one of PARAMETERS) to list of values
+            metric (str): Performance metric to maximize (default: 'sharpe_ratio')
+            min_trades (int): Minimum trades for a parameter set to be eligible (default: 1)
             
         Returns:
             tuple: (best_params, best_metrics)
         """
         logger.info("Running parameter optimization")
         
+        original = self.get_parameters()
         best_metrics = None
         best_params = None
         
-        # TODO: Implement grid search for parameter optimization
-        
+        try:
+            for params in self._parameter_combinations(parameter_grid):
+                self.set_parameters(**params)
+                _, trades, metrics = self.run_backtest(data)
+                if len(trades) < min_trades:
+                    continue
+                if best_metrics is None or metrics[metric] > best_metrics[metric]:
+                    best_params, best_metrics = params, metrics
+        finally:
+            self.set_parameters(**original)
+        
+        logger.info(f"Best parameters: {best_params}")
         return best_params, best_metrics
 
 if __name__ == "__main__":
+    setup_logging("backtest.log")
+    
     # Example usage
     backtester = Backtester()
     
@@ -445,10 +453,12 @@ if __name__ == "__main__":
         # Run backtest
         results, trades, metrics = backtester.run_backtest(data)
         
-        # Plot results
-        plot_file = backtester.plot_results(results, trades, metrics)
+        # Save results; plotting is an optional separate step
+        results_file = backtester.save_results(results, trades, metrics)
+        if '--plot' in sys.argv:
+            backtester.plot_results(results, trades, metrics)
         
-        print(f"Backtest completed. Results saved to {plot_file}")
+        print(f"Backtest completed. Results saved to {results_file}")
         print("\nPerformance Metrics:")
         for key, value in metrics.items():
             if isinstance(value, float):
@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+Benchmark Module
+----------------
+This module times the indicator, signal and backtest hot paths on synthetic data
+with fixed seeds and sizes. Every case reports its best and median wall time,
+throughput and peak traced memory, and a run is saved as JSON so results can be
+compared across commits. Startup cases time the CLI entry points in a fresh
+interpreter.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+import numpy as np
+import pandas as pd
+from datetime import datetime
+import logging
+from synthetic_data import SyntheticDataGenerator
+from indicators import TechnicalIndicators
+from signal_core import SignalCore
+from signal_generator import SignalGenerator
+from scalping_signal_generator import ScalpingSignalGenerator
+from backtester import Backtester
+from telegram_notifier import TelegramNotifier
+from logging_setup import setup_logging
+
+logger = logging.getLogger("Benchmark")
+
+# Default data sizes in 1-minute bars
+DEFAULT_SIZES = (1000, 100000, 1000000)
+
+# Messages formatted per notifier run
+NOTIFIER_MESSAGES = 1000
+
+# Entry points timed by the startup benchmark, as statements run in a fresh interpreter
+STARTUP_CASES = {
+    'startup.scalping_main': 'import scalping_main',
+    'startup.scalping_system': 'import scalping_main; scalping_main.ScalpingSystem()',
+    'startup.main': 'import main',
+    'startup.debug_signals': 'import debug_signals',
+    'startup.backtester': 'import backtester',
+    'startup.walk_forward': 'import walk_forward',
+    'startup.benchmark': 'import benchmark'
+}
+
+# Example scalping signal for the notifier formatting path
+SAMPLE_SIGNAL = {
+    'type': 'BUY',
+    'timestamp': '2024-01-01T12:00:00',
+    'price': 50000.0,
+    'score': '5/7',
+    'quality': 'STRONG',
+    'conditions': ['RSI oversold', 'Price below lower Bollinger Band', 'MACD turning up',
+                   'Stochastic oversold', 'Near support at 49800.00'],
+    'position_size': 0.02,
+    'stop_loss': 49750.0,
+    'take_profit': 50500.0,
+    'expiry': '5 minutes',
+    'indicators': {'rsi': 27.5, 'macd': -12.3, 'bb_position': 'lower', 'volume_ratio': 1.8}
+}
+
+class BenchmarkSuite:
+    """
+    Reproducible benchmarks of the signal system hot paths.
+    """
+    
+    def __init__(self, sizes=DEFAULT_SIZES, repeat=3, seed=42, results_dir='benchmark_results'):
+        """
+        Initialize the benchmark suite.
+        
+        Args:
+            sizes (tuple): Data sizes in bars (default: DEFAULT_SIZES)
+            repeat (int): Timed runs per case; best and median are reported (default: 3)
+            seed (int): Seed for the synthetic data (default: 42)
+            results_dir (str): Directory for results and cached data (default: 'benchmark_results')
+        """
+        self.sizes = tuple(sizes)
+        self.repeat = repeat
+        self.seed = seed
+        self.results_dir = results_dir
+        self.cache_dir = os.path.join(results_dir, 'data')
+        # Scratch space for the components under test; removed by close()
+        self._work_dir = tempfile.TemporaryDirectory(prefix='benchmark_')
+        self.work_dir = self._work_dir.name
+        
+        os.makedirs(self.cache_dir, exist_ok=True)
+    
+    def close(self):
+        """
+        Remove the scratch directory.
+        """
+        self._work_dir.cleanup()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def load_data(self, bars):
+        """
+        Load synthetic 1-minute data of a given size, generating and caching it on first use.
+        
+        The index starts at a fixed date, so the data only depends on the seed and size.
+        
+        Args:
+            bars (int): Number of bars
+            
+        Returns:
+            pandas.DataFrame: Synthetic OHLCV data
+        """
+        filename = os.path.join(self.cache_dir, f"synthetic_{self.seed}_{bars}.pkl")
+        if os.path.exists(filename):
+            return pd.read_pickle(filename)
+        
+        logger.info(f"Generating {bars} bars of synthetic data (seed {self.seed})")
+        generator = SyntheticDataGenerator(data_dir=self.work_dir)
+        data = generator.generate_realistic_price_action(days=(bars + 1) / 1440, seed=self.seed).iloc[:bars]
+        data.index = pd.date_range('2024-01-01', periods=bars, freq='min', name='timestamp')
+        
+        data.to_pickle(filename)
+        return data
+    
+    def bar_cases(self):
+        """
+        Benchmarks that process a whole data set.
+        
+        Each case maps a name to a factory called with the context (raw data and data
+        with indicators); the factory returns the callable to time, so per-run setup
+        such as fresh generator state is not timed.
+        
+        Returns:
+            dict: Case name to factory
+        """
+        signal_generator = SignalGenerator(data_dir=self.work_dir, signal_dir=self.work_dir)
+        
+        def check_signals(data):
+            signal_generator.check_buy_signal(data)
+            signal_generator.check_sell_signal(data)
+        
+        def scalping_checks(context):
+            generator = ScalpingSignalGenerator(data_dir=self.work_dir, signal_dir=self.work_dir)
+            return lambda: generator.check_scalping_conditions(context['indicators'])
+        
+        def backtest(context):
+            backtester = Backtester(data_dir=self.work_dir, results_dir=self.work_dir)
+            return lambda: backtester.run_backtest(context['data'])
+        
+        return {
+            'indicators.add_all_indicators': lambda c: lambda: TechnicalIndicators.add_all_indicators(c['data']),
+            'indicators.calculate_rsi': lambda c: lambda: TechnicalIndicators.calculate_rsi(c['data']),
+            'indicators.calculate_bollinger_bands': lambda c: lambda: TechnicalIndicators.calculate_bollinger_bands(c['data']),
+            'indicators.calculate_macd': lambda c: lambda: TechnicalIndicators.calculate_macd(c['data']),
+            'indicators.calculate_stochastic': lambda c: lambda: TechnicalIndicators.calculate_stochastic(c['data']),
+            'indicators.calculate_atr': lambda c: lambda: TechnicalIndicators.calculate_atr(c['data']),
+            'indicators.calculate_ichimoku_cloud': lambda c: lambda: TechnicalIndicators.calculate_ichimoku_cloud(c['data']),
+            'indicators.calculate_fibonacci_levels': lambda c: lambda: TechnicalIndicators.calculate_fibonacci_levels(c['data']),
+            'indicators.calculate_volume_profile': lambda c: lambda: TechnicalIndicators.calculate_volume_profile(c['data']),
+            'signal_core.strict_signals': lambda c: lambda: SignalCore.strict_signals(SignalCore.extract(c['indicators'])),
+            'signal_generator.check_signals': lambda c: lambda: check_signals(c['indicators']),
+            'scalping_signal_generator.check_scalping_conditions': scalping_checks,
+            'backtester.run_backtest': backtest
+        }
+    
+    def message_cases(self):
+        """
+        Benchmarks of the notifier formatting path, independent of the data size.
+        
+        Returns:
+            dict: Case name to factory, as in bar_cases
+        """
+        # A throwaway config lets the notifier initialize without real credentials
+        config_file = os.path.join(self.work_dir, 'telegram_config.json')
+        with open(config_file, 'w') as f:
+            json.dump({'bot_token': 'benchmark', 'chat_ids': ['0'], 'test_mode': True}, f)
+        notifier = TelegramNotifier(config_file=config_file)
+        
+        def format_messages(context):
+            return lambda: [notifier.format_signal_message(SAMPLE_SIGNAL) for _ in range(NOTIFIER_MESSAGES)]
+        
+        return {'telegram_notifier.format_signal_message': format_messages}
+    
+    def measure_startup(self, statement):
+        """
+        Time a statement in fresh interpreters started in an empty working directory.
+        
+        The directory holds a throwaway Telegram config, so the notifier can be created,
+        and is checked for log files opened during startup.
+        
+        Args:
+            statement (str): Python statement, e.g. an entry point import
+            
+        Returns:
+            dict: 'best_s', 'median_s', 'peak_memory_mb' (maximum resident size) and
+                'log_files' (log files created)
+        """
+        with tempfile.TemporaryDirectory(prefix='startup_', dir=self.work_dir) as run_dir:
+            os.makedirs(os.path.join(run_dir, 'config'))
+            with open(os.path.join(run_dir, 'config', 'telegram_config.json'), 'w') as f:
+                json.dump({'bot_token': 'benchmark', 'chat_ids': ['0'], 'test_mode': True}, f)
+        
+            repo_dir = os.path.dirname(os.path.abspath(__file__))
+            env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [repo_dir, os.environ.get('PYTHONPATH')])))
+            script = f"{statement}\nimport resource\nprint(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+        
+            timings = []
+            for _ in range(self.repeat):
+                start = time.perf_counter()
+                completed = subprocess.run([sys.executable, '-c', script], cwd=run_dir, env=env,
+                                           capture_output=True, text=True)
+                timings.append(time.perf_counter() - start)
+                if completed.returncode != 0:
+                    raise RuntimeError(f"Startup case failed: {statement}\n{completed.stderr}")
+        
+            # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+            max_rss = int(completed.stdout.split()[-1])
+            scale = 2**20 if platform.system() == 'Darwin' else 2**10
+        
+            return {
+                'best_s': min(timings),
+                'median_s': float(np.median(timings)),
+                'peak_memory_mb': max_rss / scale,
+                'log_files': sorted(name for name in os.listdir(run_dir) if name.endswith('.log'))
+            }
+    
+    def measure(self, factory, context):
+        """
+        Time a case and trace its peak memory.
+        
+        Memory is traced in a separate run, so tracing overhead does not affect the timings.
+        INFO logging of the benchmarked modules is suppressed while measuring.
+        
+        Args:
+            factory (callable): Case factory from bar_cases or message_cases
+            context (dict): Benchmark context
+            
+        Returns:
+            dict: 'best_s', 'median_s' and 'peak_memory_mb'
+        """
+        timings = []
+        logging.disable(logging.INFO)
+        try:
+            for _ in range(self.repeat):
+                run = factory(context)
+                start = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - start)
+            
+            run = factory(context)
+            tracemalloc.start()
+            try:
+                run()
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+        finally:
+            logging.disable(logging.NOTSET)
+        
+        return {
+            'best_s': min(timings),
+            'median_s': float(np.median(timings)),
+            'peak_memory_mb': peak / 2**20
+        }
+    
+    def run(self, only=None):
+        """
+        Run all benchmarks.
+        
+        Args:
+            only (str, optional): Run only cases whose name contains this string
+            
+        Returns:
+            list: One result dict per case and size
+        """
+        selected = lambda cases: {name: case for name, case in cases.items() if not only or only in name}
+        bar_cases = selected(self.bar_cases())
+        message_cases = selected(self.message_cases())
+        startup_cases = selected(STARTUP_CASES)
+        results = []
+        
+        # Synthetic data is only loaded when a bar case is selected
+        for bars in self.sizes if bar_cases else ():
+            data = self.load_data(bars)
+            context = {'data': data, 'indicators': TechnicalIndicators.add_all_indicators(data)}
+            
+            for name, factory in bar_cases.items():
+                result = {'name': name, 'bars': bars, 'items': bars, 'unit': 'bars/s'}
+                result.update(self.measure(factory, context))
+                result['throughput'] = bars / result['best_s']
+                results.append(result)
+                logger.info(f"{name} [{bars} bars]: {result['best_s']:.4f}s, "
+                            f"{result['throughput']:,.0f} bars/s, {result['peak_memory_mb']:.1f} MB")
+        
+        for name, factory in message_cases.items():
+            result = {'name': name, 'bars': None, 'items': NOTIFIER_MESSAGES, 'unit': 'messages/s'}
+            result.update(self.measure(factory, {}))
+            result['throughput'] = NOTIFIER_MESSAGES / result['best_s']
+            results.append(result)
+            logger.info(f"{name}: {result['best_s']:.4f}s, {result['throughput']:,.0f} messages/s")
+        
+        for name, statement in startup_cases.items():
+            result = {'name': name, 'bars': None, 'items': 1, 'unit': 'starts/s'}
+            result.update(self.measure_startup(statement))
+            result['throughput'] = 1 / result['best_s']
+            results.append(result)
+            logger.info(f"{name}: {result['best_s']:.3f}s, {result['peak_memory_mb']:.0f} MB, "
+                        f"{len(result['log_files'])} log files")
+        
+        return results
+    
+    @staticmethod
+    def environment():
+        """
+        Describe the code version and runtime of a benchmark run.
+        
+        Returns:
+            dict: Commit, interpreter and library versions
+        """
+        repo_dir = os.path.dirname(os.path.abspath(__file__))
+        try:
+            commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=repo_dir,
+                                    capture_output=True, text=True, check=True).stdout.strip()
+            dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=repo_dir,
+                                        capture_output=True, text=True, check=True).stdout.strip())
+        except (OSError, subprocess.CalledProcessError):
+            commit, dirty = None, None
+        
+        return {
+            'commit': commit,
+            'dirty': dirty,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count()
+        }
+    
+    def save_results(self, results):
+        """
+        Save benchmark results as JSON.
+        
+        Args:
+            results (list): Output of run
+            
+        Returns:
+            str: Path to the JSON file
+        """
+        environment = self.environment()
+        report = {
+            'timestamp': datetime.now().isoformat(),
+            'environment': environment,
+            'seed': self.seed,
+            'repeat': self.repeat,
+            'sizes': list(self.sizes),
+            'results': results
+        }
+        
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f"{self.results_dir}/benchmark_{environment['commit'] or 'unknown'}_{timestamp}.json"
+        with open(filename, 'w') as f:
+            json.dump(report, f, indent=2)
+        
+        logger.info(f"Saved benchmark results to {filename}")
+        return filename
+    
+    @staticmethod
+    def compare(baseline_file, results):
+        """
+        Compare results with a saved baseline run.
+        
+        Args:
+            baseline_file (str): JSON file written by save_results
+            results (list): Output of run
+            
+        Returns:
+            pandas.DataFrame: Best times and speedup (baseline / current) per case and size
+        """
+        with open(baseline_file) as f:
+            baseline = json.load(f)['results']
+        
+        key = lambda r: (r['name'], r['bars'])
+        baseline_times = {key(r): r['best_s'] for r in baseline}
+        rows = [{
+            'name': r['name'],
+            'bars': r['bars'],
+            'baseline_s': baseline_times.get(key(r)),
+            'current_s': r['best_s'],
+            'speedup': baseline_times[key(r)] / r['best_s'] if key(r) in baseline_times else None
+        } for r in results]
+        
+        return pd.DataFrame(rows)
+
+def main():
+    """
+    Command-line entry point for the benchmark suite.
+    """
+    setup_logging("benchmark.log")
+    
+    parser = argparse.ArgumentParser(description='Benchmark the indicator, signal and backtest hot paths')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help='Data sizes in bars (default: 1000 100000 1000000)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per case (default: 3)')
+    parser.add_argument('--seed', type=int, default=42, help='Synthetic data seed (default: 42)')
+    parser.add_argument('--only', help='Run only cases whose name contains this string')
+    parser.add_argument('--compare', help='Baseline JSON file to compare against')
+    parser.add_argument('--results-dir', default='benchmark_results',
+                        help='Directory for results and cached data (default: benchmark_results)')
+    args = parser.parse_args()
+    
+    with BenchmarkSuite(sizes=args.sizes, repeat=args.repeat, seed=args.seed, results_dir=args.results_dir) as suite:
+        results = suite.run(only=args.only)
+        filename = suite.save_results(results)
+    
+    print(pd.DataFrame(results)[['name', 'bars', 'best_s', 'throughput', 'unit', 'peak_memory_mb']].to_string(index=False))
+    print(f"\nResults saved to {filename}")
+    
+    if args.compare:
+        print(f"\nComparison with {args.compare}:")
+        print(BenchmarkSuite.compare(args.compare, results).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Candle Buffer Module
+--------------------
+This module keeps the live candle window continuous. CandleBuffer holds the
+recent minute candles keyed by timestamp and checks every append against the
+previous one in O(1): a jump records the skipped minutes as missing, a repeated
+timestamp replaces the stored candle and a late candle fills its hole.
+
+GapFillingCollector wraps a market data collector. Each poll only fetches the
+minutes since the last stored candle, gaps are healed by targeted range requests
+instead of refetching the whole window, and the returned window is flagged stale
+while it still has holes so that indicators are not computed over non-contiguous
+time.
+"""
+
+import math
+import pandas as pd
+import logging
+
+logger = logging.getLogger("CandleBuffer")
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+class CandleBuffer:
+    """
+    Bounded window of minute candles with gap and duplicate detection.
+    
+    Times are kept as integer nanoseconds internally, so an append costs a few
+    dictionary and integer operations instead of Timestamp arithmetic.
+    """
+    
+    def __init__(self, capacity=500, step='1min'):
+        """
+        Initialize an empty buffer.
+        
+        Args:
+            capacity (int): Minutes kept, counted back from the newest candle (default: 500)
+            step (str): Candle interval (default: '1min')
+        """
+        self.capacity = capacity
+        self.step = pd.Timedelta(step)
+        self._step = self.step.value
+        self._span = (capacity - 1) * self._step
+        self.candles = {}  # Open time in ns to (open, high, low, close, volume)
+        self.missing = set()  # Open times in ns inside the window without a candle
+        self._first = None
+        self._last = None
+        
+        self.gaps_detected = 0
+        self.duplicates = 0
+        self.misaligned = 0
+    
+    def __len__(self):
+        return len(self.candles)
+    
+    @property
+    def last(self):
+        """
+        Open time of the newest candle, or None while empty.
+        """
+        return None if self._last is None else pd.Timestamp(self._last)
+    
+    def append(self, timestamp, candle):
+        """
+        Add one candle and update the continuity state.
+        
+        Args:
+            timestamp (pandas.Timestamp): Candle open time (naive UTC)
+            candle (tuple): (open, high, low, close, volume)
+            
+        Returns:
+            str: 'append', 'gap' (appended after missing minutes), 'update' (same timestamp
+                as a stored candle), 'fill' (healed a missing minute) or 'ignored'
+        """
+        moment = timestamp.value
+        if moment % self._step:
+            self.misaligned += 1
+            return 'ignored'
+        
+        if self._last is None:
+            self._first = self._last = moment
+            self.candles[moment] = candle
+            return 'append'
+        
+        if moment > self._last:
+            expected = self._last + self._step
+            result = 'append'
+            if moment != expected:
+                # Only the skipped minutes that stay inside the window are tracked
+                self.gaps_detected += 1
+                self.missing.update(range(max(expected, moment - self._span), moment, self._step))
+                result = 'gap'
+            
+            self.candles[moment] = candle
+            self._last = moment
+            self._evict()
+            return result
+        
+        if moment in self.candles:
+            # The newest candle is still forming and is refetched every poll
+            if moment != self._last:
+                self.duplicates += 1
+            self.candles[moment] = candle
+            return 'update'
+        
+        if moment in self.missing:
+            self.missing.discard(moment)
+            self.candles[moment] = candle
+            return 'fill'
+        
+        # Older than the window
+        return 'ignored'
+    
+    def _evict(self):
+        """
+        Drop candles and missing minutes that fell out of the window.
+        """
+        cutoff = self._last - self._span
+        if self._first >= cutoff:
+            return
+        
+        if cutoff - self._first > self._span:
+            # After a long outage rebuilding is cheaper than stepping minute by minute
+            self.candles = {moment: candle for moment, candle in self.candles.items() if moment >= cutoff}
+            self.missing = {moment for moment in self.missing if moment >= cutoff}
+        else:
+            for moment in range(self._first, cutoff, self._step):
+                self.candles.pop(moment, None)
+                self.missing.discard(moment)
+        self._first = cutoff
+    
+    def ingest(self, data):
+        """
+        Add the candles of a fetched DataFrame.
+        
+        Args:
+            data (pandas.DataFrame): OHLCV candles with a DatetimeIndex
+            
+        Returns:
+            int: Number of candles that were appended or filled a missing minute
+        """
+        if data is None or data.empty:
+            return 0
+        
+        added = 0
+        for timestamp, *candle in data[OHLCV_COLUMNS].itertuples(index=True, name=None):
+            if self.append(timestamp, tuple(candle)) in ('append', 'gap', 'fill'):
+                added += 1
+        return added
+    
+    def gaps(self, since=None):
+        """
+        Missing minutes merged into ranges, newest first.
+        
+        Args:
+            since (pandas.Timestamp, optional): Only minutes at or after this time
+            
+        Returns:
+            list: (first, last) missing timestamps per gap
+        """
+        floor = None if since is None else pd.Timestamp(since).value
+        moments = sorted((moment for moment in self.missing if floor is None or moment >= floor), reverse=True)
+        ranges = []
+        for moment in moments:
+            if ranges and ranges[-1][0] - self._step == moment:
+                ranges[-1][0] = moment
+            else:
+                ranges.append([moment, moment])
+        return [(pd.Timestamp(start), pd.Timestamp(end)) for start, end in ranges]
+    
+    def missing_between(self, start, end):
+        """
+        Count the missing minutes between two times.
+        
+        Args:
+            start (pandas.Timestamp): First timestamp, inclusive
+            end (pandas.Timestamp): Last timestamp, inclusive
+            
+        Returns:
+            int: Number of missing minutes
+        """
+        start, end = pd.Timestamp(start).value, pd.Timestamp(end).value
+        return sum(1 for moment in self.missing if start <= moment <= end)
+    
+    def discard_gap(self, start, end):
+        """
+        Stop tracking a gap that cannot be filled, e.g. minutes without trades.
+        
+        Args:
+            start (pandas.Timestamp): First missing timestamp
+            end (pandas.Timestamp): Last missing timestamp
+        """
+        start, end = pd.Timestamp(start).value, pd.Timestamp(end).value
+        self.missing = {moment for moment in self.missing if not start <= moment <= end}
+    
+    def window(self, limit=100):
+        """
+        The newest candles as a DataFrame, flagged stale while the window has gaps.
+        
+        Args:
+            limit (int): Number of minutes covered (default: 100)
+            
+        Returns:
+            pandas.DataFrame: OHLCV candles; attrs['stale'] is True and attrs['gaps'] lists the
+                missing ranges while minutes inside the window are missing
+        """
+        if self._last is None:
+            data = pd.DataFrame(columns=OHLCV_COLUMNS, index=pd.DatetimeIndex([], name='timestamp'))
+            data.attrs.update(stale=False, gaps=[])
+            return data
+        
+        start = max(self._first, self._last - (limit - 1) * self._step)
+        moments = [moment for moment in range(start, self._last + 1, self._step) if moment in self.candles]
+        data = pd.DataFrame([self.candles[moment] for moment in moments], columns=OHLCV_COLUMNS,
+                            index=pd.DatetimeIndex(pd.to_datetime(moments), name='timestamp'))
+        
+        gaps = self.gaps(since=pd.Timestamp(start))
+        data.attrs.update(stale=bool(gaps), gaps=gaps)
+        return data
+
+
+class GapFillingCollector:
+    """
+    Market-data adapter polling only new candles and backfilling gaps by range.
+    
+    Drop-in replacement for BitcoinDataCollector.fetch_latest_data. Gaps are healed
+    through the wrapped collector's fetch_range(start, end), when it has one.
+    """
+    
+    def __init__(self, collector, clock=None, capacity=500, max_poll=100, max_backfill=3, max_attempts=5):
+        """
+        Initialize the adapter.
+        
+        Args:
+            collector: Market-data source with fetch_latest_data(limit) and optionally fetch_range(start, end)
+            clock (RealClock, optional): Time source for the poll size (default: RealClock)
+            capacity (int): Minutes kept in the buffer (default: 500)
+            max_poll (int): Most candles requested by one poll (default: 100)
+            max_backfill (int): Gap requests per poll (default: 3)
+            max_attempts (int): Backfill attempts before a gap is accepted as permanent (default: 5)
+        """
+        from clock import RealClock
+        self.collector = collector
+        self.clock = clock or RealClock()
+        self.buffer = CandleBuffer(capacity=capacity)
+        self.max_poll = max_poll
+        self.max_backfill = max_backfill
+        self.max_attempts = max_attempts
+        self._attempts = {}
+        self.backfill_requests = 0
+        
+        if not hasattr(collector, 'fetch_range'):
+            logger.warning(f"{type(collector).__name__} has no fetch_range; gaps are flagged but not backfilled")
+    
+    def seed(self, data):
+        """
+        Prefill the buffer, e.g. with the candles of a restored snapshot.
+        
+        Args:
+            data (pandas.DataFrame): OHLCV candles with a DatetimeIndex
+        """
+        added = self.buffer.ingest(data)
+        logger.info(f"Seeded candle buffer with {added} candles")
+    
+    def poll_size(self, limit):
+        """
+        Candles to request so that every minute since the newest stored candle is covered.
+        
+        Args:
+            limit (int): Window requested by the caller
+            
+        Returns:
+            int: Candles to fetch
+        """
+        if self.buffer.last is None:
+            return max(limit, 1)
+        
+        newest = self.buffer.last.tz_localize('UTC').timestamp()
+        minutes = math.floor((self.clock.time() - newest) / self.buffer.step.total_seconds())
+        # The newest stored candle was still forming, so it is refetched as well
+        return min(max(minutes, 0) + 1, self.max_poll)
+    
+    def fetch_latest_data(self, limit=100):
+        """
+        Poll new candles, backfill gaps and return the newest window.
+        
+        Args:
+            limit (int): Number of minutes in the window (default: 100)
+            
+        Returns:
+            pandas.DataFrame: DataFrame with OHLCV data; attrs['stale'] flags a window with gaps
+        """
+        self.buffer.ingest(self.collector.fetch_latest_data(limit=self.poll_size(limit)))
+        self.backfill()
+        
+        data = self.buffer.window(limit)
+        if data.attrs['stale']:
+            missing = sum((end - start) // self.buffer.step + 1 for start, end in data.attrs['gaps'])
+            logger.warning(f"Candle window has {missing} missing minute(s) in {len(data.attrs['gaps'])} gap(s)")
+        return data
+    
+    def fetch_range(self, start, end):
+        """
+        Candles between two times, passed through to the wrapped collector.
+        """
+        return self.collector.fetch_range(start, end)
+    
+    def backfill(self):
+        """
+        Request the newest gaps by range, accepting a gap after max_attempts failed tries.
+        
+        Returns:
+            int: Number of minutes filled
+        """
+        if not hasattr(self.collector, 'fetch_range') or not self.buffer.missing:
+            return 0
+        
+        gaps = self.buffer.gaps()
+        # Forget attempts on gaps that were filled, merged or left the window
+        open_gaps = set(gaps)
+        self._attempts = {gap: attempts for gap, attempts in self._attempts.items() if gap in open_gaps}
+        
+        filled = 0
+        for start, end in gaps[:self.max_backfill]:
+            self.backfill_requests += 1
+            try:
+                filled += self.buffer.ingest(self.collector.fetch_range(start, end))
+            except Exception as e:
+                logger.warning(f"Backfill of {start} - {end} failed: {e}")
+            
+            still_missing = self.buffer.missing_between(start, end)
+            attempts = self._attempts.pop((start, end), 0) + 1
+            if not still_missing:
+                logger.info(f"Backfilled gap {start} - {end}")
+            elif attempts >= self.max_attempts:
+                logger.warning(f"Giving up on {still_missing} missing minute(s) between {start} and {end}")
+                self.buffer.discard_gap(start, end)
+            else:
+                self._attempts[(start, end)] = attempts
+        
+        return filled
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Candlestick Pattern Module
+--------------------------
+This module implements vectorized candlestick pattern detection. Every pattern is
+computed as a boolean mask over full OHLC arrays in one pass.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class CandlePatterns:
+    """
+    Class to detect candlestick patterns over full OHLC arrays.
+    """
+    
+    # Patterns added by add_pattern_columns, stored as 'pattern_<name>' columns
+    PATTERNS = [
+        'hammer',
+        'shooting_star',
+        'doji',
+        'bullish_engulfing',
+        'bearish_engulfing',
+        'bullish_pin_bar',
+        'bearish_pin_bar',
+        'inside_bar',
+        'outside_bar',
+        'three_white_soldiers',
+        'three_black_crows'
+    ]
+    
+    @staticmethod
+    def _ohlc(data):
+        """
+        Extract OHLC columns as float arrays.
+        
+        Args:
+            data (pandas.DataFrame): DataFrame with price data
+            
+        Returns:
+            tuple: (open, high, low, close) numpy arrays
+        """
+        return (
+            data['open'].to_numpy(dtype=float),
+            data['high'].to_numpy(dtype=float),
+            data['low'].to_numpy(dtype=float),
+            data['close'].to_numpy(dtype=float)
+        )
+    
+    @staticmethod
+    def _shift(values, periods=1):
+        """
+        Shift an array forward, padding the first rows with NaN.
+        
+        Args:
+            values (numpy.ndarray): Values to shift
+            periods (int): Number of rows to shift (default: 1)
+            
+        Returns:
+            numpy.ndarray: Shifted values
+        """
+        shifted = np.empty_like(values)
+        shifted[:periods] = np.nan
+        shifted[periods:] = values[:-periods]
+        return shifted
+    
+    @staticmethod
+    def hammer(data, wick_ratio=2.0):
+        """
+        Detect bullish hammers: bullish candle with a lower wick over wick_ratio x body.
+        
+        Args:
+            data (pandas.DataFrame): DataFrame with price data
+            wick_ratio (float): Minimum lower wick to body ratio (default: 2.0)
+            
+        Returns:
+            numpy.ndarray: Boolean mask
+        """
+        o, h, l, c = CandlePatterns._ohlc(data)
+        body = np.abs(c - o)
+        lower_wick = np.minimum(o, c) - l
+        return (lower_wick > body * wick_ratio) & (c > o)
+    
+    @staticmethod
+    def shooting_star(data, wick_ratio=2.0):
+        """
+        Detect bearish shooting stars: bearish candle with an upper wick over wick_ratio x body.
+        
+        Args:
+            data (pandas.DataFrame): DataFrame with price data
+            wick_ratio (float): Minimum upper wick to body ratio (default: 2.0)
+            
+        Returns:
+            numpy.ndarray: Boolean mask
+        """
+        o, h, l, c = CandlePatterns._ohlc(data)
+        body = np.abs(c - o)
+        upper_wick = h - np.maximum(o, c)
+        return (upper_wick > body * wick_ratio) & (c < o)
+    
+    @staticmethod
+    def doji(data, body_ratio=0.1):
+        """
+        Detect doji candles: body no larger than body_ratio x range.
+        
+        Args:
+            data (pandas.DataFrame): DataFrame with price data
+            body_ratio (float): Maximum body to range ratio (default: 0.1)
+            
+        Returns:
+            numpy.ndarray: Boolean mask
+        """
+        o, h, l, c = CandlePatterns._ohlc(data)
+        candle_range = h - l
+        return (candle_range > 0) & (np.abs(c - o) <= candle_range * body_ratio)
+    
+    @staticmethod
+    def bullish_engulfing(data):
+        """
+        Detect bullish engulfing: bullish body fully covering the previous bearish body.
+        
+        Args:
+            data (pandas.DataFrame): DataFrame with price data
+            
+        Returns:
+            numpy.ndarray: Boolean mask
+        """
+        o, h, l, c = CandlePatterns._ohlc(data)
+        prev_o, prev_c = CandlePatterns._shift(o), CandlePatterns._shift(c)
+        return (prev_c < prev_o) & (c > o) & (o <= prev_c) & (c >= prev_o)
+    
+    @staticmethod
+    def bearish_engulfing(data):
+        """
+        Detect bearish engulfing: bearish body fully covering the previous bullish body.
+        
+        Args:
+            data (pandas.DataFrame): DataFrame with price data
+            
+        Returns:
+            numpy.ndarray: Boolean mask
+        """
+        o, h, l, c = CandlePatterns._ohlc(data)
+        prev_o, prev_c = CandlePatterns._shift(o), CandlePatterns._shift(c)
+        return (prev_c > prev_o) & (c < o) & (o >= prev_c) & (c <= prev_o)
+    
+    @staticmethod
+    def bullish_pin_bar(data, tail_ratio=2 / 3):
+        """
+        Detect bullish pin bars: lower tail at least tail_ratio of the range.
+        
+        Args:
+            data (pandas.DataFrame): DataFrame with price data
+            tail_ratio (float): Minimum lower tail to range ratio (default: 2/3)
+            
+        Returns:
+            numpy.ndarray: Boolean mask
+        """
+        o, h, l, c = CandlePatterns._ohlc(data)
+        candle_range = h - l
+        return (candle_range > 0) & (np.minimum(o, c) - l >= candle_range * tail_ratio)
+    
+    @staticmethod
+    def bearish_pin_bar(data, tail_ratio=2 / 3):
+        """
+        Detect bearish pin bars: upper tail at least tail_ratio of the range.
+        
+        Args:
+            data (pandas.DataFrame): DataFrame with price data
+            tail_ratio (float): Minimum upper tail to range ratio (default: 2/3)
+            
+        Returns:
+            numpy.ndarray: Boolean mask
+        """
+        o, h, l, c = CandlePatterns._ohlc(data)
+        candle_range = h - l
+        return (candle_range > 0) & (h - np.maximum(o, c) >= candle_range * tail_ratio)
+    
+    @staticmethod
+    def inside_bar(data):
+        """
+        Detect inside bars: range fully within the previous candle's range.
+        
+        Args:
+            data (pandas.DataFrame): DataFrame with price data
+            
+        Returns:
+            numpy.ndarray: Boolean mask
+        """
+        o, h, l, c = CandlePatterns._ohlc(data)
+        return (h < CandlePatterns._shift(h)) & (l > CandlePatterns._shift(l))
+    
+    @staticmethod
+    def outside_bar(data):
+        """
+        Detect outside bars: range fully covering the previous candle's range.
+        
+        Args:
+            data (pandas.DataFrame): DataFrame with price data
+            
+        Returns:
+            numpy.ndarray: Boolean mask
+        """
+        o, h, l, c = CandlePatterns._ohlc(data)
+        return (h > CandlePatterns._shift(h)) & (l < CandlePatterns._shift(l))
+    
+    @staticmethod
+    def three_white_soldiers(data):
+        """
+        Detect three white soldiers: three rising bullish candles, each opening
+        inside the previous body.
+        
+        Args:
+            data (pandas.DataFrame): DataFrame with price data
+            
+        Returns:
+            numpy.ndarray: Boolean mask (set on the third candle)
+        """
+        o, h, l, c = CandlePatterns._ohlc(data)
+        prev_o, prev_c = CandlePatterns._shift(o), CandlePatterns._shift(c)
+        
+        # One candle step: bullish, higher close, open within the previous body
+        step = (c > o) & (prev_c > prev_o) & (c > prev_c) & (o >= prev_o) & (o <= prev_c)
+        return step & (CandlePatterns._shift(step.astype(float)) == 1)
+    
+    @staticmethod
+    def three_black_crows(data):
+        """
+        Detect three black crows: three falling bearish candles, each opening
+        inside the previous body.
+        
+        Args:
+            data (pandas.DataFrame): DataFrame with price data
+            
+        Returns:
+            numpy.ndarray: Boolean mask (set on the third candle)
+        """
+        o, h, l, c = CandlePatterns._ohlc(data)
+        prev_o, prev_c = CandlePatterns._shift(o), CandlePatterns._shift(c)
+        
+        # One candle step: bearish, lower close, open within the previous body
+        step = (c < o) & (prev_c < prev_o) & (c < prev_c) & (o <= prev_o) & (o >= prev_c)
+        return step & (CandlePatterns._shift(step.astype(float)) == 1)
+    
+    @staticmethod
+    def detect_all(data):
+        """
+        Detect all supported patterns.
+        
+        Args:
+            data (pandas.DataFrame): DataFrame with OHLC data
+            
+        Returns:
+            pandas.DataFrame: One boolean 'pattern_<name>' column per pattern
+        """
+        masks = {
+            f'pattern_{name}': getattr(CandlePatterns, name)(data)
+            for name in CandlePatterns.PATTERNS
+        }
+        return pd.DataFrame(masks, index=data.index)
+    
+    @staticmethod
+    def add_pattern_columns(df):
+        """
+        Add all pattern masks to a DataFrame in place.
+        
+        Args:
+            df (pandas.DataFrame): DataFrame with OHLC data
+            
+        Returns:
+            pandas.DataFrame: The same DataFrame with 'pattern_<name>' columns
+        """
+        for name in CandlePatterns.PATTERNS:
+            df[f'pattern_{name}'] = getattr(CandlePatterns, name)(df)
+        
+        return df
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Clock Module
+------------
+This module implements the clocks used by the signal generators and the scalping
+system. Production code runs on the real clock; replays and backtests drive the
+same code path with a simulated or accelerated clock.
+"""
+
+import time
+import datetime
+
+
+class RealClock:
+    """
+    Wall-clock time.
+    """
+    
+    def now(self):
+        """
+        Get the current local time.
+        
+        Returns:
+            datetime.datetime: Current local time (naive)
+        """
+        return datetime.datetime.now()
+    
+    def utcnow(self):
+        """
+        Get the current UTC time.
+        
+        Returns:
+            datetime.datetime: Current UTC time (naive)
+        """
+        return datetime.datetime.utcnow()
+    
+    def time(self):
+        """
+        Get the current time as a Unix timestamp.
+        
+        Returns:
+            float: Seconds since the epoch
+        """
+        return time.time()
+    
+    def sleep(self, seconds):
+        """
+        Block for a number of seconds.
+        
+        Args:
+            seconds (float): Seconds to sleep
+        """
+        time.sleep(seconds)
+
+
+class SimulatedClock(RealClock):
+    """
+    Manually driven clock for replaying history.
+    
+    Time only moves when set or advanced. sleep() advances the clock
+    instantly, so loops written against the real clock run as fast as the
+    CPU allows. Simulated time is UTC: now() and utcnow() return the same value.
+    """
+    
+    def __init__(self, start=None):
+        """
+        Initialize the simulated clock.
+        
+        Args:
+            start (datetime.datetime, optional): Start time (default: current UTC time)
+        """
+        self.current = self._naive(start) if start is not None else datetime.datetime.utcnow()
+    
+    @staticmethod
+    def _naive(value):
+        """
+        Convert a timestamp to a naive UTC datetime.
+        
+        Args:
+            value (datetime.datetime or pandas.Timestamp): Timestamp to convert
+            
+        Returns:
+            datetime.datetime: Naive UTC datetime
+        """
+        if hasattr(value, 'to_pydatetime'):
+            value = value.to_pydatetime()
+        if value.tzinfo is not None:
+            value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        return value
+    
+    def set(self, value):
+        """
+        Move the clock to a given time.
+        
+        Args:
+            value (datetime.datetime or pandas.Timestamp): New current time
+        """
+        self.current = self._naive(value)
+    
+    def advance(self, seconds):
+        """
+        Move the clock forward.
+        
+        Args:
+            seconds (float): Seconds to advance
+        """
+        self.current += datetime.timedelta(seconds=seconds)
+    
+    def now(self):
+        return self.current
+    
+    def utcnow(self):
+        return self.current
+    
+    def time(self):
+        return self.current.replace(tzinfo=datetime.timezone.utc).timestamp()
+    
+    def sleep(self, seconds):
+        self.advance(seconds)
+
+
+class AcceleratedClock(RealClock):
+    """
+    Clock running at a multiple of real time from a given start.
+    
+    Useful for watching a replay unfold, e.g. speed=60 plays one simulated
+    minute per real second. sleep() blocks for seconds / speed.
+    """
+    
+    def __init__(self, start=None, speed=60.0):
+        """
+        Initialize the accelerated clock.
+        
+        Args:
+            start (datetime.datetime, optional): Simulated start time (default: current UTC time)
+            speed (float): Simulated seconds per real second (default: 60.0)
+        """
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        
+        self.start = SimulatedClock._naive(start) if start is not None else datetime.datetime.utcnow()
+        self.speed = speed
+        self._origin = time.monotonic()
+    
+    def now(self):
+        elapsed = (time.monotonic() - self._origin) * self.speed
+        return self.start + datetime.timedelta(seconds=elapsed)
+    
+    def utcnow(self):
+        return self.now()
+    
+    def time(self):
+        return self.now().replace(tzinfo=datetime.timezone.utc).timestamp()
+    
+    def sleep(self, seconds):
+        time.sleep(seconds / self.speed)
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Composite Data Source Module
+----------------------------
+This module fans market data requests out over several providers so that feed
+latency and availability no longer hinge on one of them. Minute candles come
+from Binance (ccxt) and CryptoCompare; CoinGecko has no minute candles and
+serves as an independent spot price for cross-validation.
+
+In hedged mode the primary source is asked first and the next source is fired
+when the primary has not answered within its own p95 latency; the first valid
+answer wins. A failed or invalid answer fails over to the next source at once.
+Late answers from the other sources are compared with the winner and price
+disagreements are logged and counted.
+
+Sources are interchangeable from poll to poll, so they must describe the same
+market: CryptoCompare is asked for its Binance candles, since the volume of its
+cross-exchange aggregate is several times that of a single exchange and would
+corrupt the volume ratio and spike conditions of a mixed window.
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import pandas as pd
+import logging
+from tracing import LatencyHistogram
+
+logger = logging.getLogger("CompositeDataSource")
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+def _binance(data_dir):
+    from data_collector import BitcoinDataCollector
+    collector = BitcoinDataCollector(data_dir=data_dir)
+    return collector.fetch_latest_data, collector.fetch_range
+
+def _cryptocompare(data_dir):
+    from alt_data_source import CryptoCompareDataSource
+    source = CryptoCompareDataSource(data_dir=data_dir)
+    # Binance candles rather than the CCCAGG aggregate, so volume has the same units as the binance source
+    return ((lambda limit: source.fetch_historical_minute_data(limit=limit, exchange='Binance')),
+            (lambda start, end: source.fetch_range(start, end, exchange='Binance')))
+
+# Candle sources by name; each factory returns fetch(limit) and fetch_range(start, end)
+CANDLE_SOURCES = {
+    'binance': _binance,
+    'cryptocompare': _cryptocompare
+}
+
+class CompositeDataCollector:
+    """
+    Market data collector querying several sources with hedged requests and failover.
+    
+    Drop-in replacement for BitcoinDataCollector.fetch_latest_data.
+    """
+    
+    def __init__(self, sources=('binance', 'cryptocompare'), mode='hedged', data_dir='data',
+                 reference='coingecko', max_deviation=0.005, max_staleness=180,
+                 min_hedge_delay=0.05, default_hedge_delay=1.0, min_samples=20, validate_interval=300):
+        """
+        Initialize the collector.
+        
+        Args:
+            sources (iterable): Candle source names in priority order, or (name, fetch) and
+                (name, fetch, fetch_range) tuples where fetch(limit) and fetch_range(start, end)
+                return OHLCV DataFrames (default: ('binance', 'cryptocompare'))
+            mode (str): 'hedged' to fire the next source after the p95 latency of the previous one,
+                'failover' to ask the next source only after a failure (default: 'hedged')
+            data_dir (str): Directory for the sources' data files (default: 'data')
+            reference (str, optional): Spot price source for periodic cross-validation, or None
+                (default: 'coingecko')
+            max_deviation (float): Relative price difference logged as a disagreement (default: 0.5%)
+            max_staleness (float): Seconds the last candle may lag behind now (default: 180)
+            min_hedge_delay (float): Shortest wait before hedging in seconds (default: 0.05)
+            default_hedge_delay (float): Wait before hedging until enough latencies were seen (default: 1.0)
+            min_samples (int): Latencies needed before the p95 is used (default: 20)
+            validate_interval (float): Minimum seconds between reference price checks (default: 300)
+        """
+        if mode not in ('hedged', 'failover'):
+            raise ValueError(f"Unsupported mode: {mode}")
+        
+        self.sources = {}
+        self.range_sources = {}
+        for source in sources:
+            if isinstance(source, str):
+                source = (source, *CANDLE_SOURCES[source](data_dir))
+            self.sources[source[0]] = source[1]
+            if len(source) > 2:
+                self.range_sources[source[0]] = source[2]
+        if not self.sources:
+            raise ValueError("At least one data source is required")
+        
+        self.mode = mode
+        self.max_deviation = max_deviation
+        self.max_staleness = max_staleness
+        self.min_hedge_delay = min_hedge_delay
+        self.default_hedge_delay = default_hedge_delay
+        self.min_samples = min_samples
+        self.validate_interval = validate_interval
+        self.reference = None
+        if reference == 'coingecko':
+            from alt_data_source import CoinGeckoDataSource
+            self.reference = CoinGeckoDataSource(data_dir=data_dir)
+        elif reference is not None:
+            self.reference = reference
+        self._last_validation = None
+        
+        # Requests run on worker threads; a slow source never blocks the next one
+        self._executor = ThreadPoolExecutor(max_workers=len(self.sources) + 1, thread_name_prefix='market-data')
+        self._lock = threading.Lock()
+        self.latency = {name: LatencyHistogram(window=200) for name in self.sources}
+        self.stats = {name: {'requests': 0, 'failures': 0, 'served': 0} for name in self.sources}
+        self.hedges = 0
+        self.disagreements = 0
+        self.last_source = None
+        
+        logger.info(f"Composite data source initialized ({mode}): {', '.join(self.sources)}")
+    
+    def close(self):
+        """
+        Stop the worker threads without waiting for outstanding requests.
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+    
+    def hedge_delay(self, name):
+        """
+        Seconds to wait for a source before firing the next one.
+        
+        Args:
+            name (str): Source name
+            
+        Returns:
+            float: p95 latency of the source, or the default until enough samples were seen
+        """
+        with self._lock:
+            histogram = self.latency[name]
+            if histogram.count < self.min_samples:
+                return self.default_hedge_delay
+            p95 = histogram.snapshot()['p95_ms'] / 1000
+        return max(p95, self.min_hedge_delay)
+    
+    def _fetch(self, name, limit):
+        """
+        Fetch and validate candles from one source on a worker thread.
+        """
+        start = time.perf_counter()
+        try:
+            data = self.sources[name](limit)
+            self._validate(data)
+        except Exception:
+            with self._lock:
+                self.stats[name]['failures'] += 1
+            raise
+        finally:
+            with self._lock:
+                self.stats[name]['requests'] += 1
+                self.latency[name].add(time.perf_counter() - start)
+        return data[OHLCV_COLUMNS].tail(limit)
+    
+    def _validate(self, data):
+        """
+        Reject empty, malformed or stale candles.
+        """
+        if data is None or data.empty:
+            raise ValueError("no candles")
+        missing = set(OHLCV_COLUMNS) - set(data.columns)
+        if missing:
+            raise ValueError(f"missing columns {sorted(missing)}")
+        close = data['close'].iloc[-1]
+        if not close > 0:
+            raise ValueError(f"invalid close {close}")
+        lag = time.time() - pd.Timestamp(data.index[-1]).timestamp()
+        if lag > self.max_staleness:
+            raise ValueError(f"last candle is {lag:.0f}s old")
+    
+    def _compare(self, winner, price, other, other_price):
+        """
+        Log and count a price disagreement between two sources.
+        """
+        deviation = abs(other_price / price - 1)
+        if deviation > self.max_deviation:
+            with self._lock:
+                self.disagreements += 1
+            logger.warning(f"Price disagreement: {winner} {price:,.2f} vs {other} {other_price:,.2f} "
+                           f"({deviation:.2%})")
+    
+    def _cross_validate(self, future, name, winner, price):
+        """
+        Compare a late answer with the winning one once it arrives.
+        """
+        if not future.cancelled() and future.exception() is None:
+            self._compare(winner, price, name, future.result()['close'].iloc[-1])
+    
+    def _validate_reference(self, winner, price):
+        """
+        Compare the winning price with the reference spot price on a worker thread.
+        """
+        try:
+            self._compare(winner, price, 'reference', self.reference.get_current_price('BTC', 'USD'))
+        except Exception as e:
+            logger.warning(f"Reference price check failed: {e}")
+    
+    def fetch_latest_data(self, limit=100):
+        """
+        Fetch the latest OHLCV data from the first source that answers with valid candles.
+        
+        Args:
+            limit (int): Number of candles to fetch (default: 100)
+            
+        Returns:
+            pandas.DataFrame: DataFrame with OHLCV data
+            
+        Raises:
+            RuntimeError: If every source failed
+        """
+        queue = list(self.sources)
+        pending = {}
+        errors = {}
+        
+        def launch():
+            name = queue.pop(0)
+            pending[self._executor.submit(self._fetch, name, limit)] = name
+            return name
+        
+        last_launched = launch()
+        while pending:
+            hedge = self.mode == 'hedged' and queue
+            done, _ = wait(pending, timeout=self.hedge_delay(last_launched) if hedge else None,
+                           return_when=FIRST_COMPLETED)
+            
+            if not done:
+                last_launched = launch()
+                with self._lock:
+                    self.hedges += 1
+                logger.debug(f"Hedging with {last_launched}")
+                continue
+            
+            for future in done:
+                name = pending.pop(future)
+                error = future.exception()
+                if error is None:
+                    return self._serve(name, future.result(), pending)
+                
+                errors[name] = error
+                logger.warning(f"Data source {name} failed: {error}")
+                if queue:
+                    last_launched = launch()
+        
+        raise RuntimeError("All market data sources failed: " +
+                           "; ".join(f"{name}: {error}" for name, error in errors.items()))
+    
+    def fetch_range(self, start, end):
+        """
+        Fetch the candles between two times from the first source that has them, e.g. to backfill a gap.
+        
+        Args:
+            start (pandas.Timestamp): First candle open time (naive UTC)
+            end (pandas.Timestamp): Last candle open time (naive UTC)
+            
+        Returns:
+            pandas.DataFrame: DataFrame with OHLCV data
+            
+        Raises:
+            RuntimeError: If no source returned candles
+        """
+        errors = {}
+        for name, fetch_range in self.range_sources.items():
+            try:
+                data = fetch_range(start, end)
+            except Exception as e:
+                errors[name] = e
+                continue
+            if not data.empty:
+                return data[OHLCV_COLUMNS]
+            errors[name] = "no candles"
+        
+        raise RuntimeError("No market data source returned the range: " +
+                           "; ".join(f"{name}: {error}" for name, error in errors.items()))
+    
+    def _serve(self, name, data, pending):
+        """
+        Record the winning source and schedule the cross-validation of its price.
+        """
+        price = data['close'].iloc[-1]
+        with self._lock:
+            self.stats[name]['served'] += 1
+            self.last_source = name
+        
+        for future, other in pending.items():
+            future.add_done_callback(lambda f, other=other: self._cross_validate(f, other, name, price))
+        
+        now = time.monotonic()
+        if self.reference is not None and (self._last_validation is None or
+                                           now - self._last_validation >= self.validate_interval):
+            self._last_validation = now
+            self._executor.submit(self._validate_reference, name, price)
+        
+        return data
+    
+    def source_stats(self):
+        """
+        Availability and latency per source.
+        
+        Returns:
+            dict: Source name to requests, failures, served, availability and p50/p95 latency
+                in milliseconds, plus the 'hedges' and 'disagreements' counts
+        """
+        with self._lock:
+            report = {}
+            for name, counts in self.stats.items():
+                histogram = self.latency[name]
+                summary = histogram.snapshot() if histogram.count else {}
+                report[name] = dict(
+                    counts,
+                    availability=1 - counts['failures'] / counts['requests'] if counts['requests'] else None,
+                    p50_ms=summary.get('p50_ms'),
+                    p95_ms=summary.get('p95_ms')
+                )
+            report['hedges'] = self.hedges
+            report['disagreements'] = self.disagreements
+            return report
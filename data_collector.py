@@ -11,18 +11,10 @@ import json
 import datetime
 import pandas as pd
 import numpy as np
-import ccxt
 import logging
+from tracing import span
+from logging_setup import setup_logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("data_collector.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger("BitcoinDataCollector")
 
 class BitcoinDataCollector:
@@ -49,19 +41,33 @@ class BitcoinDataCollector:
         if not os.path.exists(data_dir):
             os.makedirs(data_dir)
             
-        # Initialize exchange
-        try:
-            exchange_class = getattr(ccxt, exchange_id)
-            self.exchange = exchange_class({
-                'enableRateLimit': True,
-                'options': {
-                    'defaultType': 'future',  # Use futures market
-                }
-            })
-            logger.info(f"Successfully initialized {exchange_id} exchange")
-        except Exception as e:
-            logger.error(f"Failed to initialize exchange: {e}")
-            raise
+        # The exchange is created on first use, see the exchange property
+        self._exchange = None
+    
+    @property
+    def exchange(self):
+        """
+        Exchange client, created on first use so that ccxt is only imported when data is fetched.
+        
+        Returns:
+            ccxt.Exchange: Exchange client
+        """
+        if self._exchange is None:
+            try:
+                import ccxt
+                exchange_class = getattr(ccxt, self.exchange_id)
+                self._exchange = exchange_class({
+                    'enableRateLimit': True,
+                    'options': {
+                        'defaultType': 'future',  # Use futures market
+                    }
+                })
+                logger.info(f"Successfully initialized {self.exchange_id} exchange")
+            except Exception as e:
+                logger.error(f"Failed to initialize exchange: {e}")
+                raise
+        
+        return self._exchange
     
     def fetch_historical_data(self, start_date, end_date=None):
         """
@@ -134,11 +140,12 @@ class BitcoinDataCollector:
         """
         try:
             logger.info(f"Fetching latest {limit} candles")
-            candles = self.exchange.fetch_ohlcv(
-                symbol=self.symbol,
-                timeframe=self.timeframe,
-                limit=limit
-            )
+            with span('fetch.exchange'):
+                candles = self.exchange.fetch_ohlcv(
+                    symbol=self.symbol,
+                    timeframe=self.timeframe,
+                    limit=limit
+                )
             
             # Convert to DataFrame
             df = pd.DataFrame(candles, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
@@ -148,7 +155,8 @@ class BitcoinDataCollector:
             # Save to file
             current_time = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
             filename = f"{self.data_dir}/latest_{self.symbol.replace('/', '_')}_{self.timeframe}_{current_time}.csv"
-            df.to_csv(filename)
+            with span('fetch.csv_write'):
+                df.to_csv(filename)
             logger.info(f"Saved latest data to {filename}")
             
             return df
@@ -157,6 +165,34 @@ class BitcoinDataCollector:
             logger.error(f"Error fetching latest data: {e}")
             raise
     
+    def fetch_range(self, start, end):
+        """
+        Fetch the candles between two times, e.g. to backfill a gap, without saving them.
+        
+        Args:
+            start (pandas.Timestamp): First candle open time (naive UTC)
+            end (pandas.Timestamp): Last candle open time (naive UTC)
+            
+        Returns:
+            pandas.DataFrame: DataFrame with OHLCV data
+        """
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        step = self.exchange.parse_timeframe(self.timeframe)
+        count = int((end - start).total_seconds() // step) + 1
+        
+        with span('fetch.backfill'):
+            candles = self.exchange.fetch_ohlcv(
+                symbol=self.symbol,
+                timeframe=self.timeframe,
+                since=int(start.timestamp() * 1000),
+                limit=min(count, 1000)
+            )
+        
+        df = pd.DataFrame(candles, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        df.set_index('timestamp', inplace=True)
+        return df.loc[start:end]
+    
     def stream_real_time_data(self, callback=None, interval=60):
         """
         Stream real-time data at specified intervals.
@@ -211,6 +247,8 @@ class BitcoinDataCollector:
             raise
 
 if __name__ == "__main__":
+    setup_logging("data_collector.log")
+    
     # Example usage
     collector = BitcoinDataCollector()
     
@@ -9,6 +9,8 @@ import datetime
 from data_collector import BitcoinDataCollector
 from signal_generator import SignalGenerator
 from indicators import TechnicalIndicators
+from signal_core import SignalCore
+from logging_setup import setup_logging
 
 def debug_signal_generation():
     """Debug the signal generation process."""
@@ -21,21 +23,14 @@ def debug_signal_generation():
     print(f"   Current UTC hour: {current_hour}")
     
     # Check updated time windows
-    time_windows = [
-        (3, 12),   # Early morning: 04:00-13:00 Dutch time
-        (15, 20),  # Extended evening: 16:00-21:00 Dutch time
-        (22, 24),  # Late night part 1: 23:00-00:00 Dutch time
-        (0, 3)     # Late night part 2: 01:00-04:00 Dutch time (extended)
-    ]
-    in_time_window = False
-    for start, end in time_windows:
-        if start <= current_hour < end:
-            in_time_window = True
-            print(f"   ✅ Inside trading window: {start}:00-{end}:00 UTC")
-            break
+    time_window = SignalGenerator.trading_window(current_hour)
+    in_time_window = time_window is not None
+    if in_time_window:
+        start, end = time_window
+        print(f"   ✅ Inside trading window: {start}:00-{end}:00 UTC")
     
     if not in_time_window:
-        print(f"   ❌ Outside trading windows: {time_windows}")
+        print(f"   ❌ Outside trading windows: {SignalGenerator.TIME_WINDOWS}")
         print("   Extended Dutch time windows: 07:00-13:00, 16:00-21:00, 23:00-03:00")
     
     print()
@@ -80,23 +75,31 @@ def debug_signal_generation():
     try:
         signal_generator = SignalGenerator()
         
-        # Test new scoring system
-        buy_score = signal_generator._calculate_buy_score(data_with_indicators)
-        sell_score = signal_generator._calculate_sell_score(data_with_indicators)
+        # Evaluate the scoring conditions with the shared signal core
+        buy_conditions, sell_conditions = SignalCore.score_conditions(SignalCore.extract(data_with_indicators))
+        buy_score = int(buy_conditions[-1].sum())
+        sell_score = int(sell_conditions[-1].sum())
         
         print(f"   Buy score: {buy_score}/5")
         print(f"   Sell score: {sell_score}/5")
         
         # Show detailed scoring breakdown
+        volume_avg = data_with_indicators['volume'].rolling(window=10).mean().iloc[-1]
+        buy_details = [
+            f"RSI: {latest['rsi']:.2f}",
+            f"price: ${latest['close']:.2f}, lower: ${latest['bb_lower']:.2f}",
+            f"curr: {latest['macd']:.4f}, prev: {previous['macd']:.4f}",
+            f"curr: {latest['stoch_k']:.2f}, prev: {previous['stoch_k']:.2f}",
+            f"curr: {latest['volume']:.0f}, avg*1.2: {volume_avg*1.2:.0f}"
+        ]
+        
         print("\n   Buy scoring breakdown:")
-        print(f"   - RSI improving from oversold (<40): {latest['rsi'] < 40 and latest['rsi'] > previous['rsi']} (RSI: {latest['rsi']:.2f})")
-        print(f"   - Price near BB lower (≤101% of lower): {latest['close'] <= latest['bb_lower'] * 1.01} (price: ${latest['close']:.2f}, lower: ${latest['bb_lower']:.2f})")
-        print(f"   - MACD improving: {latest['macd'] > previous['macd']} (curr: {latest['macd']:.4f}, prev: {previous['macd']:.4f})")
-        print(f"   - Stoch improving from oversold: {latest['stoch_k'] < 30 and latest['stoch_k'] > previous['stoch_k']} (curr: {latest['stoch_k']:.2f}, prev: {previous['stoch_k']:.2f})")
+        for label, met, detail in zip(SignalCore.SCORE_BUY_CONDITIONS, buy_conditions[-1], buy_details):
+            print(f"   - {label}: {bool(met)} ({detail})")
         
-        volume_avg = data_with_indicators['volume'].rolling(window=10).mean().iloc[-1]
-        volume_condition = latest['volume'] > volume_avg * 1.2
-        print(f"   - Volume above average: {volume_condition} (curr: {latest['volume']:.0f}, avg*1.2: {volume_avg*1.2:.0f})")
+        print("\n   Sell scoring breakdown:")
+        for label, met in zip(SignalCore.SCORE_SELL_CONDITIONS, sell_conditions[-1]):
+            print(f"   - {label}: {bool(met)}")
         
         # Try to generate actual signal
         signal = signal_generator.generate_signal(data)
@@ -111,4 +114,6 @@ def debug_signal_generation():
         traceback.print_exc()
 
 if __name__ == "__main__":
+    setup_logging()
+    
     debug_signal_generation() 
\ No newline at end of file
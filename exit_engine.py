@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Exit Engine Module
+------------------
+This module resolves take-profit/stop-loss exits for arrays of trade entries. For
+every entry it finds the first bar whose high/low crosses the take-profit or the
+stop-loss within the holding horizon, in one NumPy pass over strided windows.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class ExitEngine:
+    """
+    Vectorized first-touch exit resolution.
+    """
+    
+    # Exit reason codes
+    EXPIRY = 0
+    TARGET = 1
+    STOP = -1
+    REASON_LABELS = {EXPIRY: "Expiry", TARGET: "Take profit", STOP: "Stop loss"}
+    
+    # How to resolve a bar that touches both levels
+    AMBIGUITY_POLICIES = ('stop', 'target', 'open')
+    
+    @staticmethod
+    def _forward_windows(values, entries, horizon):
+        """
+        Gather the horizon bars after each entry from a strided view.
+        
+        Windows running past the end of the data are padded with NaN.
+        
+        Args:
+            values (numpy.ndarray): Per-bar values
+            entries (numpy.ndarray): Entry bar indices
+            horizon (int): Number of bars after each entry
+            
+        Returns:
+            numpy.ndarray: Matrix (entries x horizon)
+        """
+        padded = np.concatenate([np.asarray(values, dtype=float), np.full(horizon, np.nan)])
+        return sliding_window_view(padded, horizon)[entries + 1]
+    
+    @staticmethod
+    def _first_true(mask):
+        """
+        Column of the first True per row, or the row length if there is none.
+        """
+        return np.where(mask.any(axis=1), mask.argmax(axis=1), mask.shape[1])
+    
+    @staticmethod
+    def resolve_exits(high, low, close, entries, sides, take_profit, stop_loss, max_bars,
+                      ambiguity='stop', open_=None):
+        """
+        Resolve the exit of every entry.
+        
+        Entries are filled at the close of their entry bar. Bars entry+1 to
+        entry+max_bars are searched for the first touch of either level; trades
+        without a touch exit at the close of their last bar (or of the last bar
+        of the data when the horizon runs past the end).
+        
+        Args:
+            high (numpy.ndarray): High prices
+            low (numpy.ndarray): Low prices
+            close (numpy.ndarray): Close prices
+            entries (numpy.ndarray): Entry bar indices
+            sides (numpy.ndarray): +1 for long, -1 for short, per entry
+            take_profit (numpy.ndarray): Take-profit price per entry
+            stop_loss (numpy.ndarray): Stop-loss price per entry
+            max_bars (int or numpy.ndarray): Maximum holding bars, scalar or per entry
+            ambiguity (str): Policy for a bar touching both levels: 'stop' (stop-loss first),
+                'target' (take-profit first) or 'open' (level nearer the bar's open first)
+                (default: 'stop')
+            open_ (numpy.ndarray, optional): Open prices, required for the 'open' policy
+            
+        Returns:
+            dict: 'exit_bars', 'exit_prices' and 'reasons' (TARGET/STOP/EXPIRY) arrays
+        """
+        if ambiguity not in ExitEngine.AMBIGUITY_POLICIES:
+            raise ValueError(f"Unknown ambiguity policy '{ambiguity}', expected one of {ExitEngine.AMBIGUITY_POLICIES}")
+        if ambiguity == 'open' and open_ is None:
+            raise ValueError("The 'open' ambiguity policy needs open prices")
+        
+        entries = np.asarray(entries, dtype=np.int64)
+        n = len(close)
+        count = len(entries)
+        if count == 0:
+            empty = np.array([], dtype=np.int64)
+            return {'exit_bars': empty, 'exit_prices': np.array([], dtype=float), 'reasons': empty}
+        
+        is_long = (np.asarray(sides) > 0)[:, None]
+        take_profit = np.broadcast_to(np.asarray(take_profit, dtype=float), (count,))[:, None]
+        stop_loss = np.broadcast_to(np.asarray(stop_loss, dtype=float), (count,))[:, None]
+        
+        # Per-entry horizon, cut at the end of the data
+        max_bars = np.broadcast_to(np.asarray(max_bars, dtype=np.int64), (count,))
+        bars = np.minimum(max_bars, n - 1 - entries)
+        horizon = int(max_bars.max())
+        in_horizon = np.arange(horizon) < bars[:, None]
+        
+        window_high = ExitEngine._forward_windows(high, entries, horizon)
+        window_low = ExitEngine._forward_windows(low, entries, horizon)
+        
+        with np.errstate(invalid='ignore'):
+            tp_hit = np.where(is_long, window_high >= take_profit, window_low <= take_profit) & in_horizon
+            sl_hit = np.where(is_long, window_low <= stop_loss, window_high >= stop_loss) & in_horizon
+        
+        tp_first = ExitEngine._first_true(tp_hit)
+        sl_first = ExitEngine._first_true(sl_hit)
+        
+        # Both levels touched on the same bar: apply the ambiguity policy
+        same_bar = (tp_first == sl_first) & (tp_first < horizon)
+        if ambiguity == 'stop':
+            target_wins_tie = np.zeros(count, dtype=bool)
+        elif ambiguity == 'target':
+            target_wins_tie = np.ones(count, dtype=bool)
+        else:
+            tie_bar = entries + 1 + np.minimum(tp_first, horizon - 1)
+            bar_open = np.asarray(open_, dtype=float)[np.minimum(tie_bar, n - 1)]
+            target_wins_tie = np.abs(bar_open - take_profit[:, 0]) < np.abs(bar_open - stop_loss[:, 0])
+        
+        targeted = (tp_first < sl_first) | (same_bar & target_wins_tie)
+        stopped = ~targeted & (sl_first < horizon)
+        
+        reasons = np.where(targeted, ExitEngine.TARGET, np.where(stopped, ExitEngine.STOP, ExitEngine.EXPIRY))
+        exit_offsets = np.where(targeted, tp_first, np.where(stopped, sl_first, np.maximum(bars, 1) - 1))
+        exit_bars = np.minimum(entries + 1 + exit_offsets, n - 1)
+        exit_prices = np.where(
+            targeted, take_profit[:, 0],
+            np.where(stopped, stop_loss[:, 0], np.asarray(close, dtype=float)[exit_bars])
+        )
+        
+        return {'exit_bars': exit_bars, 'exit_prices': exit_prices, 'reasons': reasons}
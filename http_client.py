@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+HTTP Client Module
+------------------
+This module is the shared HTTP layer of the market data sources and the
+Telegram notifier. One requests session per process keeps connections alive in
+a pool, every request has a connect and read timeout, failures are retried with
+jittered exponential backoff, response bodies are capped in size, and calls to
+each host are spaced by a per-host rate limit. Base URLs stay configurable, so
+the callers can be pointed at a local stub server.
+"""
+
+import os
+import time
+import random
+import threading
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+import logging
+
+logger = logging.getLogger("HttpClient")
+
+# Requests per second allowed per host; hosts not listed are not limited
+DEFAULT_RATE_LIMITS = {
+    'api.coingecko.com': 0.5,  # Public API allows about 30 calls per minute
+    'min-api.cryptocompare.com': 2.0,
+    'api.telegram.org': 20.0  # Bot API allows about 30 messages per second
+}
+
+# Responses worth retrying: rate limited or a transient server error
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Methods that can be repeated after a request may have reached the server
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+class ResponseTooLarge(requests.RequestException):
+    """
+    Raised when a response body exceeds the client's size limit.
+    """
+
+
+class RateLimiter:
+    """
+    Thread-safe minimum spacing between calls to each host.
+    """
+    
+    def __init__(self, rates=None):
+        """
+        Initialize the limiter.
+        
+        Args:
+            rates (dict, optional): Host to requests per second (default: DEFAULT_RATE_LIMITS)
+        """
+        self.rates = dict(DEFAULT_RATE_LIMITS if rates is None else rates)
+        self._next_slot = {}
+        self._lock = threading.Lock()
+    
+    def wait(self, host):
+        """
+        Block until a call to the host is allowed and reserve its slot.
+        
+        Args:
+            host (str): Host name
+            
+        Returns:
+            float: Seconds waited
+        """
+        rate = self.rates.get(host)
+        if not rate:
+            return 0.0
+        
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + 1.0 / rate
+        
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class HttpClient:
+    """
+    Pooled, retrying HTTP client with timeouts, size limits and per-host rate limits.
+    """
+    
+    def __init__(self, timeout=(5, 30), retries=3, backoff=0.5, max_backoff=30, max_bytes=10 * 2**20,
+                 rate_limits=None, pool_size=10):
+        """
+        Initialize the client.
+        
+        Args:
+            timeout (float or tuple): Connect and read timeout in seconds (default: (5, 30))
+            retries (int): Retries after the first attempt (default: 3)
+            backoff (float): Base of the exponential backoff in seconds (default: 0.5)
+            max_backoff (float): Longest wait between attempts, also for Retry-After (default: 30)
+            max_bytes (int): Largest accepted response body (default: 10 MB)
+            rate_limits (dict, optional): Host to requests per second (default: DEFAULT_RATE_LIMITS)
+            pool_size (int): Kept-alive connections per host (default: 10)
+        """
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_bytes = max_bytes
+        self.rate_limiter = RateLimiter(rate_limits)
+        
+        # Retries are handled here, so the adapter does not retry on its own
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    
+    def close(self):
+        """
+        Close the pooled connections.
+        """
+        self.session.close()
+    
+    def _delay(self, attempt, response=None):
+        """
+        Seconds to wait before a retry: Retry-After if the server sent it, else full jitter.
+        """
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+    
+    @staticmethod
+    def _never_sent(error):
+        """
+        Whether a failed request certainly did not reach the server (no connection was made).
+        """
+        if isinstance(error, requests.ConnectTimeout):
+            return True
+        reason = getattr(error.args[0], 'reason', None) if error.args else None
+        return isinstance(reason, NewConnectionError)
+    
+    def _read(self, response):
+        """
+        Read the body of a streamed response, enforcing the size limit.
+        """
+        length = response.headers.get('Content-Length')
+        if length and length.isdigit() and int(length) > self.max_bytes:
+            response.close()
+            raise ResponseTooLarge(f"Response of {length} bytes from {response.url} exceeds {self.max_bytes} bytes",
+                                   response=response)
+        
+        chunks, size = [], 0
+        for chunk in response.iter_content(chunk_size=65536):
+            size += len(chunk)
+            if size > self.max_bytes:
+                response.close()
+                raise ResponseTooLarge(f"Response from {response.url} exceeds {self.max_bytes} bytes",
+                                       response=response)
+            chunks.append(chunk)
+        
+        # Later calls to .content, .text and .json() use the body read here
+        response._content = b''.join(chunks)
+        return response
+    
+    def request(self, method, url, **kwargs):
+        """
+        Send a request, retrying connection failures, timeouts and retryable statuses.
+        
+        Requests that may have reached the server (read timeouts, dropped connections)
+        are only retried for idempotent methods, so a message is never posted twice.
+        
+        Args:
+            method (str): HTTP method
+            url (str): Absolute URL
+            **kwargs: Passed to requests.Session.request (params, json, data, headers, timeout)
+            
+        Returns:
+            requests.Response: Final response, whatever its status
+            
+        Raises:
+            requests.RequestException: When the last attempt failed or the body is too large
+        """
+        method = method.upper()
+        host = urlsplit(url).hostname
+        kwargs.setdefault('timeout', self.timeout)
+        
+        for attempt in range(self.retries + 1):
+            self.rate_limiter.wait(host)
+            last_attempt = attempt == self.retries
+            
+            try:
+                response = self._read(self.session.request(method, url, stream=True, **kwargs))
+            except ResponseTooLarge:
+                raise
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if last_attempt or (method not in IDEMPOTENT_METHODS and not self._never_sent(e)):
+                    raise
+                delay = self._delay(attempt)
+                logger.warning(f"{method} {host} failed ({type(e).__name__}), retrying in {delay:.2f}s "
+                               f"({attempt + 1}/{self.retries})")
+            else:
+                if response.status_code not in RETRY_STATUSES or last_attempt:
+                    return response
+                if response.status_code != 429 and method not in IDEMPOTENT_METHODS:
+                    return response
+                delay = self._delay(attempt, response)
+                logger.warning(f"{method} {host} returned {response.status_code}, retrying in {delay:.2f}s "
+                               f"({attempt + 1}/{self.retries})")
+            
+            time.sleep(delay)
+    
+    def get(self, url, **kwargs):
+        """
+        Send a GET request; see request.
+        """
+        return self.request('GET', url, **kwargs)
+    
+    def post(self, url, **kwargs):
+        """
+        Send a POST request; see request.
+        """
+        return self.request('POST', url, **kwargs)
+    
+    def get_json(self, url, params=None, **kwargs):
+        """
+        GET a JSON document.
+        
+        Args:
+            url (str): Absolute URL
+            params (dict, optional): Query parameters
+            
+        Returns:
+            dict or list: Decoded body
+            
+        Raises:
+            requests.HTTPError: On an error status after the retries
+        """
+        response = self.get(url, params=params, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+def get_client():
+    """
+    Get the process-wide HTTP client, creating it on first use.
+    
+    Returns:
+        HttpClient: Shared client
+    """
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
+
+def _reset_client():
+    """
+    Drop the shared client in a forked child; pooled sockets must not be shared across processes.
+    """
+    global _default_client, _default_lock
+    _default_client = None
+    _default_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_client)
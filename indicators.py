@@ -8,16 +8,8 @@ This module implements the technical indicators used in the Bitcoin trading sign
 import numpy as np
 import pandas as pd
 import logging
+from candle_patterns import CandlePatterns
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("indicators.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger("TechnicalIndicators")
 
 class TechnicalIndicators:
@@ -25,6 +17,10 @@ class TechnicalIndicators:
     Class to calculate various technical indicators for the signal generation system.
     """
     
+    # Fibonacci retracement ratios and the matching indicator column names
+    FIBONACCI_RATIOS = (0.0, 0.236, 0.382, 0.5, 0.618, 0.786, 1.0)
+    FIBONACCI_COLUMNS = ['fib_0', 'fib_236', 'fib_382', 'fib_500', 'fib_618', 'fib_786', 'fib_1000']
+    
     @staticmethod
     def calculate_rsi(data, period=14):
         """
@@ -136,12 +132,12 @@ class TechnicalIndicators:
         volume_profile = pd.DataFrame(index=range(len(bins) - 1))
         volume_profile['price_low'] = bins[:-1]
         volume_profile['price_high'] = bins[1:]
-        volume_profile['volume'] = 0
         
-        for i in range(len(data)):
-            for j in range(len(bins) - 1):
-                if data['low'].iloc[i] <= bins[j+1] and data['high'].iloc[i] >= bins[j]:
-                    volume_profile.loc[j, 'volume'] += data['volume'].iloc[i]
+        # A candle adds its volume to every bin its high-low range overlaps
+        low = data['low'].to_numpy()[:, None]
+        high = data['high'].to_numpy()[:, None]
+        overlaps = (low <= bins[1:]) & (high >= bins[:-1])
+        volume_profile['volume'] = data['volume'].to_numpy(dtype=float) @ overlaps
         
         # Calculate support/resistance levels
         volume_profile['is_support_resistance'] = volume_profile['volume'] > volume_profile['volume'].mean()
@@ -186,35 +182,73 @@ class TechnicalIndicators:
         
         return conversion_line, base_line, leading_span_a, leading_span_b, lagging_span
     
+    @staticmethod
+    def calculate_fibonacci_levels(data, window=100):
+        """
+        Calculate per-bar Fibonacci Retracement levels.
+        
+        Each row only uses the swing high/low of the trailing window ending at
+        that bar, so the levels contain no lookahead. The rolling extrema are
+        computed once for the whole frame.
+        
+        Args:
+            data (pandas.DataFrame): DataFrame with price data
+            window (int): Window size for high/low calculation (default: 100)
+            
+        Returns:
+            pandas.DataFrame: One column per Fibonacci level (N x 7)
+        """
+        high = data['high'].rolling(window=window).max().to_numpy(dtype=float)
+        low = data['low'].rolling(window=window).min().to_numpy(dtype=float)
+        
+        # Broadcast the ratios against the swing range of every bar
+        ratios = np.array(TechnicalIndicators.FIBONACCI_RATIOS)
+        levels = low[:, None] + (high - low)[:, None] * ratios[None, :]
+        levels[:, 0] = low
+        levels[:, -1] = high
+        
+        return pd.DataFrame(levels, index=data.index, columns=TechnicalIndicators.FIBONACCI_COLUMNS)
+    
+    @staticmethod
+    def fibonacci_proximity(close, levels, tolerance=0.01):
+        """
+        Check per bar whether the close is near any Fibonacci level.
+        
+        Args:
+            close (array-like): Close prices (N)
+            levels (array-like): Fibonacci levels from calculate_fibonacci_levels (N x 7)
+            tolerance (float): Maximum relative distance to a level (default: 0.01)
+            
+        Returns:
+            numpy.ndarray: Boolean mask (N), False where levels are not available yet
+        """
+        close = np.asarray(close, dtype=float)[:, None]
+        levels = np.asarray(levels, dtype=float)
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            near = np.abs(close - levels) / close < tolerance
+        
+        return near.any(axis=1)
+    
     @staticmethod
     def calculate_fibonacci_retracement(data, window=100):
         """
-        Calculate Fibonacci Retracement levels.
+        Calculate Fibonacci Retracement levels for the latest bar.
         
         Args:
             data (pandas.DataFrame): DataFrame with price data
             window (int): Window size for high/low calculation (default: 100)
             
         Returns:
-            pandas.DataFrame: Fibonacci retracement levels
+            pandas.Series: Fibonacci retracement levels
         """
-        # Find swing high and swing low in the window
-        high = data['high'].rolling(window=window).max().iloc[-1]
-        low = data['low'].rolling(window=window).min().iloc[-1]
-        
-        # Calculate Fibonacci levels
-        diff = high - low
-        levels = {
-            '0.0': low,
-            '0.236': low + 0.236 * diff,
-            '0.382': low + 0.382 * diff,
-            '0.5': low + 0.5 * diff,
-            '0.618': low + 0.618 * diff,
-            '0.786': low + 0.786 * diff,
-            '1.0': high
-        }
-        
-        return pd.Series(levels)
+        # Only the trailing window is needed for the latest levels
+        levels = TechnicalIndicators.calculate_fibonacci_levels(data.iloc[-window:], window=window)
+        
+        return pd.Series(
+            levels.iloc[-1].to_numpy(),
+            index=[str(ratio) for ratio in TechnicalIndicators.FIBONACCI_RATIOS]
+        )
     
     @staticmethod
     def calculate_atr(data, period=14):
@@ -272,6 +306,15 @@ class TechnicalIndicators:
         # Ichimoku Cloud
         df['ichimoku_conversion'], df['ichimoku_base'], df['ichimoku_span_a'], df['ichimoku_span_b'], df['ichimoku_lagging'] = TechnicalIndicators.calculate_ichimoku_cloud(df)
         
+        # Fibonacci retracement levels (per bar) and proximity of the close to any level
+        fib_levels = TechnicalIndicators.calculate_fibonacci_levels(df)
+        for column in TechnicalIndicators.FIBONACCI_COLUMNS:
+            df[column] = fib_levels[column]
+        df['fib_near'] = TechnicalIndicators.fibonacci_proximity(df['close'], fib_levels)
+        
+        # Candlestick pattern masks
+        CandlePatterns.add_pattern_columns(df)
+        
         logger.info("All indicators calculated successfully")
         
         return df
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Logging Setup Module
+--------------------
+This module configures logging once per process. Library modules only create
+their named loggers; the entry point that runs (a CLI main or a module's
+__main__ block) calls setup_logging with its own log file, so importing a module
+no longer installs handlers or opens log files.
+
+Logging calls only put the record on a queue. A QueueListener thread formats the
+records and writes them to the console and to a rotating log file of JSON lines,
+so disk and console I/O never block the scan loop. Levels can be set per logger,
+also through the LOG_LEVEL and LOG_LEVELS environment variables. Forked worker
+processes log to the console only; the log file belongs to the parent process.
+"""
+
+import os
+import json
+import queue
+import atexit
+import logging
+import logging.handlers
+from datetime import datetime
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Default size-based rotation of the log file
+MAX_BYTES = 10 * 2**20
+BACKUP_COUNT = 5
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_configured = False
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats a record as one JSON object per line, including fields passed through `extra`.
+    """
+    
+    def format(self, record):
+        document = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'line': record.lineno,
+            'thread': record.threadName
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            document['exception'] = record.exc_text
+        if record.stack_info:
+            document['stack'] = record.stack_info
+        
+        document.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+        return json.dumps(document, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueues records with their message merged and the traceback rendered, so the
+    listener can format them as text or JSON after the caller moved on.
+    """
+    
+    def prepare(self, record):
+        # The record is created per call, so it is updated in place instead of copied
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def parse_levels(spec):
+    """
+    Parse per-logger levels such as 'BitcoinDataCollector=WARNING,TelegramNotifier=DEBUG'.
+    
+    Args:
+        spec (str): Comma-separated logger=level pairs
+        
+    Returns:
+        dict: Logger name to level name
+    """
+    levels = {}
+    for item in filter(None, (part.strip() for part in (spec or '').split(','))):
+        name, _, level = item.partition('=')
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+def setup_logging(log_file=None, level=logging.INFO, levels=None, json_console=None,
+                  max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT, when=None):
+    """
+    Configure queued logging to the console and an optional rotating JSON-lines log file.
+    
+    Only the first call in a process takes effect, so an entry point that imports
+    another entry point keeps its own log file. LOG_LEVEL overrides the root level,
+    LOG_LEVELS adds per-logger levels and LOG_JSON=1 switches the console to JSON.
+    
+    Args:
+        log_file (str, optional): Log file, opened on the first record (default: console only)
+        level (int or str): Root log level (default: logging.INFO)
+        levels (dict, optional): Logger name to level, e.g. {'BitcoinDataCollector': 'WARNING'}
+        json_console (bool, optional): Write JSON instead of text to the console (default: LOG_JSON)
+        max_bytes (int): Rotate the log file at this size; 0 disables (default: 10 MB)
+        backup_count (int): Rotated files kept (default: 5)
+        when (str, optional): Rotate by time instead of size, e.g. 'midnight' or 'H'
+        
+    Returns:
+        bool: True if this call configured logging
+    """
+    global _configured, _listener
+    if _configured:
+        return False
+    
+    if json_console is None:
+        json_console = os.environ.get('LOG_JSON', '').lower() in ('1', 'true', 'yes')
+    
+    console = logging.StreamHandler()
+    console.setFormatter(JsonFormatter() if json_console else logging.Formatter(LOG_FORMAT))
+    handlers = [console]
+    
+    if log_file:
+        if when:
+            file_handler = logging.handlers.TimedRotatingFileHandler(
+                log_file, when=when, backupCount=backup_count, delay=True)
+        else:
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_file, maxBytes=max_bytes, backupCount=backup_count, delay=True)
+        file_handler.setFormatter(JsonFormatter())
+        handlers.insert(0, file_handler)
+    
+    root = logging.getLogger()
+    root.setLevel(os.environ.get('LOG_LEVEL', '').upper() or level)
+    for name, logger_level in {**(levels or {}), **parse_levels(os.environ.get('LOG_LEVELS'))}.items():
+        logging.getLogger(name).setLevel(logger_level)
+    
+    records = queue.SimpleQueue()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(_QueueHandler(records))
+    
+    _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    
+    # A forked worker has no listener thread; it writes to the console directly
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=_log_directly)
+    
+    _configured = True
+    return True
+
+def _log_directly():
+    """
+    Replace the queue handler by the console handler in a forked child process.
+    
+    The rotating file handler is not handed to the child: each process would
+    rotate the shared file on its own and rename it under its siblings and the
+    parent's listener, losing records or splitting them across backups.
+    """
+    global _listener
+    if _listener is None:
+        return
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    for handler in _listener.handlers:
+        if not isinstance(handler, logging.FileHandler):
+            root.addHandler(handler)
+    _listener = None
+
+def shutdown_logging():
+    """
+    Write all queued records and stop the listener thread.
+    """
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
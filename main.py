@@ -15,16 +15,9 @@ from data_collector import BitcoinDataCollector
 from indicators import TechnicalIndicators
 from signal_generator import SignalGenerator
 from telegram_notifier import TelegramNotifier
+from tracing import span, traced, get_tracker
+from logging_setup import setup_logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("bitcoin_signals.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger("BitcoinSignals")
 
 class BitcoinSignalSystem:
@@ -53,6 +46,7 @@ class BitcoinSignalSystem:
         
         logger.info("Bitcoin Signal System initialized")
     
+    @traced('bitcoin.check')
     def check_for_signals(self):
         """
         Check for trading signals and send notifications.
@@ -61,15 +55,19 @@ class BitcoinSignalSystem:
         
         try:
             # Fetch latest data
-            data = self.data_collector.fetch_latest_data(limit=100)
+            with span('bitcoin.fetch'):
+                data = self.data_collector.fetch_latest_data(limit=100)
             
             # Generate signal
-            signal = self.signal_generator.generate_signal(data)
+            with span('bitcoin.generate'):
+                signal = self.signal_generator.generate_signal(data)
             
             # Send notification if signal generated
             if signal:
-                self.signal_generator.save_signal(signal)
-                self.telegram_notifier.send_signal_notification(signal)
+                with span('bitcoin.save'):
+                    self.signal_generator.save_signal(signal)
+                with span('bitcoin.deliver'):
+                    self.telegram_notifier.send_signal_notification(signal)
                 logger.info(f"Generated and sent {signal['type']} signal")
             else:
                 logger.info("No signal generated")
@@ -127,26 +125,36 @@ def main():
     """
     Main entry point.
     """
+    setup_logging("bitcoin_signals.log")
+    
     parser = argparse.ArgumentParser(description='Bitcoin Trading Signal System')
     parser.add_argument('--test', action='store_true', help='Run in test mode')
     parser.add_argument('--backtest', action='store_true', help='Run backtesting')
     parser.add_argument('--check-now', action='store_true', help='Check for signals immediately')
+    parser.add_argument('--trace', action='store_true', help='Record per-stage latencies of the signal pipeline')
+    parser.add_argument('--trace-file', default='metrics/latency.json', help='Latency metrics file (default: metrics/latency.json)')
     args = parser.parse_args()
     
+    if args.trace:
+        get_tracker().configure(enabled=True, export_path=args.trace_file)
+    
     system = BitcoinSignalSystem()
     
-    if args.test:
-        logger.info("Running in test mode")
-        system.check_for_signals()
-    elif args.backtest:
-        logger.info("Running backtesting")
-        # This would call a backtesting module
-        print("Backtesting not implemented yet")
-    elif args.check_now:
-        logger.info("Checking for signals immediately")
-        system.check_for_signals()
-    else:
-        system.run()
+    try:
+        if args.test:
+            logger.info("Running in test mode")
+            system.check_for_signals()
+        elif args.backtest:
+            logger.info("Running backtesting")
+            # This would call a backtesting module
+            print("Backtesting not implemented yet")
+        elif args.check_now:
+            logger.info("Checking for signals immediately")
+            system.check_for_signals()
+        else:
+            system.run()
+    finally:
+        get_tracker().export()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Metrics Server Module
+---------------------
+This module exposes the state of a running ScalpingSystem over HTTP. A
+ThreadingHTTPServer on a daemon thread serves Prometheus text-format metrics on
+/metrics and a JSON health document on /health, so the scan loop is never
+blocked by a scrape. Handlers only read counters the scan loop already keeps.
+"""
+
+import os
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from tracing import get_tracker
+import logging
+
+logger = logging.getLogger("MetricsServer")
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """
+    Request handler serving /metrics, /health and / for the owning MetricsServer.
+    """
+    
+    metrics_server = None
+    
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        
+        if path == '/metrics':
+            body = self.metrics_server.prometheus().encode('utf-8')
+            self._respond(200, body, 'text/plain; version=0.0.4; charset=utf-8')
+        elif path in ('/', '/health'):
+            status = self.metrics_server.status()
+            code = 503 if status['status'] == 'stalled' else 200
+            self._respond(code, json.dumps(status, indent=2).encode('utf-8'), 'application/json')
+        else:
+            self._respond(404, b'Not found\n', 'text/plain; charset=utf-8')
+    
+    def _respond(self, code, body, content_type):
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        # Scrapes arrive every few seconds; keep them out of the info log
+        logger.debug(format % args)
+
+
+class MetricsServer:
+    """
+    Embedded HTTP server for the health and metrics of a ScalpingSystem.
+    """
+    
+    def __init__(self, system, host='0.0.0.0', port=None, stall_after=None):
+        """
+        Initialize the server.
+        
+        Args:
+            system (ScalpingSystem): Running system whose state is served
+            host (str): Interface to bind (default: all interfaces)
+            port (int, optional): Port to bind (default: PORT environment variable or 8080)
+            stall_after (float, optional): Seconds without a completed fetch or cycle after which
+                the system is reported stalled (default: three check intervals, at least 120)
+        """
+        self.system = system
+        self.host = host
+        self.port = int(port if port is not None else os.environ.get('PORT', 8080))
+        self.stall_after = stall_after or max(3 * system.check_interval, 120)
+        self._httpd = None
+        self._thread = None
+    
+    def start(self):
+        """
+        Bind the port and serve requests on a daemon thread.
+        
+        Returns:
+            int: Bound port
+        """
+        handler = type('MetricsHandler', (_MetricsHandler,), {'metrics_server': self})
+        self._httpd = ThreadingHTTPServer((self.host, self.port), handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='metrics-server', daemon=True)
+        self._thread.start()
+        
+        logger.info(f"Metrics server listening on {self.host}:{self.port} (/metrics, /health)")
+        return self.port
+    
+    def stop(self):
+        """
+        Stop serving and release the port.
+        """
+        if self._httpd is None:
+            return
+        
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join(timeout=5)
+        self._httpd = None
+        self._thread = None
+    
+    def _age(self, moment, now):
+        """
+        Seconds elapsed since a moment, or None if it never happened.
+        """
+        return None if moment is None else (now - moment).total_seconds()
+    
+    def status(self):
+        """
+        Health and status document of the system.
+        
+        Returns:
+            dict: Status ('ok', 'starting' before the first cycle, 'stalled' when the scan loop,
+                or the feed while trading is allowed, has not progressed within stall_after),
+                counters and timings
+        """
+        system = self.system
+        now = system.clock.now()
+        feed_age = self._age(system.last_fetch_time, now)
+        cycle_age = self._age(system.last_cycle_time, now)
+        uptime = self._age(system.started_at, now)
+        circuit_breaker = system.consecutive_losses >= 3
+        
+        # Cycles skip the fetch once the daily limit or the circuit breaker stops trading
+        fetching = system.signals_sent_today < system.max_daily_signals and not circuit_breaker
+        feed_stale = fetching and (feed_age is None or feed_age > self.stall_after)
+        
+        if system.last_cycle_time is None:
+            status = 'stalled' if uptime > self.stall_after else 'starting'
+        elif cycle_age > self.stall_after or feed_stale:
+            status = 'stalled'
+        else:
+            status = 'ok'
+        
+        return {
+            'status': status,
+            'time': now.isoformat(),
+            'uptime_seconds': uptime,
+            'check_interval': system.check_interval,
+            'cycles': system.cycles,
+            'cycle_errors': system.cycle_errors,
+            'last_cycle': system.last_cycle_time.isoformat() if system.last_cycle_time else None,
+            'last_cycle_seconds': system.last_cycle_seconds,
+            'last_fetch': system.last_fetch_time.isoformat() if system.last_fetch_time else None,
+            'feed_age_seconds': feed_age,
+            'signals_sent_today': system.signals_sent_today,
+            'max_daily_signals': system.max_daily_signals,
+            'consecutive_losses': system.consecutive_losses,
+            'circuit_breaker_active': circuit_breaker,
+            'active_signals': len(system.active_signals),
+            'completed_signals': system.signal_history.lifetime.count
+        }
+    
+    def prometheus(self):
+        """
+        Render the system state and stage latencies in the Prometheus text format.
+        
+        Returns:
+            str: Metrics exposition
+        """
+        system = self.system
+        status = self.status()
+        lines = []
+        
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                if value is not None:
+                    lines.append(f"{name}{labels} {float(value)!r}")
+        
+        history = system.signal_history
+        rolling = history.stats(now=system.clock.now())
+        windows = (f"last_{history.last_n}", f"last_{history.last_hours:g}h")
+        
+        metric('scalping_up', 'gauge', 'Whether the scan loop is healthy (0 when stalled).',
+               [('', status['status'] != 'stalled')])
+        metric('scalping_cycles_total', 'counter', 'Completed market scan cycles.',
+               [('', system.cycles)])
+        metric('scalping_cycle_errors_total', 'counter', 'Scan cycles that ended in an error.',
+               [('', system.cycle_errors)])
+        metric('scalping_signals_sent_today', 'gauge', 'Signals sent since the start of the trading day.',
+               [('', system.signals_sent_today)])
+        metric('scalping_consecutive_losses', 'gauge', 'Current streak of losing signals.',
+               [('', system.consecutive_losses)])
+        metric('scalping_circuit_breaker_active', 'gauge', 'Whether the loss circuit breaker is active.',
+               [('', status['circuit_breaker_active'])])
+        metric('scalping_active_signals', 'gauge', 'Signals awaiting their outcome.',
+               [('', status['active_signals'])])
+        metric('scalping_signal_outcomes_total', 'counter', 'Completed signals by outcome.',
+               [('{outcome="win"}', history.lifetime.wins),
+                ('{outcome="loss"}', history.lifetime.count - history.lifetime.wins)])
+        metric('scalping_win_rate', 'gauge', 'Win rate of completed signals per window.',
+               [(f'{{window="{window}"}}', rolling[window]['win_rate']) for window in ('lifetime',) + windows])
+        metric('scalping_pnl_percent', 'gauge', 'Summed P&L of completed signals per window, in percent.',
+               [(f'{{window="{window}"}}', rolling[window]['pnl_percent']) for window in ('lifetime',) + windows])
+        metric('scalping_last_fetch_timestamp_seconds', 'gauge', 'Unix time of the last successful market data fetch.',
+               [('', system.last_fetch_time.timestamp() if system.last_fetch_time else None)])
+        metric('scalping_feed_age_seconds', 'gauge', 'Seconds since the last successful market data fetch.',
+               [('', status['feed_age_seconds'])])
+        metric('scalping_last_cycle_duration_seconds', 'gauge', 'Duration of the last scan cycle.',
+               [('', system.last_cycle_seconds)])
+        metric('scalping_uptime_seconds', 'gauge', 'Seconds since the system started.',
+               [('', status['uptime_seconds'])])
+        
+        # Continuity of a GapFillingCollector's candle buffer
+        buffer = getattr(system.data_collector, 'buffer', None)
+        if buffer is not None:
+            metric('scalping_candles_missing', 'gauge', 'Minutes missing from the candle buffer, awaiting backfill.',
+                   [('', len(buffer.missing))])
+            metric('scalping_candle_gaps_total', 'counter', 'Jumps over missing minutes seen in the candle feed.',
+                   [('', buffer.gaps_detected)])
+            metric('scalping_candle_duplicates_total', 'counter', 'Closed candles received again.',
+                   [('', buffer.duplicates)])
+            metric('scalping_candle_backfill_requests_total', 'counter', 'Range requests sent to fill gaps.',
+                   [('', system.data_collector.backfill_requests)])
+        
+        # Per-source availability of a CompositeDataCollector
+        source_stats = getattr(getattr(system.data_collector, 'collector', system.data_collector), 'source_stats', None)
+        if source_stats:
+            sources = source_stats()
+            hedges, disagreements = sources.pop('hedges'), sources.pop('disagreements')
+            metric('scalping_data_source_requests_total', 'counter', 'Market data requests per source and result.',
+                   [(f'{{source="{name}",result="{result}"}}', value)
+                    for name, counts in sources.items()
+                    for result, value in (('ok', counts['requests'] - counts['failures']), ('error', counts['failures']))])
+            metric('scalping_data_source_served_total', 'counter', 'Market data answers used, per source.',
+                   [(f'{{source="{name}"}}', counts['served']) for name, counts in sources.items()])
+            metric('scalping_data_source_latency_seconds', 'gauge', 'Rolling market data latency quantiles per source.',
+                   [(f'{{source="{name}",quantile="{q}"}}', None if counts[key] is None else counts[key] / 1000)
+                    for name, counts in sources.items() for q, key in ((0.5, 'p50_ms'), (0.95, 'p95_ms'))])
+            metric('scalping_data_hedged_requests_total', 'counter', 'Requests sent to a further source after the p95 latency.',
+                   [('', hedges)])
+            metric('scalping_data_price_disagreements_total', 'counter', 'Cross-validated prices that differed too much.',
+                   [('', disagreements)])
+        
+        stages = get_tracker().summary()
+        if stages:
+            lines.append("# HELP scalping_stage_duration_seconds Pipeline stage latency.")
+            lines.append("# TYPE scalping_stage_duration_seconds histogram")
+            for stage, summary in stages.items():
+                for bucket, count in summary['buckets'].items():
+                    bound = float(bucket[len('le_'):-len('ms')]) / 1000
+                    lines.append(f'scalping_stage_duration_seconds_bucket{{stage="{stage}",le="{bound:g}"}} {count}')
+                lines.append(f'scalping_stage_duration_seconds_bucket{{stage="{stage}",le="+Inf"}} {summary["count"]}')
+                lines.append(f'scalping_stage_duration_seconds_sum{{stage="{stage}"}} {summary["total_s"]!r}')
+                lines.append(f'scalping_stage_duration_seconds_count{{stage="{stage}"}} {summary["count"]}')
+            
+            metric('scalping_stage_latency_seconds', 'gauge', 'Rolling stage latency quantiles.',
+                   [(f'{{stage="{stage}",quantile="{q}"}}', summary[f'p{int(q * 100)}_ms'] / 1000)
+                    for stage, summary in stages.items() for q in (0.5, 0.95, 0.99)])
+        
+        return "\n".join(lines) + "\n"
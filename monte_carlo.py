@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo Robustness Module
+-----------------------------
+This module stress-tests backtest results by resampling the trade P&L sequence
+thousands of times. Each batch of simulated equity paths is a NumPy matrix, and
+large simulation counts are split across worker processes.
+"""
+
+import os
+import json
+import numpy as np
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import logging
+from performance_metrics import PerformanceMetrics
+from trade_log import TradeLog
+from logging_setup import setup_logging
+
+logger = logging.getLogger("MonteCarlo")
+
+def _simulate_batch(pnl, initial_capital, method, block_size, ruin_level, count, seed):
+    """
+    Simulate one batch of equity paths.
+    
+    Args:
+        pnl (numpy.ndarray): Trade P&L sequence
+        initial_capital (float): Starting equity
+        method (str): 'bootstrap', 'shuffle' or 'block'
+        block_size (int): Block length for the block bootstrap
+        ruin_level (float): Equity at or below which a path counts as ruined
+        count (int): Number of paths
+        seed (numpy.random.SeedSequence): Seed for this batch
+        
+    Returns:
+        dict: Per-path metric arrays
+    """
+    rng = np.random.default_rng(seed)
+    n = len(pnl)
+    
+    if method == 'shuffle':
+        indices = np.argsort(rng.random((count, n)), axis=1)
+    elif method == 'block':
+        # Circular block bootstrap keeps short-range dependence between trades
+        blocks = -(-n // block_size)
+        starts = rng.integers(0, n, size=(count, blocks, 1))
+        indices = ((starts + np.arange(block_size)) % n).reshape(count, -1)[:, :n]
+    else:
+        indices = rng.integers(0, n, size=(count, n))
+    
+    paths = pnl[indices]
+    equity = PerformanceMetrics.equity_curve(paths, initial_capital)
+    returns = PerformanceMetrics.trade_returns(equity)
+    
+    return {
+        'total_return': (equity[:, -1] - initial_capital) / initial_capital,
+        'max_drawdown': PerformanceMetrics.max_drawdown(equity),
+        'sharpe_ratio': PerformanceMetrics.sharpe_ratio(returns),
+        'profit_factor': PerformanceMetrics.profit_factor(paths),
+        'ruined': equity.min(axis=1) <= ruin_level
+    }
+
+class MonteCarloAnalyzer:
+    """
+    Vectorized Monte Carlo analysis of a trade P&L sequence.
+    """
+    
+    METHODS = ('bootstrap', 'shuffle', 'block')
+    
+    def __init__(self, n_simulations=10000, method='bootstrap', block_size=10, ruin_threshold=0.5,
+                 batch_size=2000, max_workers=1, seed=42):
+        """
+        Initialize the Monte Carlo analyzer.
+        
+        Args:
+            n_simulations (int): Number of simulated paths (default: 10000)
+            method (str): 'bootstrap' (resample trades with replacement), 'shuffle' (reorder
+                trades) or 'block' (circular block bootstrap) (default: 'bootstrap')
+            block_size (int): Trades per block for the block bootstrap (default: 10)
+            ruin_threshold (float): Loss of initial capital that counts as ruin (default: 0.5)
+            batch_size (int): Paths simulated per NumPy batch (default: 2000)
+            max_workers (int): Worker processes for the batches (default: 1)
+            seed (int): Random seed (default: 42)
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown method '{method}', expected one of {self.METHODS}")
+        
+        self.n_simulations = n_simulations
+        self.method = method
+        self.block_size = block_size
+        self.ruin_threshold = ruin_threshold
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.seed = seed
+    
+    def run(self, trades, initial_capital=10000.0):
+        """
+        Simulate equity paths from backtest trades.
+        
+        Results do not depend on max_workers: every batch has its own seed.
+        
+        Args:
+            trades (TradeLog, list or numpy.ndarray): Trade log, trade dictionaries with a 'pnl'
+                key, or P&L values
+            initial_capital (float): Starting equity (default: 10000.0)
+            
+        Returns:
+            dict: Per-path metric arrays ('total_return', 'max_drawdown', 'sharpe_ratio',
+                'profit_factor', 'ruined')
+        """
+        if isinstance(trades, TradeLog):
+            pnl = trades.column('pnl')
+        else:
+            pnl = np.asarray([t['pnl'] for t in trades] if len(trades) and isinstance(trades[0], dict) else trades,
+                             dtype=float)
+        if len(pnl) == 0:
+            raise ValueError("Monte Carlo analysis needs at least one trade")
+        
+        ruin_level = initial_capital * (1 - self.ruin_threshold)
+        counts = [self.batch_size] * (self.n_simulations // self.batch_size)
+        if self.n_simulations % self.batch_size:
+            counts.append(self.n_simulations % self.batch_size)
+        seeds = np.random.SeedSequence(self.seed).spawn(len(counts))
+        
+        args = [(pnl, initial_capital, self.method, self.block_size, ruin_level, count, seed)
+                for count, seed in zip(counts, seeds)]
+        
+        logger.info(f"Simulating {self.n_simulations} {self.method} paths of {len(pnl)} trades in {len(counts)} batches")
+        
+        if self.max_workers > 1 and len(args) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(args))) as executor:
+                batches = list(executor.map(_simulate_batch, *zip(*args)))
+        else:
+            batches = [_simulate_batch(*a) for a in args]
+        
+        return {key: np.concatenate([b[key] for b in batches]) for key in batches[0]}
+    
+    def summarize(self, simulations, percentiles=(5, 25, 50, 75, 95)):
+        """
+        Summarize simulated metric distributions.
+        
+        Args:
+            simulations (dict): Output of run
+            percentiles (tuple): Percentiles to report (default: (5, 25, 50, 75, 95))
+            
+        Returns:
+            dict: Mean and percentiles per metric, plus the risk of ruin
+        """
+        summary = {
+            'simulations': int(len(simulations['ruined'])),
+            'method': self.method,
+            'risk_of_ruin': float(simulations['ruined'].mean())
+        }
+        
+        for key in ('total_return', 'max_drawdown', 'sharpe_ratio', 'profit_factor'):
+            values = simulations[key]
+            finite = values[np.isfinite(values)]
+            stats = {'mean': float(finite.mean()) if len(finite) else float('nan')}
+            if len(finite):
+                for p, value in zip(percentiles, np.percentile(finite, percentiles)):
+                    stats[f'p{p}'] = float(value)
+            if key == 'profit_factor':
+                stats['infinite_share'] = float(1 - len(finite) / len(values))
+            summary[key] = stats
+        
+        return summary
+    
+    def save_summary(self, summary, results_dir='backtest_results'):
+        """
+        Save a summary as JSON.
+        
+        Args:
+            summary (dict): Output of summarize
+            results_dir (str): Directory to store the file (default: 'backtest_results')
+            
+        Returns:
+            str: Path to the JSON file
+        """
+        os.makedirs(results_dir, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f"{results_dir}/monte_carlo_{timestamp}.json"
+        
+        with open(filename, 'w') as f:
+            json.dump(summary, f, indent=2)
+        
+        logger.info(f"Saved Monte Carlo summary to {filename}")
+        return filename
+
+if __name__ == "__main__":
+    setup_logging("monte_carlo.log")
+    
+    # Example usage on a scalping backtest of synthetic data
+    from synthetic_data import SyntheticDataGenerator
+    from scalping_backtester import ScalpingBacktester
+    
+    data = SyntheticDataGenerator().generate_realistic_price_action(days=30)
+    _, trades, metrics = ScalpingBacktester().run_backtest(data)
+    
+    analyzer = MonteCarloAnalyzer(n_simulations=20000, max_workers=os.cpu_count() or 1)
+    summary = analyzer.summarize(analyzer.run(trades))
+    
+    print(f"Backtest: max drawdown {metrics['max_drawdown']:.2%}, Sharpe {metrics['sharpe_ratio']:.2f}")
+    print(json.dumps(summary, indent=2))
+    analyzer.save_summary(summary)
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Performance Metrics Module
+--------------------------
+This module computes backtest performance metrics from columnar trade arrays.
+Equity, drawdown and return statistics are computed with vectorized NumPy
+operations along the last axis, so one call handles a single trade sequence or a
+matrix of sequences from an optimization sweep or a Monte Carlo run.
+"""
+
+import numpy as np
+from trade_log import TradeLog
+
+
+class PerformanceMetrics:
+    """
+    Vectorized performance metrics over trade P&L arrays.
+    """
+    
+    # Metrics returned for a run without trades
+    EMPTY_METRICS = {
+        'total_trades': 0,
+        'win_rate': 0,
+        'avg_profit': 0,
+        'avg_loss': 0,
+        'profit_factor': 0,
+        'max_drawdown': 0,
+        'sharpe_ratio': 0,
+        'sortino_ratio': 0,
+        'total_return': 0,
+        'annualized_return': 0
+    }
+    
+    @staticmethod
+    def trade_arrays(trades):
+        """
+        Convert trades to columnar arrays.
+        
+        Args:
+            trades (TradeLog or list): Trade log, or trade dictionaries with 'pnl', 'size',
+                'type', 'entry_time' and 'exit_time'
+            
+        Returns:
+            dict: 'pnl', 'size', 'side' (+1 BUY / -1 SELL), 'entry_time' and 'exit_time' arrays
+        """
+        if isinstance(trades, TradeLog):
+            return {
+                'pnl': trades.column('pnl'),
+                'size': trades.column('size'),
+                'side': np.where(trades.column('type') == 'BUY', 1, -1).astype(np.int8),
+                'entry_time': trades.column('entry_time'),
+                'exit_time': trades.column('exit_time')
+            }
+        
+        return {
+            'pnl': np.fromiter((t['pnl'] for t in trades), dtype=float, count=len(trades)),
+            'size': np.fromiter((t['size'] for t in trades), dtype=float, count=len(trades)),
+            'side': np.fromiter((1 if t['type'] == 'BUY' else -1 for t in trades), dtype=np.int8, count=len(trades)),
+            'entry_time': np.array([t['entry_time'] for t in trades], dtype='datetime64[ns]'),
+            'exit_time': np.array([t['exit_time'] for t in trades], dtype='datetime64[ns]')
+        }
+    
+    @staticmethod
+    def equity_curve(pnl, initial_capital):
+        """
+        Equity after each trade, starting with the initial capital.
+        
+        Args:
+            pnl (numpy.ndarray): Trade P&L, 1-D or one sequence per row
+            initial_capital (float): Starting equity
+            
+        Returns:
+            numpy.ndarray: Equity with one more column than pnl
+        """
+        pnl = np.asarray(pnl, dtype=float)
+        start = np.full(pnl.shape[:-1] + (1,), float(initial_capital))
+        return np.concatenate([start, initial_capital + np.cumsum(pnl, axis=-1)], axis=-1)
+    
+    @staticmethod
+    def max_drawdown(equity):
+        """
+        Largest peak-to-trough decline as a fraction of the running peak.
+        
+        Args:
+            equity (numpy.ndarray): Equity curve(s) from equity_curve
+            
+        Returns:
+            numpy.ndarray or float: Maximum drawdown per sequence
+        """
+        peaks = np.maximum.accumulate(equity, axis=-1)
+        return ((peaks - equity) / peaks).max(axis=-1)
+    
+    @staticmethod
+    def trade_returns(equity):
+        """
+        Per-trade returns relative to the equity before each trade.
+        
+        Args:
+            equity (numpy.ndarray): Equity curve(s) from equity_curve
+            
+        Returns:
+            numpy.ndarray: Returns with one fewer column than equity
+        """
+        return np.diff(equity, axis=-1) / equity[..., :-1]
+    
+    @staticmethod
+    def sharpe_ratio(returns, periods=252):
+        """
+        Annualized Sharpe ratio of per-trade returns (0 when returns do not vary).
+        
+        Args:
+            returns (numpy.ndarray): Returns from trade_returns
+            periods (int): Annualization periods (default: 252)
+            
+        Returns:
+            numpy.ndarray or float: Sharpe ratio per sequence
+        """
+        std = returns.std(axis=-1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(std > 0, returns.mean(axis=-1) / std * np.sqrt(periods), 0.0)
+    
+    @staticmethod
+    def sortino_ratio(returns, periods=252):
+        """
+        Annualized Sortino ratio: mean return over downside deviation (0 without downside).
+        
+        Args:
+            returns (numpy.ndarray): Returns from trade_returns
+            periods (int): Annualization periods (default: 252)
+            
+        Returns:
+            numpy.ndarray or float: Sortino ratio per sequence
+        """
+        downside = np.sqrt(np.mean(np.minimum(returns, 0) ** 2, axis=-1))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(downside > 0, returns.mean(axis=-1) / downside * np.sqrt(periods), 0.0)
+    
+    @staticmethod
+    def profit_factor(pnl):
+        """
+        Gross profit over gross loss (inf without losses).
+        
+        Args:
+            pnl (numpy.ndarray): Trade P&L, 1-D or one sequence per row
+            
+        Returns:
+            numpy.ndarray or float: Profit factor per sequence
+        """
+        gains = np.where(pnl > 0, pnl, 0).sum(axis=-1)
+        losses = np.where(pnl <= 0, pnl, 0).sum(axis=-1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(losses != 0, np.abs(gains / losses), np.inf)
+    
+    @staticmethod
+    def calculate(pnl, initial_capital, entry_times=None, exit_times=None):
+        """
+        Calculate performance metrics for one trade sequence.
+        
+        Args:
+            pnl (numpy.ndarray): Trade P&L in trade order
+            initial_capital (float): Initial capital
+            entry_times (numpy.ndarray, optional): Entry timestamps, for the annualized return
+            exit_times (numpy.ndarray, optional): Exit timestamps, for the annualized return
+            
+        Returns:
+            dict: Performance metrics
+        """
+        pnl = np.asarray(pnl, dtype=float)
+        total_trades = len(pnl)
+        if total_trades == 0:
+            return dict(PerformanceMetrics.EMPTY_METRICS)
+        
+        wins = pnl > 0
+        win_count = int(wins.sum())
+        
+        equity = PerformanceMetrics.equity_curve(pnl, initial_capital)
+        returns = PerformanceMetrics.trade_returns(equity)
+        total_return = (equity[-1] - initial_capital) / initial_capital
+        
+        # Annualized return over the calendar span of the trades (assuming 252 trading days)
+        annualized_return = 0
+        if entry_times is not None and exit_times is not None:
+            span_days = (np.datetime64(exit_times[-1], 'ns') - np.datetime64(entry_times[0], 'ns')) // np.timedelta64(1, 'D')
+            trading_days = span_days / 365 * 252
+            if trading_days > 0:
+                annualized_return = (1 + total_return) ** (252 / trading_days) - 1
+        
+        return {
+            'total_trades': total_trades,
+            'win_rate': win_count / total_trades,
+            'avg_profit': float(pnl[wins].mean()) if win_count else 0,
+            'avg_loss': float(pnl[~wins].mean()) if win_count < total_trades else 0,
+            'profit_factor': float(PerformanceMetrics.profit_factor(pnl)),
+            'max_drawdown': float(PerformanceMetrics.max_drawdown(equity)),
+            'sharpe_ratio': float(PerformanceMetrics.sharpe_ratio(returns)),
+            'sortino_ratio': float(PerformanceMetrics.sortino_ratio(returns)),
+            'total_return': float(total_return),
+            'annualized_return': float(annualized_return)
+        }
+    
+    @staticmethod
+    def from_trades(trades, initial_capital):
+        """
+        Calculate performance metrics from trades.
+        
+        Args:
+            trades (TradeLog or list): Trade log or trade dictionaries
+            initial_capital (float): Initial capital
+            
+        Returns:
+            dict: Performance metrics
+        """
+        if len(trades) == 0:
+            return dict(PerformanceMetrics.EMPTY_METRICS)
+        
+        arrays = PerformanceMetrics.trade_arrays(trades)
+        return PerformanceMetrics.calculate(
+            arrays['pnl'], initial_capital, arrays['entry_time'], arrays['exit_time']
+        )
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Historical Replay Module
+------------------------
+This module replays recorded candles through the production scalping loop. A
+simulated market-data adapter serves the candles visible at the simulated time,
+a recording sink replaces Telegram, and per-cycle latency is measured.
+"""
+
+import os
+import glob
+import json
+import time
+import logging
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("Replay")
+
+class ReplayDataCollector:
+    """
+    Market-data adapter serving recorded candles up to the current simulated time.
+    
+    Drop-in replacement for BitcoinDataCollector.fetch_latest_data. Only candles
+    that have closed by the simulated time are served: a recorded candle holds its
+    final high, low and close, which the live feed does not know until the minute ends.
+    """
+    
+    def __init__(self, data, clock, interval='1min'):
+        """
+        Initialize the replay data collector.
+        
+        Args:
+            data (pandas.DataFrame): OHLCV candles with a DatetimeIndex
+            clock (SimulatedClock): Clock deciding which candles are visible
+            interval (str): Candle interval; a candle is visible once its open time plus this
+                has passed (default: '1min')
+        """
+        self.data = data.sort_index()
+        self.clock = clock
+        self.interval = pd.Timedelta(interval)
+    
+    @staticmethod
+    def load_candles(path):
+        """
+        Load candles from a CSV file or from the candle store directory.
+        
+        All CSV files in a directory are merged; overlapping candles keep the
+        most recently written copy.
+        
+        Args:
+            path (str): CSV file or directory (e.g. 'data')
+            
+        Returns:
+            pandas.DataFrame: Sorted, de-duplicated OHLCV candles
+        """
+        if os.path.isdir(path):
+            files = sorted(glob.glob(os.path.join(path, '*.csv')), key=os.path.getmtime)
+        else:
+            files = [path]
+        
+        if not files:
+            raise FileNotFoundError(f"No candle files found in {path}")
+        
+        frames = [pd.read_csv(f, index_col='timestamp', parse_dates=True) for f in files]
+        data = pd.concat(frames)
+        data = data[~data.index.duplicated(keep='last')].sort_index()
+        
+        logger.info(f"Loaded {len(data)} candles from {len(files)} file(s)")
+        return data[['open', 'high', 'low', 'close', 'volume']]
+    
+    def fetch_latest_data(self, limit=100):
+        """
+        Fetch the latest candles that have closed at the current simulated time.
+        
+        Args:
+            limit (int): Number of candles to return (default: 100)
+            
+        Returns:
+            pandas.DataFrame: DataFrame with OHLCV data
+        """
+        end = self.data.index.searchsorted(pd.Timestamp(self.clock.now()) - self.interval, side='right')
+        return self.data.iloc[max(0, end - limit):end]
+    
+    def fetch_range(self, start, end):
+        """
+        Fetch the candles between two times that have closed at the current simulated time.
+        
+        Args:
+            start (pandas.Timestamp): First candle open time
+            end (pandas.Timestamp): Last candle open time
+            
+        Returns:
+            pandas.DataFrame: DataFrame with OHLCV data
+        """
+        end = min(pd.Timestamp(end), pd.Timestamp(self.clock.now()) - self.interval)
+        return self.data.loc[pd.Timestamp(start):end]
+
+
+class RecordingNotifier:
+    """
+    Notification sink recording messages instead of sending them to Telegram.
+    """
+    
+    def __init__(self, path=None):
+        """
+        Initialize the recording notifier.
+        
+        Args:
+            path (str, optional): JSON-lines file to append records to
+        """
+        self.path = path
+        self.messages = []
+        self.signals = []
+    
+    def _record(self, kind, payload):
+        if self.path:
+            with open(self.path, 'a') as f:
+                f.write(json.dumps({'kind': kind, 'payload': payload}, default=str) + "\n")
+    
+    def send_message(self, message, chat_id=None):
+        """
+        Record a message.
+        
+        Args:
+            message (str): Message content
+            chat_id (str|int, optional): Ignored
+            
+        Returns:
+            bool: Always True
+        """
+        self.messages.append(message)
+        self._record('message', message)
+        return True
+    
+    def send_signal_notification(self, signal):
+        """
+        Record a signal notification.
+        
+        Args:
+            signal (dict): Signal data
+            
+        Returns:
+            bool: Always True
+        """
+        self.signals.append(signal)
+        self._record('signal', signal)
+        return True
+
+
+class ReplayRunner:
+    """
+    Drives a ScalpingSystem over recorded candles on a simulated clock.
+    """
+    
+    def __init__(self, system, feed, speed=0.0, warmup=100):
+        """
+        Initialize the replay runner.
+        
+        Args:
+            system (ScalpingSystem): System wired to the replay feed, a SimulatedClock and a recording sink
+            feed (ReplayDataCollector): Replay market-data adapter
+            speed (float): Simulated seconds per real second; 0 runs as fast as possible (default: 0.0)
+            warmup (int): Candles to skip before the first cycle so indicators are defined (default: 100)
+        """
+        self.system = system
+        self.feed = feed
+        self.speed = speed
+        self.warmup = warmup
+        self.latencies = []
+    
+    def run(self):
+        """
+        Run check cycles from the end of the warmup period to the last candle.
+        
+        Returns:
+            dict: Replay summary with cycle latency percentiles in milliseconds
+        """
+        index = self.feed.data.index
+        if len(index) <= self.warmup:
+            raise ValueError(f"Need more than {self.warmup} candles to replay, got {len(index)}")
+        
+        # The first cycle sees the warmup candles; the last one runs once the final candle has closed
+        clock = self.system.clock
+        clock.set(index[self.warmup])
+        end = (index[-1] + self.feed.interval).to_pydatetime()
+        interval = self.system.check_interval
+        
+        logger.info(f"Replaying {index[self.warmup]} to {end} every {interval}s (speed: {self.speed or 'max'})")
+        wall_start = time.perf_counter()
+        
+        while clock.now() <= end:
+            cycle_start = time.perf_counter()
+            self.system.check_market_conditions()
+            self.latencies.append(time.perf_counter() - cycle_start)
+            
+            clock.sleep(interval)
+            if self.speed > 0:
+                time.sleep(interval / self.speed)
+        
+        # Settle signals still open at the end of the data
+        self.system.check_signal_outcomes()
+        
+        return self.summary(time.perf_counter() - wall_start)
+    
+    def summary(self, wall_seconds):
+        """
+        Summarize the replay.
+        
+        Args:
+            wall_seconds (float): Real time taken by the replay
+            
+        Returns:
+            dict: Replay summary
+        """
+        completed = self.system.signal_history.lifetime
+        latencies = np.array(self.latencies) * 1000
+        
+        summary = {
+            'start': str(self.feed.data.index[self.warmup]),
+            'end': str(self.feed.data.index[-1]),
+            'cycles': len(latencies),
+            'wall_seconds': round(wall_seconds, 2),
+            'signals': completed.count + len(self.system.active_signals),
+            'wins': completed.wins,
+            'losses': completed.count - completed.wins,
+            'messages': len(getattr(self.system.telegram_notifier, 'messages', []))
+        }
+        
+        if len(latencies):
+            summary['latency_ms'] = {
+                'mean': round(float(latencies.mean()), 3),
+                'p50': round(float(np.percentile(latencies, 50)), 3),
+                'p95': round(float(np.percentile(latencies, 95)), 3),
+                'p99': round(float(np.percentile(latencies, 99)), 3),
+                'max': round(float(latencies.max()), 3)
+            }
+        
+        return summary
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Scalping Backtesting Module
+---------------------------
+This module backtests the scalping strategy of ScalpingSignalGenerator with the
+trade rules of ScalpingSystem: 5-minute expiry with take-profit/stop-loss, at least
+5 minutes between signals, at most 8 signals per day and a circuit breaker after 3
+consecutive losses.
+"""
+
+import sys
+import heapq
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+import logging
+from indicators import TechnicalIndicators
+from signal_core import SignalCore
+from support_resistance import SupportResistanceIndex
+from exit_engine import ExitEngine
+from trade_log import TradeLog
+from backtester import Backtester
+from scalping_signal_generator import ScalpingSignalGenerator
+from logging_setup import setup_logging
+
+logger = logging.getLogger("ScalpingBacktester")
+
+class ScalpingBacktester(Backtester):
+    """
+    Vectorized backtester for the scalping strategy.
+    
+    Conditions, signal bars and trade outcomes are computed over whole arrays.
+    Only the signal candidates go through the sequential spacing, daily cap and
+    circuit breaker rules.
+    """
+    
+    # Strategy parameters accepted by set_parameters and parameter grids
+    PARAMETERS = (
+        'expiry_minutes', 'take_profit', 'stop_loss', 'min_score', 'min_time_between_signals',
+        'max_daily_signals', 'max_consecutive_losses', 'ambiguity'
+    )
+    
+    def __init__(self, data_dir='data', results_dir='backtest_results', expiry_minutes=5,
+                 take_profit=0.01, stop_loss=0.005, min_score=4, min_time_between_signals=300,
+                 max_daily_signals=8, max_consecutive_losses=3, ambiguity='stop'):
+        """
+        Initialize the scalping backtester.
+        
+        Args:
+            data_dir (str): Directory with price data (default: 'data')
+            results_dir (str): Directory to store backtest results (default: 'backtest_results')
+            expiry_minutes (int): Trade expiry in 1-minute bars (default: 5)
+            take_profit (float): Take-profit distance as a fraction of entry (default: 0.01)
+            stop_loss (float): Stop-loss distance as a fraction of entry (default: 0.005)
+            min_score (int): Minimum number of conditions for a signal (default: 4)
+            min_time_between_signals (int): Minimum seconds between signals (default: 300)
+            max_daily_signals (int): Maximum signals per day (default: 8)
+            max_consecutive_losses (int): Losses in a row that stop trading for the day (default: 3)
+            ambiguity (str): Policy for a bar touching both take-profit and stop-loss,
+                see ExitEngine.resolve_exits (default: 'stop')
+        """
+        super().__init__(data_dir=data_dir, results_dir=results_dir)
+        
+        self.expiry_minutes = expiry_minutes
+        self.take_profit = take_profit
+        self.stop_loss = stop_loss
+        self.min_score = min_score
+        self.min_time_between_signals = min_time_between_signals
+        self.max_daily_signals = max_daily_signals
+        self.max_consecutive_losses = max_consecutive_losses
+        self.ambiguity = ambiguity
+        
+        self.scalping_generator = ScalpingSignalGenerator(data_dir=data_dir, data_collector=self.data_collector)
+    
+    def resolve_outcomes(self, high, low, close, entries, sides, open_=None):
+        """
+        Resolve the first take-profit/stop-loss touch of each entry within the expiry.
+        
+        Entries with no touch expire at the close of the last bar, winning if
+        price moved their way.
+        
+        Args:
+            high (numpy.ndarray): High prices
+            low (numpy.ndarray): Low prices
+            close (numpy.ndarray): Close prices
+            entries (numpy.ndarray): Entry bar indices (each needs expiry_minutes bars after it)
+            sides (numpy.ndarray): BUY or SELL per entry
+            open_ (numpy.ndarray, optional): Open prices, needed for the 'open' ambiguity policy
+            
+        Returns:
+            tuple: (exit_bars, exit_prices, wins) arrays
+        """
+        entry_prices = close[entries]
+        is_buy = sides == SignalCore.BUY
+        
+        take_profit = np.where(is_buy, entry_prices * (1 + self.take_profit), entry_prices * (1 - self.take_profit))
+        stop_loss = np.where(is_buy, entry_prices * (1 - self.stop_loss), entry_prices * (1 + self.stop_loss))
+        
+        exits = ExitEngine.resolve_exits(
+            high, low, close, entries, sides, take_profit, stop_loss, self.expiry_minutes,
+            ambiguity=self.ambiguity, open_=open_
+        )
+        exit_prices = exits['exit_prices']
+        
+        expired = exits['reasons'] == ExitEngine.EXPIRY
+        moved_their_way = np.where(is_buy, exit_prices > entry_prices, exit_prices < entry_prices)
+        wins = (exits['reasons'] == ExitEngine.TARGET) | (expired & moved_their_way)
+        
+        return exits['exit_bars'], exit_prices, wins
+    
+    def set_parameters(self, **params):
+        """
+        Set strategy parameters.
+        
+        Args:
+            **params: Values for any of PARAMETERS
+        """
+        for name, value in params.items():
+            if name not in self.PARAMETERS:
+                raise ValueError(f"Unknown scalping parameter '{name}', expected one of {self.PARAMETERS}")
+            setattr(self, name, value)
+    
+    def get_parameters(self):
+        """
+        Get the current strategy parameters.
+        
+        Returns:
+            dict: Parameter name to value
+        """
+        return {name: getattr(self, name) for name in self.PARAMETERS}
+    
+    def prepare(self, data):
+        """
+        Compute everything that does not depend on the strategy parameters.
+        
+        Indicators only look back, so one prepared series can be sliced into
+        train/test folds without leaking future data.
+        
+        Args:
+            data (pandas.DataFrame): DataFrame with historical price data
+            
+        Returns:
+            dict: Price arrays, timestamps and the buy/sell condition matrices
+        """
+        data_with_indicators = TechnicalIndicators.add_all_indicators(data)
+        support_near, resistance_near = SupportResistanceIndex().proximity_masks(data_with_indicators)
+        buy_conditions, sell_conditions = SignalCore.scalping_conditions(
+            SignalCore.extract(data_with_indicators),
+            support_near=support_near,
+            resistance_near=resistance_near
+        )
+        
+        timestamps = data_with_indicators.index
+        seconds = timestamps.values.astype('datetime64[s]').astype(np.int64)
+        
+        # Position size per score, from the live generator's quality tiers
+        quality_table = [self.scalping_generator.calculate_signal_quality(score, None) for score in range(8)]
+        
+        return {
+            'index': timestamps,
+            'seconds': seconds,
+            'days': seconds // 86400,
+            'open': data_with_indicators['open'].to_numpy(dtype=float),
+            'high': data_with_indicators['high'].to_numpy(dtype=float),
+            'low': data_with_indicators['low'].to_numpy(dtype=float),
+            'close': data_with_indicators['close'].to_numpy(dtype=float),
+            'buy_conditions': buy_conditions,
+            'sell_conditions': sell_conditions,
+            'quality_table': quality_table
+        }
+    
+    def simulate(self, prepared, initial_capital=10000.0, start=0, end=None):
+        """
+        Simulate trading over bars [start, end) of a prepared series.
+        
+        Args:
+            prepared (dict): Output of prepare
+            initial_capital (float): Initial capital
+            start (int): First bar (default: 0)
+            end (int, optional): Bar after the last one (default: end of the series)
+            
+        Returns:
+            tuple: (trades, pnl_by_bar) where pnl_by_bar covers the whole series
+        """
+        close, seconds, days, timestamps = prepared['close'], prepared['seconds'], prepared['days'], prepared['index']
+        end = len(close) if end is None else end
+        
+        decisions, buy_score, sell_score = SignalCore.scalping_decisions(
+            prepared['buy_conditions'], prepared['sell_conditions'], min_score=self.min_score
+        )
+        
+        # Candidates need a full expiry window inside the range
+        candidates = start + np.flatnonzero(decisions[start:max(end - self.expiry_minutes, start)] != 0)
+        sides = decisions[candidates]
+        exit_bars, exit_prices, wins = self.resolve_outcomes(
+            prepared['high'], prepared['low'], close, candidates, sides, open_=prepared['open']
+        )
+        logger.debug(f"{len(candidates)} signal candidates before spacing, daily cap and circuit breaker")
+        
+        # Sequential trade rules over the candidates only
+        capital = initial_capital
+        trades = TradeLog(capacity=len(candidates), extra_columns={'score': 'U3', 'outcome': 'U4'})
+        pnl_by_bar = np.zeros(len(close))
+        pending = []  # Heap of (exit_bar, entry order, win) of accepted trades not yet settled
+        consecutive_losses = 0
+        current_day = None
+        daily_signal_count = 0
+        last_signal_time = None
+        
+        for k, i in enumerate(candidates):
+            # Settle trades that have exited by this bar, in exit order; a trade stopped out
+            # early can exit before an earlier trade that runs to expiry
+            while pending and pending[0][0] <= i:
+                _, _, win = heapq.heappop(pending)
+                consecutive_losses = 0 if win else consecutive_losses + 1
+            
+            # New day resets the counters and the circuit breaker
+            if days[i] != current_day:
+                current_day = days[i]
+                daily_signal_count = 0
+                consecutive_losses = 0
+            
+            if daily_signal_count >= self.max_daily_signals:
+                continue
+            if consecutive_losses >= self.max_consecutive_losses:
+                continue
+            if last_signal_time is not None and seconds[i] - last_signal_time < self.min_time_between_signals:
+                continue
+            
+            signal_type = 'BUY' if sides[k] == SignalCore.BUY else 'SELL'
+            score = int(buy_score[i] if signal_type == 'BUY' else sell_score[i])
+            quality, position_fraction = prepared['quality_table'][score]
+            
+            entry_price = close[i]
+            exit_price = exit_prices[k]
+            size = capital * position_fraction
+            direction = 1 if signal_type == 'BUY' else -1
+            pnl = direction * (exit_price - entry_price) / entry_price * size
+            capital += pnl
+            pnl_by_bar[exit_bars[k]] += pnl
+            
+            trades.append(
+                type=signal_type,
+                entry_time=timestamps[i],
+                entry_price=entry_price,
+                exit_time=timestamps[exit_bars[k]],
+                exit_price=exit_price,
+                size=size,
+                pnl=pnl,
+                pnl_percent=pnl / size * 100,
+                strength=quality,
+                score=f"{score}/7",
+                outcome='WIN' if wins[k] else 'LOSS'
+            )
+            
+            heapq.heappush(pending, (exit_bars[k], k, wins[k]))
+            daily_signal_count += 1
+            last_signal_time = seconds[i]
+        
+        return trades, pnl_by_bar
+        
+    def _scalping_metrics(self, trades, initial_capital):
+        """
+        Backtester metrics plus the share of trades with a WIN outcome.
+        """
+        performance_metrics = self._calculate_performance_metrics(trades, initial_capital)
+        performance_metrics['outcome_win_rate'] = (
+            float(np.mean(trades.column('outcome') == 'WIN')) if len(trades) else 0
+        )
+        return performance_metrics
+    
+    def evaluate(self, prepared, params=None, initial_capital=10000.0, start=0, end=None):
+        """
+        Simulate a parameter set and compute its performance metrics.
+        
+        Args:
+            prepared (dict): Output of prepare
+            params (dict, optional): Parameters to set before simulating
+            initial_capital (float): Initial capital
+            start (int): First bar (default: 0)
+            end (int, optional): Bar after the last one (default: end of the series)
+            
+        Returns:
+            tuple: (trades, performance_metrics)
+        """
+        if params:
+            self.set_parameters(**params)
+        
+        trades, _ = self.simulate(prepared, initial_capital, start, end)
+        performance_metrics = self._scalping_metrics(trades, initial_capital)
+        
+        return trades, performance_metrics
+    
+    def run_backtest(self, data, initial_capital=10000.0):
+        """
+        Run the scalping backtest on historical 1-minute data.
+        
+        Args:
+            data (pandas.DataFrame): DataFrame with historical price data
+            initial_capital (float): Initial capital for backtesting
+            
+        Returns:
+            tuple: (results_df, trades, performance_metrics)
+        """
+        logger.info(f"Running scalping backtest with {len(data)} data points")
+        
+        prepared = self.prepare(data)
+        trades, pnl_by_bar = self.simulate(prepared, initial_capital)
+        
+        results_df = pd.DataFrame({
+            'close': prepared['close'],
+            'capital': initial_capital + np.cumsum(pnl_by_bar)
+        }, index=prepared['index'])
+        
+        performance_metrics = self._scalping_metrics(trades, initial_capital)
+        
+        logger.info(f"Scalping backtest finished: {len(trades)} trades")
+        
+        return results_df, trades, performance_metrics
+    
+    def run_parameter_optimization(self, data, parameter_grid, metric='sharpe_ratio', min_trades=1,
+                                   prepared=None, start=0, end=None):
+        """
+        Run parameter optimization using grid search on cached indicator arrays.
+        
+        Args:
+            data (pandas.DataFrame): DataFrame with historical price data (unused if prepared is given)
+            parameter_grid (dict): Parameter name to list of values
+            metric (str): Performance metric to maximize (default: 'sharpe_ratio')
+            min_trades (int): Minimum trades for a parameter set to be eligible (default: 1)
+            prepared (dict, optional): Output of prepare, to reuse across calls
+            start (int): First bar (default: 0)
+            end (int, optional): Bar after the last one (default: end of the series)
+            
+        Returns:
+            tuple: (best_params, best_metrics)
+        """
+        logger.info("Running parameter optimization")
+        
+        if prepared is None:
+            prepared = self.prepare(data)
+        
+        original = self.get_parameters()
+        best_metrics = None
+        best_params = None
+        
+        try:
+            for params in self._parameter_combinations(parameter_grid):
+                trades, metrics = self.evaluate(prepared, params, start=start, end=end)
+                if len(trades) < min_trades:
+                    continue
+                if best_metrics is None or metrics[metric] > best_metrics[metric]:
+                    best_params, best_metrics = params, metrics
+        finally:
+            self.set_parameters(**original)
+        
+        logger.info(f"Best parameters: {best_params}")
+        return best_params, best_metrics
+
+if __name__ == "__main__":
+    setup_logging("scalping_backtest.log")
+    
+    # Example usage
+    backtester = ScalpingBacktester()
+    
+    # Load one month of historical data
+    end_date = datetime.now().strftime('%Y-%m-%d')
+    start_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+    
+    try:
+        data = backtester.load_historical_data(start_date, end_date)
+        
+        # Run backtest
+        results, trades, metrics = backtester.run_backtest(data)
+        
+        # Save results; plotting is an optional separate step
+        results_file = backtester.save_results(results, trades, metrics)
+        if '--plot' in sys.argv:
+            backtester.plot_results(results, trades, metrics)
+        
+        print(f"Scalping backtest completed. Results saved to {results_file}")
+        print("\nPerformance Metrics:")
+        for key, value in metrics.items():
+            if isinstance(value, float):
+                print(f"{key}: {value:.4f}")
+            else:
+                print(f"{key}: {value}")
+    except Exception as e:
+        logger.error(f"Error in scalping backtesting: {e}")
@@ -7,23 +7,25 @@ No time-based triggers - only market condition based signals.
 """
 
 import os
+import json
 import time
+import signal as os_signal
 import logging
 import argparse
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from data_collector import BitcoinDataCollector
+from composite_data_source import CompositeDataCollector
+from candle_buffer import GapFillingCollector
 from scalping_signal_generator import ScalpingSignalGenerator
 from telegram_notifier import TelegramNotifier
+from clock import RealClock, SimulatedClock
+from replay import ReplayDataCollector, RecordingNotifier, ReplayRunner
+from tracing import span, traced, get_tracker
+from metrics_server import MetricsServer
+from state_store import StateStore
+from signal_history import SignalHistory
+from logging_setup import setup_logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("scalping_system.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger("ScalpingSystem")
 
 class ScalpingSystem:
@@ -31,32 +33,60 @@ class ScalpingSystem:
     Professional scalping system with continuous market monitoring.
     """
     
-    def __init__(self, check_interval=30):
+    # Attributes saved in state snapshots
+    STATE_FIELDS = ('signals_sent_today', 'last_signal_date', 'consecutive_losses', 'circuit_breaker_notified',
+                    'signal_history', 'active_signals')
+    
+    def __init__(self, check_interval=30, clock=None, data_collector=None, signal_generator=None,
+                 telegram_notifier=None, state_store=None):
         """
         Initialize the scalping system.
         
         Args:
             check_interval (int): How often to check market conditions (seconds)
+            clock (RealClock, optional): Time source shared with the signal generator (default: RealClock)
+            data_collector (optional): Market-data source (default: BitcoinDataCollector)
+            signal_generator (ScalpingSignalGenerator, optional): Signal generator (default: one on the same
+                clock and data source)
+            telegram_notifier (optional): Notification sink (default: TelegramNotifier)
+            state_store (StateStore, optional): Journal and snapshots to restore from and persist to
+                (default: state kept in memory only)
         """
         self.check_interval = check_interval
+        self.clock = clock or RealClock()
         self.max_daily_signals = 8  # Maximum signals per day
         self.signals_sent_today = 0
         self.last_signal_date = None
         self.consecutive_losses = 0
         self.circuit_breaker_notified = False  # Track if circuit breaker notification sent
-        self.signal_history = []  # Store completed signals
+        self.signal_history = SignalHistory()  # Recent completed signals with rolling stats
         self.active_signals = []  # Store active signals for tracking
         
+        # Monitoring state for the metrics endpoint
+        self.started_at = self.clock.now()
+        self.cycles = 0
+        self.cycle_errors = 0
+        self.last_cycle_time = None
+        self.last_cycle_seconds = None
+        self.last_fetch_time = None
+        self.last_candles = None
+        
         # Initialize components
-        self.data_collector = BitcoinDataCollector()
-        self.signal_generator = ScalpingSignalGenerator()
-        self.telegram_notifier = TelegramNotifier()
+        self.data_collector = data_collector or BitcoinDataCollector()
+        self.signal_generator = signal_generator or ScalpingSignalGenerator(
+            clock=self.clock, data_collector=self.data_collector)
+        self.telegram_notifier = telegram_notifier or TelegramNotifier()
         
         # Create necessary directories
         os.makedirs('data', exist_ok=True)
         os.makedirs('signals', exist_ok=True)
         os.makedirs('config', exist_ok=True)
         
+        # Resume from the persisted state
+        self.state_store = state_store
+        if state_store is not None:
+            self.restore_state()
+        
         logger.info(f"Scalping system initialized with {check_interval}s check interval")
     
     def format_telegram_message(self, signal):
@@ -93,7 +123,7 @@ class ScalpingSystem:
 • Volume Ratio: {signal['indicators']['volume_ratio']:.1f}x avg
 
 ⚡ **Action**: Enter {signal['type']} position NOW
-⏰ **Time**: {datetime.now().strftime('%H:%M:%S')}
+⏰ **Time**: {self.clock.now().strftime('%H:%M:%S')}
 
 _Signal #{self.signals_sent_today + 1} today_
         """
@@ -111,14 +141,13 @@ _Signal #{self.signals_sent_today + 1} today_
         try:
             current_data = self.data_collector.fetch_latest_data(limit=1)
             current_price = current_data['close'].iloc[-1]
-            current_time = datetime.now()
+            current_time = self.clock.now()
         except Exception as e:
             logger.error(f"Error fetching current price for outcome check: {e}")
             return
         
-        signals_to_remove = []
-        
-        for signal in self.active_signals:
+        # Outcomes move signals to the history, so iterate over a copy
+        for signal in list(self.active_signals):
             signal_time = datetime.fromisoformat(signal['timestamp'])
             time_elapsed = (current_time - signal_time).total_seconds()
             
@@ -145,9 +174,13 @@ _Signal #{self.signals_sent_today + 1} today_
                         # Check if price is lower than entry
                         outcome = 'WIN' if current_price < signal['price'] else 'LOSS'
                 
-                # Update consecutive losses
+                # Record the outcome; this moves the signal to the history and updates consecutive losses
+                self._record('outcome', timestamp=signal['timestamp'], outcome=outcome,
+                             outcome_price=float(current_price), outcome_time=current_time.isoformat())
+                self.signal_generator.signal_store.update_outcome(
+                    signal['timestamp'], outcome, current_price, current_time.isoformat())
+                
                 if outcome == 'LOSS':
-                    self.consecutive_losses += 1
                     logger.warning(f"Signal LOSS - consecutive losses: {self.consecutive_losses}")
                     
                     # Send loss notification
@@ -159,7 +192,6 @@ _Signal #{self.signals_sent_today + 1} today_
                     
                     self.telegram_notifier.send_message(loss_message)
                 else:  # WIN
-                    self.consecutive_losses = 0  # Reset on win
                     logger.info(f"Signal WIN - consecutive losses reset to 0")
                     
                     # Send win notification
@@ -170,34 +202,24 @@ _Signal #{self.signals_sent_today + 1} today_
                     
                     self.telegram_notifier.send_message(win_message)
                 
-                # Add outcome to signal and move to history
-                signal['outcome'] = outcome
-                signal['outcome_price'] = current_price
-                signal['outcome_time'] = current_time.isoformat()
-                self.signal_history.append(signal)
-                signals_to_remove.append(signal)
-                
                 logger.info(f"Signal outcome: {outcome} - Entry: ${signal['price']:,.2f}, Exit: ${current_price:,.2f}")
-        
-        # Remove processed signals from active list
-        for signal in signals_to_remove:
-            self.active_signals.remove(signal)
     
+    @traced('scalping.check')
     def check_market_conditions(self):
         """
         Check current market conditions for scalping opportunities.
         """
+        cycle_start = time.perf_counter()
         try:
             # First check outcomes of any active signals
-            self.check_signal_outcomes()
+            with span('scalping.outcomes'):
+                self.check_signal_outcomes()
             
             # Reset daily counter if new day
-            current_date = datetime.now().date()
+            current_date = self.clock.now().date()
             if self.last_signal_date != current_date:
-                self.signals_sent_today = 0
-                self.last_signal_date = current_date
-                self.consecutive_losses = 0
-                self.circuit_breaker_notified = False  # Reset circuit breaker notification
+                # Resets the daily counter, consecutive losses and the circuit breaker notification
+                self._record('day_reset', date=current_date.isoformat())
                 logger.info("New trading day - counters reset")
             
             # Check daily limit
@@ -218,7 +240,7 @@ _Signal #{self.signals_sent_today + 1} today_
                     cb_message += "<i>System will resume on next trading day.</i>"
                     
                     self.telegram_notifier.send_message(cb_message)
-                    self.circuit_breaker_notified = True
+                    self._record('circuit_breaker')
                     logger.info("Circuit breaker notification sent - no more notifications until reset")
                 else:
                     logger.debug("Circuit breaker active - notification already sent")
@@ -226,22 +248,33 @@ _Signal #{self.signals_sent_today + 1} today_
             
             # Fetch latest market data
             logger.debug("Fetching latest market data...")
-            data = self.data_collector.fetch_latest_data(limit=100)
+            with span('scalping.fetch'):
+                data = self.data_collector.fetch_latest_data(limit=100)
+            self.last_fetch_time = self.clock.now()
+            self.last_candles = data
+            
+            # Rolling indicators over a window with missing minutes would mix non-adjacent candles
+            if data.attrs.get('stale'):
+                logger.warning("Skipping signal check until the missing candles are backfilled")
+                return
             
             # Check for scalping signal
-            signal = self.signal_generator.generate_scalping_signal(data)
+            with span('scalping.generate'):
+                signal = self.signal_generator.generate_scalping_signal(data)
             
             if signal:
-                # Add to active signals for tracking
-                self.active_signals.append(signal)
+                # Track the signal and count it against the daily limit; journaled before
+                # delivery so a restart never sends it twice
+                self._record('signal', signal=signal)
                 
                 # Save signal
-                self.signal_generator.save_signal(signal)
+                with span('scalping.save'):
+                    self.signal_generator.save_signal(signal)
                 
                 # Send Telegram notification
-                success = self.telegram_notifier.send_signal_notification(signal)
+                with span('scalping.deliver'):
+                    success = self.telegram_notifier.send_signal_notification(signal)
                 
-                self.signals_sent_today += 1
                 logger.info(f"Sent {signal['type']} signal #{self.signals_sent_today} - {signal['quality']} quality")
                 
                 # Log signal details for analysis
@@ -251,8 +284,119 @@ _Signal #{self.signals_sent_today + 1} today_
                 logger.debug("No scalping opportunity detected")
                 
         except Exception as e:
+            self.cycle_errors += 1
             logger.error(f"Error checking market conditions: {e}")
             # Don't crash the system - continue monitoring
+        finally:
+            self.cycles += 1
+            self.last_cycle_time = self.clock.now()
+            self.last_cycle_seconds = time.perf_counter() - cycle_start
+            
+            if self.state_store is not None and self.state_store.snapshot_due():
+                self.save_state()
+    
+    def _record(self, event, **fields):
+        """
+        Journal a state change and apply it.
+        
+        Args:
+            event (str): 'day_reset', 'signal', 'outcome' or 'circuit_breaker'
+            **fields: Event data
+        """
+        entry = {'event': event, 'time': self.clock.now().isoformat(), **fields}
+        if self.state_store is not None:
+            self.state_store.append_event(entry)
+        self._apply_event(entry)
+    
+    def _apply_event(self, entry):
+        """
+        Apply a journaled state change, live or when replaying the journal.
+        
+        Args:
+            entry (dict): Journal event
+        """
+        event = entry['event']
+        
+        if event == 'day_reset':
+            self.signals_sent_today = 0
+            self.last_signal_date = date.fromisoformat(entry['date'])
+            self.consecutive_losses = 0
+            self.circuit_breaker_notified = False
+        elif event == 'signal':
+            self.active_signals.append(entry['signal'])
+            self.signals_sent_today += 1
+        elif event == 'outcome':
+            signal = next((s for s in self.active_signals if s['timestamp'] == entry['timestamp']), None)
+            if signal is None:
+                logger.warning(f"Outcome for unknown signal {entry['timestamp']}")
+                return
+            signal['outcome'] = entry['outcome']
+            signal['outcome_price'] = entry['outcome_price']
+            signal['outcome_time'] = entry['outcome_time']
+            self.active_signals.remove(signal)
+            self.signal_history.append(signal)
+            self.consecutive_losses = self.consecutive_losses + 1 if entry['outcome'] == 'LOSS' else 0
+        elif event == 'circuit_breaker':
+            self.circuit_breaker_notified = True
+    
+    def get_state(self):
+        """
+        Collect the state needed to resume after a restart.
+        
+        Returns:
+            dict: System counters and signals, signal generator spacing and levels, and the last candles
+        """
+        generator = self.signal_generator
+        return {
+            'system': {field: getattr(self, field) for field in self.STATE_FIELDS},
+            'generator': {
+                'last_signal_time': generator.last_signal_time,
+                'recent_signals': generator.recent_signals,
+                'levels': generator.levels
+            },
+            'candles': self.last_candles
+        }
+    
+    def save_state(self):
+        """
+        Write a state snapshot.
+        
+        Returns:
+            str: Path to the snapshot, or None without a state store or on error
+        """
+        if self.state_store is None:
+            return None
+        return self.state_store.save_snapshot(self.get_state())
+    
+    def restore_state(self):
+        """
+        Restore the latest snapshot and replay the journal events written after it.
+        """
+        start = time.perf_counter()
+        state, events = self.state_store.load()
+        generator = self.signal_generator
+        
+        if state is not None:
+            for field in self.STATE_FIELDS:
+                setattr(self, field, state['system'][field])
+            generator.last_signal_time = state['generator']['last_signal_time']
+            generator.recent_signals = state['generator']['recent_signals']
+            generator.levels = state['generator']['levels']
+            self.last_candles = state['candles']
+            if self.last_candles is not None and hasattr(self.data_collector, 'seed'):
+                self.data_collector.seed(self.last_candles)
+        
+        for entry in events:
+            self._apply_event(entry)
+            if entry['event'] == 'signal':
+                # Mirror ScalpingSignalGenerator.generate_scalping_signal and save_signal
+                generator.last_signal_time = datetime.fromisoformat(entry['signal']['timestamp'])
+                generator.recent_signals.append(entry['signal'])
+        
+        if state is not None or events:
+            logger.info(f"Restored state in {(time.perf_counter() - start) * 1000:.1f} ms "
+                        f"({len(events)} journal events replayed): {self.signals_sent_today} signals today, "
+                        f"{len(self.active_signals)} active, {self.consecutive_losses} consecutive losses")
     
     def get_performance_stats(self):
         """
@@ -261,16 +405,24 @@ _Signal #{self.signals_sent_today + 1} today_
         if not self.signal_history:
             return "No completed signals yet."
         
-        wins = sum(1 for s in self.signal_history if s.get('outcome') == 'WIN')
-        losses = sum(1 for s in self.signal_history if s.get('outcome') == 'LOSS')
-        total = len(self.signal_history)
-        
-        win_rate = (wins / total * 100) if total > 0 else 0
+        # Aggregates are maintained as outcomes arrive, so this does not scan the history
+        summary = self.signal_history.stats(now=self.clock.now())
+        lifetime = summary['lifetime']
         
         stats = f"📊 **Performance Stats**\n"
-        stats += f"Total Signals: {total}\n"
-        stats += f"Wins: {wins} ({win_rate:.1f}%)\n"
-        stats += f"Losses: {losses}\n"
+        stats += f"Total Signals: {lifetime['count']}\n"
+        stats += f"Wins: {lifetime['wins']} ({lifetime['win_rate'] * 100:.1f}%)\n"
+        stats += f"Losses: {lifetime['losses']}\n"
+        
+        history = self.signal_history
+        for label, key in ((f"Last {history.last_n} signals", f"last_{history.last_n}"),
+                           (f"Last {history.last_hours:g}h", f"last_{history.last_hours:g}h")):
+            window = summary[key]
+            stats += f"{label}: {window['count']} signals, {window['win_rate'] * 100:.1f}% wins, {window['pnl_percent']:+.2f}% P&L\n"
+        for quality, window in sorted(summary['by_quality'].items()):
+            stats += f"{quality}: {window['count']} signals, {window['win_rate'] * 100:.1f}% wins\n"
+        
+        stats += f"Longest Streaks: {summary['longest_win_streak']} wins, {summary['longest_loss_streak']} losses\n"
         stats += f"Current Streak: {self.consecutive_losses} losses"
         
         return stats
@@ -288,7 +440,7 @@ _Signal #{self.signals_sent_today + 1} today_
         try:
             while True:
                 self.check_market_conditions()
-                time.sleep(self.check_interval)
+                self.clock.sleep(self.check_interval)
                 
         except KeyboardInterrupt:
             logger.info("Scalping system stopped by user")
@@ -366,25 +518,118 @@ _Signal #{self.signals_sent_today + 1} today_
         except Exception as e:
             logger.error(f"Error in test: {e}")
 
+def run_replay(path, check_interval=30, speed=0.0, output_dir='replay_results'):
+    """
+    Replay recorded candles through the production scalping loop.
+    
+    Args:
+        path (str): CSV file or candle store directory
+        check_interval (int): Simulated seconds between checks (default: 30)
+        speed (float): Simulated seconds per real second, 0 for as fast as possible (default: 0.0)
+        output_dir (str): Directory for replayed signals and the summary (default: 'replay_results')
+        
+    Returns:
+        dict: Replay summary
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    
+    clock = SimulatedClock()
+    feed = ReplayDataCollector(ReplayDataCollector.load_candles(path), clock)
+    notifier = RecordingNotifier(path=os.path.join(output_dir, 'notifications.jsonl'))
+    generator = ScalpingSignalGenerator(signal_dir=os.path.join(output_dir, 'signals'), clock=clock, data_collector=feed)
+    system = ScalpingSystem(check_interval=check_interval, clock=clock, data_collector=feed,
+                            signal_generator=generator, telegram_notifier=notifier)
+    
+    summary = ReplayRunner(system, feed, speed=speed).run()
+    if get_tracker().enabled:
+        summary['stages'] = get_tracker().summary()
+    
+    with open(os.path.join(output_dir, 'replay_summary.json'), 'w') as f:
+        json.dump(summary, f, indent=2)
+    
+    print("\n" + "="*60)
+    print("REPLAY SUMMARY")
+    print("="*60)
+    print(json.dumps(summary, indent=2))
+    print("="*60 + "\n")
+    
+    return summary
+
+def _stop_on_sigterm(signum, frame):
+    """
+    Stop the monitoring loop like Ctrl+C when the platform stops the process.
+    """
+    raise KeyboardInterrupt
+
 def main():
     """
     Main entry point for scalping system.
     """
+    setup_logging("scalping_system.log")
+    
     parser = argparse.ArgumentParser(description='Professional Bitcoin Scalping System')
     parser.add_argument('--interval', type=int, default=30, help='Check interval in seconds (default: 30)')
     parser.add_argument('--test', action='store_true', help='Test current market conditions')
     parser.add_argument('--check-now', action='store_true', help='Check for signal immediately')
+    parser.add_argument('--replay', metavar='PATH', help='Replay recorded candles from a CSV file or candle store directory')
+    parser.add_argument('--speed', type=float, default=0.0, help='Replay speed in simulated seconds per second (default: 0 = as fast as possible)')
+    parser.add_argument('--replay-dir', default='replay_results', help='Directory for replayed signals and the replay summary (default: replay_results)')
+    parser.add_argument('--trace', action='store_true', help='Record per-stage latencies of the signal pipeline')
+    parser.add_argument('--trace-file', default='metrics/latency.json', help='Latency metrics file (default: metrics/latency.json)')
+    parser.add_argument('--metrics-port', type=int, default=os.environ.get('PORT'),
+                        help='Serve /metrics and /health on this port while monitoring (default: PORT environment variable)')
+    parser.add_argument('--state-dir', default='state', help='Directory for the state journal and snapshots (default: state)')
+    parser.add_argument('--snapshot-interval', type=float, default=300, help='Seconds between state snapshots (default: 300)')
+    parser.add_argument('--data-sources', default=os.environ.get('DATA_SOURCES', 'binance'),
+                        help='Comma-separated candle sources in priority order, e.g. binance,cryptocompare '
+                             '(default: DATA_SOURCES environment variable or binance)')
+    parser.add_argument('--data-mode', choices=['hedged', 'failover'], default=os.environ.get('DATA_MODE', 'hedged'),
+                        help='How several data sources are combined (default: DATA_MODE environment variable or hedged)')
     args = parser.parse_args()
     
-    system = ScalpingSystem(check_interval=args.interval)
+    if args.trace:
+        get_tracker().configure(enabled=True, export_path=args.trace_file)
+    
+    try:
+        if args.replay:
+            run_replay(args.replay, args.interval, args.speed, args.replay_dir)
+            return
     
-    if args.test:
-        system.test_current_conditions()
-    elif args.check_now:
-        logger.info("Checking for scalping signal immediately...")
-        system.check_market_conditions()
-    else:
-        system.run_continuous_monitoring()
+        state_store = StateStore(args.state_dir, snapshot_interval=args.snapshot_interval)
+        sources = [name.strip() for name in args.data_sources.split(',') if name.strip()]
+        if sources != ['binance']:
+            data_collector = CompositeDataCollector(sources, mode=args.data_mode)
+        else:
+            data_collector = BitcoinDataCollector()
+        
+        # Polls only new candles and backfills gaps by range instead of refetching the window
+        data_collector = GapFillingCollector(data_collector)
+        system = ScalpingSystem(check_interval=args.interval, data_collector=data_collector, state_store=state_store)
+        
+        if args.test:
+            system.test_current_conditions()
+        elif args.check_now:
+            logger.info("Checking for scalping signal immediately...")
+            system.check_market_conditions()
+            system.save_state()
+        else:
+            os_signal.signal(os_signal.SIGTERM, _stop_on_sigterm)
+            
+            metrics_server = None
+            if args.metrics_port is not None:
+                # Stage latencies feed the /metrics histograms
+                if not get_tracker().enabled:
+                    get_tracker().configure(enabled=True)
+                metrics_server = MetricsServer(system, port=args.metrics_port)
+                metrics_server.start()
+            try:
+                system.run_continuous_monitoring()
+            finally:
+                system.save_state()
+                if metrics_server:
+                    metrics_server.stop()
+    finally:
+        get_tracker().export()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
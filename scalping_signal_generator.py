@@ -7,23 +7,18 @@ Only generates signals when multiple strong conditions align.
 """
 
 import os
-import json
-import datetime
+from collections import deque
 import pandas as pd
 import numpy as np
 import logging
 from data_collector import BitcoinDataCollector
 from indicators import TechnicalIndicators
+from signal_core import SignalCore
+from support_resistance import SupportResistanceIndex
+from clock import RealClock
+from tracing import span
+from signal_store import SignalStore
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("scalping_signals.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger("ScalpingSignalGenerator")
 
 class ScalpingSignalGenerator:
@@ -31,202 +26,111 @@ class ScalpingSignalGenerator:
     Professional scalping signal generator with strict entry conditions.
     """
     
-    def __init__(self, data_dir='data', signal_dir='signals'):
+    def __init__(self, data_dir='data', signal_dir='signals', clock=None, data_collector=None):
         self.data_dir = data_dir
         self.signal_dir = signal_dir
         
-        # Create directories
-        os.makedirs(signal_dir, exist_ok=True)
+        # Time source for signal spacing and timestamps (simulated when replaying)
+        self.clock = clock or RealClock()
         
-        # Initialize data collector
-        self.data_collector = BitcoinDataCollector(data_dir=data_dir)
+        # Signals and their outcomes are rows in one SQLite database, opened when first needed
+        self._signal_store = None
+        
+        # Initialize data collector (replaced by a recorded feed when replaying)
+        self.data_collector = data_collector or BitcoinDataCollector(data_dir=data_dir)
         
         # Track last signal time to avoid overtrading
         self.last_signal_time = None
         self.min_time_between_signals = 300  # 5 minutes minimum between signals
         
         # Track recent signals for win/loss analysis
-        self.recent_signals = []
         self.max_recent_signals = 20
+        self.recent_signals = deque(maxlen=self.max_recent_signals)
+        
+        # Swing-high/swing-low levels shared by the buy and sell checks
+        self.levels = SupportResistanceIndex()
         
         logger.info("Scalping Signal Generator initialized")
     
-    def check_scalping_conditions_buy(self, data):
+    @property
+    def signal_store(self):
         """
-        Check for high-probability BUY scalping opportunities.
-        Requires multiple confirmations across different timeframes and indicators.
+        Signal database, opened on first use so that backtests and benchmarks that never
+        save a signal do not create one.
+        
+        Returns:
+            SignalStore: Store at signal_dir/signals.db
+        """
+        if self._signal_store is None:
+            self._signal_store = SignalStore(os.path.join(self.signal_dir, 'signals.db'))
+        return self._signal_store
+    
+    def check_scalping_conditions(self, data):
+        """
+        Check BUY and SELL scalping conditions on the latest candle in one pass.
+        
+        Args:
+            data (pandas.DataFrame): DataFrame with price and indicator data
+            
+        Returns:
+            tuple: ((buy_signal, buy_score, buy_conditions), (sell_signal, sell_score, sell_conditions))
         """
         if len(data) < 100:
-            return False, 0, []
+            return (False, 0, []), (False, 0, [])
         
+        # Support/resistance levels come from the shared incremental index. The latest candle is checked
+        # against levels confirmed before it, as in SupportResistanceIndex.proximity_masks; it is forming
+        # live and closed in replay, so it is left out explicitly and only closed candles are consumed.
+        self.levels.update(data.iloc[:-1], now=self.clock.utcnow())
         latest = data.iloc[-1]
-        conditions_met = []
-        
-        # 1. MOMENTUM REVERSAL - RSI bounce from oversold
-        rsi_reversal = False
-        if latest['rsi'] < 35:  # Currently oversold
-            # Check if RSI is starting to turn up
-            rsi_slope = (latest['rsi'] - data['rsi'].iloc[-3]) / 2
-            if rsi_slope > 0.5:  # RSI improving
-                rsi_reversal = True
-                conditions_met.append("RSI reversal from oversold")
+        support = self.levels.nearest_support(latest['low'], tolerance=0.002)
+        resistance = self.levels.nearest_resistance(latest['high'], tolerance=0.002)
         
-        # 2. BOLLINGER BAND SQUEEZE & BOUNCE
-        bb_squeeze = False
-        bb_width = latest['bb_upper'] - latest['bb_lower']
-        avg_bb_width = (data['bb_upper'] - data['bb_lower']).rolling(20).mean().iloc[-1]
+        support_near = np.zeros(len(data), dtype=bool)
+        resistance_near = np.zeros(len(data), dtype=bool)
+        support_near[-1] = support is not None
+        resistance_near[-1] = resistance is not None
         
-        if bb_width < avg_bb_width * 0.7:  # Bands are squeezed
-            if latest['close'] <= latest['bb_lower'] * 1.002:  # Price at lower band
-                # Check for bounce pattern
-                if data['close'].iloc[-2] < data['bb_lower'].iloc[-2] and latest['close'] > data['close'].iloc[-2]:
-                    bb_squeeze = True
-                    conditions_met.append("Bollinger Band squeeze bounce")
+        buy_matrix, sell_matrix = SignalCore.scalping_conditions(
+            SignalCore.extract(data), support_near=support_near, resistance_near=resistance_near
+        )
         
-        # 3. VOLUME SPIKE - Smart money entering
-        volume_spike = False
-        current_volume = latest['volume']
-        avg_volume = data['volume'].rolling(20).mean().iloc[-1]
+        buy = self._describe_conditions(buy_matrix[-1], SignalCore.SCALPING_BUY_CONDITIONS, support)
+        sell = self._describe_conditions(sell_matrix[-1], SignalCore.SCALPING_SELL_CONDITIONS, resistance)
         
-        if current_volume > avg_volume * 1.5:  # 50% above average
-            # Check if price is holding despite selling
-            if latest['close'] > data['close'].iloc[-3]:
-                volume_spike = True
-                conditions_met.append("Volume spike with price support")
-        
-        # 4. MACD MOMENTUM SHIFT
-        macd_shift = False
-        macd_histogram = latest['macd'] - latest['macd_signal']
-        prev_histogram = data['macd'].iloc[-2] - data['macd_signal'].iloc[-2]
-        
-        if macd_histogram > prev_histogram and prev_histogram < 0:  # Histogram improving from negative
-            if abs(macd_histogram) < abs(prev_histogram):  # Momentum shifting
-                macd_shift = True
-                conditions_met.append("MACD momentum shift")
-        
-        # 5. SUPPORT LEVEL BOUNCE
-        support_bounce = False
-        # Find recent support levels (local minima)
-        recent_lows = data['low'].rolling(10).min()
-        support_levels = recent_lows.unique()[-3:]  # Last 3 support levels
-        
-        for support in support_levels:
-            if abs(latest['low'] - support) / support < 0.002:  # Within 0.2% of support
-                if latest['close'] > latest['open']:  # Bullish candle at support
-                    support_bounce = True
-                    conditions_met.append(f"Support bounce at {support:.2f}")
-                    break
-        
-        # 6. STOCHASTIC OVERSOLD REVERSAL
-        stoch_reversal = False
-        if latest['stoch_k'] < 20 and latest['stoch_d'] < 20:  # Both oversold
-            if latest['stoch_k'] > latest['stoch_d'] and data['stoch_k'].iloc[-2] <= data['stoch_d'].iloc[-2]:
-                stoch_reversal = True
-                conditions_met.append("Stochastic oversold crossover")
-        
-        # 7. PRICE ACTION - Bullish reversal patterns
-        price_pattern = False
-        # Hammer pattern
-        body = abs(latest['close'] - latest['open'])
-        lower_wick = latest['open'] - latest['low'] if latest['close'] > latest['open'] else latest['close'] - latest['low']
-        
-        if lower_wick > body * 2 and latest['close'] > latest['open']:  # Bullish hammer
-            price_pattern = True
-            conditions_met.append("Bullish hammer pattern")
-        
-        # Calculate total score
-        conditions = [rsi_reversal, bb_squeeze, volume_spike, macd_shift, 
-                     support_bounce, stoch_reversal, price_pattern]
-        score = sum(conditions)
+        return buy, sell
+    
+    def _describe_conditions(self, flags, labels, level):
+        """
+        Turn one row of a condition matrix into (is_signal, score, conditions_met).
         
-        # Require at least 4 conditions for a signal
+        Requires at least 4 conditions for a signal.
+        """
+        conditions_met = []
+        for index, (flag, label) in enumerate(zip(flags, labels)):
+            if not flag:
+                continue
+            if index == 4 and level is not None:  # Support/resistance condition
+                label = f"{label} at {level[0]:.2f}"
+            conditions_met.append(label)
+        
+        score = len(conditions_met)
         return score >= 4, score, conditions_met
     
+    def check_scalping_conditions_buy(self, data):
+        """
+        Check for high-probability BUY scalping opportunities.
+        Requires multiple confirmations across different timeframes and indicators.
+        """
+        buy, _ = self.check_scalping_conditions(data)
+        return buy
+    
     def check_scalping_conditions_sell(self, data):
         """
         Check for high-probability SELL scalping opportunities.
         """
-        if len(data) < 100:
-            return False, 0, []
-        
-        latest = data.iloc[-1]
-        conditions_met = []
-        
-        # 1. MOMENTUM EXHAUSTION - RSI decline from overbought
-        rsi_exhaustion = False
-        if latest['rsi'] > 65:  # Currently overbought
-            # Check if RSI is starting to turn down
-            rsi_slope = (latest['rsi'] - data['rsi'].iloc[-3]) / 2
-            if rsi_slope < -0.5:  # RSI declining
-                rsi_exhaustion = True
-                conditions_met.append("RSI exhaustion from overbought")
-        
-        # 2. BOLLINGER BAND REJECTION
-        bb_rejection = False
-        if latest['close'] >= latest['bb_upper'] * 0.998:  # Price at upper band
-            # Check for rejection pattern
-            if data['high'].iloc[-2] > data['bb_upper'].iloc[-2] and latest['close'] < data['close'].iloc[-2]:
-                bb_rejection = True
-                conditions_met.append("Bollinger Band upper rejection")
-        
-        # 3. VOLUME SPIKE ON SELLING
-        volume_selling = False
-        current_volume = latest['volume']
-        avg_volume = data['volume'].rolling(20).mean().iloc[-1]
-        
-        if current_volume > avg_volume * 1.5:  # 50% above average
-            # Check if price is falling with volume
-            if latest['close'] < data['close'].iloc[-3]:
-                volume_selling = True
-                conditions_met.append("High volume selling pressure")
-        
-        # 4. MACD BEARISH CROSSOVER
-        macd_bearish = False
-        macd_histogram = latest['macd'] - latest['macd_signal']
-        prev_histogram = data['macd'].iloc[-2] - data['macd_signal'].iloc[-2]
-        
-        if macd_histogram < prev_histogram and prev_histogram > 0:  # Histogram declining from positive
-            if latest['macd'] < latest['macd_signal']:  # Bearish crossover
-                macd_bearish = True
-                conditions_met.append("MACD bearish crossover")
-        
-        # 5. RESISTANCE LEVEL REJECTION
-        resistance_rejection = False
-        # Find recent resistance levels (local maxima)
-        recent_highs = data['high'].rolling(10).max()
-        resistance_levels = recent_highs.unique()[-3:]  # Last 3 resistance levels
-        
-        for resistance in resistance_levels:
-            if abs(latest['high'] - resistance) / resistance < 0.002:  # Within 0.2% of resistance
-                if latest['close'] < latest['open']:  # Bearish candle at resistance
-                    resistance_rejection = True
-                    conditions_met.append(f"Resistance rejection at {resistance:.2f}")
-                    break
-        
-        # 6. STOCHASTIC OVERBOUGHT REVERSAL
-        stoch_overbought = False
-        if latest['stoch_k'] > 80 and latest['stoch_d'] > 80:  # Both overbought
-            if latest['stoch_k'] < latest['stoch_d'] and data['stoch_k'].iloc[-2] >= data['stoch_d'].iloc[-2]:
-                stoch_overbought = True
-                conditions_met.append("Stochastic overbought crossunder")
-        
-        # 7. PRICE ACTION - Bearish reversal patterns
-        price_pattern = False
-        # Shooting star pattern
-        body = abs(latest['close'] - latest['open'])
-        upper_wick = latest['high'] - latest['close'] if latest['close'] < latest['open'] else latest['high'] - latest['open']
-        
-        if upper_wick > body * 2 and latest['close'] < latest['open']:  # Bearish shooting star
-            price_pattern = True
-            conditions_met.append("Bearish shooting star pattern")
-        
-        # Calculate total score
-        conditions = [rsi_exhaustion, bb_rejection, volume_selling, macd_bearish,
-                     resistance_rejection, stoch_overbought, price_pattern]
-        score = sum(conditions)
-        
-        # Require at least 4 conditions for a signal
-        return score >= 4, score, conditions_met
+        _, sell = self.check_scalping_conditions(data)
+        return sell
     
     def calculate_signal_quality(self, score, conditions_met):
         """
@@ -248,7 +152,7 @@ class ScalpingSignalGenerator:
         if self.last_signal_time is None:
             return True
         
-        time_since_last = (datetime.datetime.now() - self.last_signal_time).total_seconds()
+        time_since_last = (self.clock.now() - self.last_signal_time).total_seconds()
         return time_since_last >= self.min_time_between_signals
     
     def generate_scalping_signal(self, data):
@@ -260,11 +164,13 @@ class ScalpingSignalGenerator:
             return None
         
         # Add all indicators
-        data_with_indicators = TechnicalIndicators.add_all_indicators(data)
+        with span('signal.indicators'):
+            data_with_indicators = TechnicalIndicators.add_all_indicators(data)
         
         # Check both buy and sell conditions
-        buy_signal, buy_score, buy_conditions = self.check_scalping_conditions_buy(data_with_indicators)
-        sell_signal, sell_score, sell_conditions = self.check_scalping_conditions_sell(data_with_indicators)
+        with span('signal.conditions'):
+            (buy_signal, buy_score, buy_conditions), (sell_signal, sell_score, sell_conditions) = \
+                self.check_scalping_conditions(data_with_indicators)
         
         # Only generate signal if conditions are strong
         if buy_signal and buy_score > sell_score:
@@ -272,7 +178,7 @@ class ScalpingSignalGenerator:
             
             signal = {
                 'type': 'BUY',
-                'timestamp': datetime.datetime.now().isoformat(),
+                'timestamp': self.clock.now().isoformat(),
                 'price': data_with_indicators['close'].iloc[-1],
                 'score': f"{buy_score}/7",
                 'quality': quality,
@@ -289,7 +195,7 @@ class ScalpingSignalGenerator:
                 }
             }
             
-            self.last_signal_time = datetime.datetime.now()
+            self.last_signal_time = self.clock.now()
             logger.info(f"Generated BUY signal with score {buy_score}/7 - {quality}")
             return signal
             
@@ -298,7 +204,7 @@ class ScalpingSignalGenerator:
             
             signal = {
                 'type': 'SELL',
-                'timestamp': datetime.datetime.now().isoformat(),
+                'timestamp': self.clock.now().isoformat(),
                 'price': data_with_indicators['close'].iloc[-1],
                 'score': f"{sell_score}/7",
                 'quality': quality,
@@ -315,7 +221,7 @@ class ScalpingSignalGenerator:
                 }
             }
             
-            self.last_signal_time = datetime.datetime.now()
+            self.last_signal_time = self.clock.now()
             logger.info(f"Generated SELL signal with score {sell_score}/7 - {quality}")
             return signal
         
@@ -326,15 +232,9 @@ class ScalpingSignalGenerator:
         """
         Save signal with detailed information.
         """
-        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"{self.signal_dir}/scalping_signal_{timestamp}.json"
-        
-        with open(filename, 'w') as f:
-            json.dump(signal, f, indent=2)
+        self.signal_store.insert(signal, source='scalping')
         
         # Track recent signals
         self.recent_signals.append(signal)
-        if len(self.recent_signals) > self.max_recent_signals:
-            self.recent_signals.pop(0)
         
-        logger.info(f"Saved scalping signal to {filename}") 
\ No newline at end of file
+        logger.info(f"Saved scalping signal {signal['timestamp']} to {self.signal_store.path}")
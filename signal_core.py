@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Signal Evaluation Core
+----------------------
+This module implements the strategy conditions of the Bitcoin trading signal system as
+pure functions over precomputed indicator arrays. The live signal generators, the
+backtesters and the debug tool all evaluate their conditions here, so the logic exists
+once and is evaluated for every bar in a single vectorized pass.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class SignalCore:
+    """
+    Array-based evaluation of the strategy conditions.
+    
+    Every function takes a mapping of column name to numpy array (see extract) and
+    returns one value per bar. Live callers take the last element, backtests use
+    the whole array.
+    """
+    
+    # Signal strength codes for the strict buy/sell checks
+    NO_SIGNAL = 0
+    MODERATE = 1
+    STRONG = 2
+    STRENGTH_LABELS = {MODERATE: "Moderate", STRONG: "Strong"}
+    
+    # Decision codes
+    BUY = 1
+    SELL = -1
+    
+    # Indicator columns used by the core
+    COLUMNS = [
+        'open', 'high', 'low', 'close', 'volume',
+        'rsi', 'bb_upper', 'bb_lower', 'macd', 'macd_signal',
+        'stoch_k', 'stoch_d', 'ichimoku_span_a', 'fib_near',
+        'pattern_hammer', 'pattern_shooting_star'
+    ]
+    
+    # Condition labels, in column order of the condition matrices
+    SCORE_BUY_CONDITIONS = [
+        "RSI improving from oversold (<40)",
+        "Price near BB lower (<=101% of lower)",
+        "MACD improving",
+        "Stoch improving from oversold (<30)",
+        "Volume 20% above 10-bar average"
+    ]
+    SCORE_SELL_CONDITIONS = [
+        "RSI declining from overbought (>60)",
+        "Price near BB upper (>=99% of upper)",
+        "MACD declining",
+        "Stoch declining from overbought (>70)",
+        "Volume 20% above 10-bar average"
+    ]
+    SCALPING_BUY_CONDITIONS = [
+        "RSI reversal from oversold",
+        "Bollinger Band squeeze bounce",
+        "Volume spike with price support",
+        "MACD momentum shift",
+        "Support bounce",
+        "Stochastic oversold crossover",
+        "Bullish hammer pattern"
+    ]
+    SCALPING_SELL_CONDITIONS = [
+        "RSI exhaustion from overbought",
+        "Bollinger Band upper rejection",
+        "High volume selling pressure",
+        "MACD bearish crossover",
+        "Resistance rejection",
+        "Stochastic overbought crossunder",
+        "Bearish shooting star pattern"
+    ]
+    
+    @staticmethod
+    def extract(data, columns=None):
+        """
+        Extract indicator columns from a DataFrame as float arrays.
+        
+        Args:
+            data (pandas.DataFrame): DataFrame from TechnicalIndicators.add_all_indicators
+            columns (list, optional): Columns to extract (default: all columns used by the core)
+            
+        Returns:
+            dict: Column name to numpy array
+            
+        Raises:
+            ValueError: If a column is missing, e.g. because indicators were not added
+        """
+        columns = columns or SignalCore.COLUMNS
+        missing = [column for column in columns if column not in data.columns]
+        if missing:
+            raise ValueError(f"Missing indicator columns {missing}; "
+                             f"run TechnicalIndicators.add_all_indicators on the data first")
+        return {column: data[column].to_numpy(dtype=float) for column in columns}
+    
+    @staticmethod
+    def _shift(values, periods=1):
+        """
+        Shift an array forward, padding the first rows with NaN.
+        """
+        shifted = np.empty_like(values, dtype=float)
+        shifted[:periods] = np.nan
+        shifted[periods:] = values[:-periods]
+        return shifted
+    
+    @staticmethod
+    def _rolling_mean(values, window):
+        """
+        Rolling mean with the same NaN handling as pandas rolling(window).mean().
+        """
+        return pd.Series(values).rolling(window=window).mean().to_numpy()
+    
+    @staticmethod
+    def strict_signals(a, rsi_oversold=30, rsi_overbought=70, stoch_oversold=20, stoch_overbought=80, bb_tolerance=0.0):
+        """
+        Evaluate the strict buy/sell checks (all primary conditions plus secondary confirmations).
+        
+        Args:
+            a (dict): Indicator arrays
+            rsi_oversold (float): RSI level a buy reversal crosses upward (default: 30)
+            rsi_overbought (float): RSI level a sell reversal crosses downward (default: 70)
+            stoch_oversold (float): Stochastic %K/%D ceiling for a buy crossover (default: 20)
+            stoch_overbought (float): Stochastic %K/%D floor for a sell crossover (default: 80)
+            bb_tolerance (float): Fraction the close may stay inside the Bollinger band and still
+                count as touching it (default: 0.0)
+            
+        Returns:
+            tuple: (buy_strength, sell_strength) arrays of NO_SIGNAL/MODERATE/STRONG
+        """
+        shift = SignalCore._shift
+        close, rsi, macd, macd_signal = a['close'], a['rsi'], a['macd'], a['macd_signal']
+        stoch_k, stoch_d, span_a = a['stoch_k'], a['stoch_d'], a['ichimoku_span_a']
+        prev_close, prev_rsi, prev_span_a = shift(close), shift(rsi), shift(span_a)
+        prev_macd, prev_macd_signal = shift(macd), shift(macd_signal)
+        prev_k, prev_d = shift(stoch_k), shift(stoch_d)
+        
+        volume_increasing = a['volume'] > SignalCore._rolling_mean(a['volume'], 5)
+        fib_condition = a['fib_near'] > 0
+        
+        with np.errstate(invalid='ignore'):
+            buy_primary = (
+                (prev_rsi < rsi_oversold) & (rsi > rsi_oversold)
+                & (close <= a['bb_lower'] * (1 + bb_tolerance))
+                & (prev_macd < prev_macd_signal) & (macd > macd_signal)
+                & (prev_k < prev_d) & (stoch_k > stoch_d) & (stoch_k < stoch_oversold) & (stoch_d < stoch_oversold)
+            )
+            buy_ichimoku = (close > span_a) | ((prev_close < prev_span_a) & (close > span_a))
+            
+            sell_primary = (
+                (prev_rsi > rsi_overbought) & (rsi < rsi_overbought)
+                & (close >= a['bb_upper'] * (1 - bb_tolerance))
+                & (prev_macd > prev_macd_signal) & (macd < macd_signal)
+                & (prev_k > prev_d) & (stoch_k < stoch_d) & (stoch_k > stoch_overbought) & (stoch_d > stoch_overbought)
+            )
+            sell_ichimoku = (close < span_a) | ((prev_close > prev_span_a) & (close < span_a))
+        
+        buy_secondary = volume_increasing.astype(int) + buy_ichimoku + fib_condition
+        sell_secondary = volume_increasing.astype(int) + sell_ichimoku + fib_condition
+        
+        buy_strength = np.where(buy_primary, np.where(buy_secondary >= 2, SignalCore.STRONG, SignalCore.MODERATE), SignalCore.NO_SIGNAL)
+        sell_strength = np.where(sell_primary, np.where(sell_secondary >= 2, SignalCore.STRONG, SignalCore.MODERATE), SignalCore.NO_SIGNAL)
+        
+        return buy_strength, sell_strength
+    
+    @staticmethod
+    def strict_decisions(buy_strength, sell_strength):
+        """
+        Resolve strict buy/sell strengths into one decision per bar.
+        
+        A side wins when the other side has no signal or when it is Strong.
+        
+        Args:
+            buy_strength (numpy.ndarray): Buy strengths from strict_signals
+            sell_strength (numpy.ndarray): Sell strengths from strict_signals
+            
+        Returns:
+            numpy.ndarray: BUY, SELL or 0 per bar
+        """
+        buy = (buy_strength > 0) & ((sell_strength == 0) | (buy_strength == SignalCore.STRONG))
+        sell = ~buy & (sell_strength > 0) & ((buy_strength == 0) | (sell_strength == SignalCore.STRONG))
+        return np.where(buy, SignalCore.BUY, np.where(sell, SignalCore.SELL, 0))
+    
+    @staticmethod
+    def score_conditions(a):
+        """
+        Evaluate the flexible 5-condition scoring used by SignalGenerator.generate_signal.
+        
+        Args:
+            a (dict): Indicator arrays
+            
+        Returns:
+            tuple: (buy_conditions, sell_conditions) boolean matrices (N x 5)
+        """
+        shift = SignalCore._shift
+        close, rsi, macd, stoch_k = a['close'], a['rsi'], a['macd'], a['stoch_k']
+        prev_rsi, prev_macd, prev_k = shift(rsi), shift(macd), shift(stoch_k)
+        
+        with np.errstate(invalid='ignore'):
+            volume_condition = a['volume'] > SignalCore._rolling_mean(a['volume'], 10) * 1.2
+            
+            buy_conditions = np.column_stack([
+                (rsi < 40) & (rsi > prev_rsi),
+                close <= a['bb_lower'] * 1.01,
+                macd > prev_macd,
+                (stoch_k < 30) & (stoch_k > prev_k),
+                volume_condition
+            ])
+            sell_conditions = np.column_stack([
+                (rsi > 60) & (rsi < prev_rsi),
+                close >= a['bb_upper'] * 0.99,
+                macd < prev_macd,
+                (stoch_k > 70) & (stoch_k < prev_k),
+                volume_condition
+            ])
+        
+        return buy_conditions, sell_conditions
+    
+    @staticmethod
+    def score_decisions(buy_score, sell_score, threshold=2):
+        """
+        Resolve buy/sell scores into one decision per bar.
+        
+        Args:
+            buy_score (numpy.ndarray): Buy scores
+            sell_score (numpy.ndarray): Sell scores
+            threshold (int): Minimum score for a signal (default: 2)
+            
+        Returns:
+            numpy.ndarray: BUY, SELL or 0 per bar
+        """
+        buy = (buy_score >= threshold) & (buy_score > sell_score)
+        sell = (sell_score >= threshold) & (sell_score > buy_score)
+        return np.where(buy, SignalCore.BUY, np.where(sell, SignalCore.SELL, 0))
+    
+    @staticmethod
+    def scalping_conditions(a, support_near=None, resistance_near=None, min_bars=100):
+        """
+        Evaluate the 7 scalping conditions used by ScalpingSignalGenerator.
+        
+        Args:
+            a (dict): Indicator arrays
+            support_near (numpy.ndarray, optional): Per-bar flag that the low is at a support level
+            resistance_near (numpy.ndarray, optional): Per-bar flag that the high is at a resistance level
+            min_bars (int): Bars of history required before a bar can signal (default: 100)
+            
+        Returns:
+            tuple: (buy_conditions, sell_conditions) boolean matrices (N x 7)
+        """
+        shift = SignalCore._shift
+        n = len(a['close'])
+        o, high, close, volume = a['open'], a['high'], a['close'], a['volume']
+        rsi, bb_upper, bb_lower = a['rsi'], a['bb_upper'], a['bb_lower']
+        macd, macd_signal, stoch_k, stoch_d = a['macd'], a['macd_signal'], a['stoch_k'], a['stoch_d']
+        
+        prev_close, close_2 = shift(close), shift(close, 2)
+        rsi_slope = (rsi - shift(rsi, 2)) / 2
+        prev_k, prev_d = shift(stoch_k), shift(stoch_d)
+        histogram = macd - macd_signal
+        prev_histogram = shift(histogram)
+        
+        bb_width = bb_upper - bb_lower
+        avg_bb_width = SignalCore._rolling_mean(bb_width, 20)
+        avg_volume = SignalCore._rolling_mean(volume, 20)
+        
+        if support_near is None:
+            support_near = np.zeros(n, dtype=bool)
+        if resistance_near is None:
+            resistance_near = np.zeros(n, dtype=bool)
+        
+        with np.errstate(invalid='ignore'):
+            volume_spike = volume > avg_volume * 1.5
+            
+            buy_conditions = np.column_stack([
+                (rsi < 35) & (rsi_slope > 0.5),
+                (bb_width < avg_bb_width * 0.7) & (close <= bb_lower * 1.002)
+                & (prev_close < shift(bb_lower)) & (close > prev_close),
+                volume_spike & (close > close_2),
+                (histogram > prev_histogram) & (prev_histogram < 0) & (np.abs(histogram) < np.abs(prev_histogram)),
+                np.asarray(support_near, dtype=bool) & (close > o),
+                (stoch_k < 20) & (stoch_d < 20) & (stoch_k > stoch_d) & (prev_k <= prev_d),
+                a['pattern_hammer'] > 0
+            ])
+            sell_conditions = np.column_stack([
+                (rsi > 65) & (rsi_slope < -0.5),
+                (close >= bb_upper * 0.998) & (shift(high) > shift(bb_upper)) & (close < prev_close),
+                volume_spike & (close < close_2),
+                (histogram < prev_histogram) & (prev_histogram > 0) & (macd < macd_signal),
+                np.asarray(resistance_near, dtype=bool) & (close < o),
+                (stoch_k > 80) & (stoch_d > 80) & (stoch_k < stoch_d) & (prev_k >= prev_d),
+                a['pattern_shooting_star'] > 0
+            ])
+        
+        # Not enough history: no conditions can be met
+        warmup = np.arange(n) < min_bars - 1
+        buy_conditions[warmup] = False
+        sell_conditions[warmup] = False
+        
+        return buy_conditions, sell_conditions
+    
+    @staticmethod
+    def scalping_decisions(buy_conditions, sell_conditions, min_score=4):
+        """
+        Resolve scalping condition matrices into one decision per bar.
+        
+        Args:
+            buy_conditions (numpy.ndarray): Buy condition matrix from scalping_conditions
+            sell_conditions (numpy.ndarray): Sell condition matrix from scalping_conditions
+            min_score (int): Minimum number of conditions for a signal (default: 4)
+            
+        Returns:
+            tuple: (decisions, buy_score, sell_score) arrays
+        """
+        buy_score = buy_conditions.sum(axis=1)
+        sell_score = sell_conditions.sum(axis=1)
+        
+        buy = (buy_score >= min_score) & (buy_score > sell_score)
+        sell = ~buy & (sell_score >= min_score) & (sell_score > buy_score)
+        decisions = np.where(buy, SignalCore.BUY, np.where(sell, SignalCore.SELL, 0))
+        
+        return decisions, buy_score, sell_score
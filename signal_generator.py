@@ -6,24 +6,18 @@ This module implements the signal generation logic for the Bitcoin trading syste
 """
 
 import os
-import time
 import json
-import datetime
 import pandas as pd
 import numpy as np
 import logging
 from data_collector import BitcoinDataCollector
 from indicators import TechnicalIndicators
+from signal_core import SignalCore
+from clock import RealClock
+from tracing import span
+from signal_store import SignalStore
+from logging_setup import setup_logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("signal_generator.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger("SignalGenerator")
 
 class SignalGenerator:
@@ -31,20 +25,34 @@ class SignalGenerator:
     Class to generate trading signals based on technical indicators.
     """
     
-    def __init__(self, data_dir='data', signal_dir='signals'):
+    # MODIFIED: Expanded time windows to cover more hours for better signal generation
+    # Early morning: 03:00-12:00 UTC (04:00-13:00 Dutch time)
+    # Extended evening: 15:00-20:00 UTC (16:00-21:00 Dutch time)  
+    # Late night: 22:00-03:00 UTC (23:00-04:00 Dutch time) for active traders
+    TIME_WINDOWS = [
+        (3, 12),   # Early morning: 04:00-13:00 Dutch time
+        (15, 20),  # Extended evening: 16:00-21:00 Dutch time
+        (22, 24),  # Late night part 1: 23:00-00:00 Dutch time
+        (0, 3)     # Late night part 2: 01:00-04:00 Dutch time (extended)
+    ]
+    
+    def __init__(self, data_dir='data', signal_dir='signals', clock=None):
         """
         Initialize the signal generator.
         
         Args:
             data_dir (str): Directory with price data (default: 'data')
             signal_dir (str): Directory to store signals (default: 'signals')
+            clock (RealClock, optional): Time source for daily limits, trading windows and
+                timestamps (default: RealClock)
         """
         self.data_dir = data_dir
         self.signal_dir = signal_dir
+        self.clock = clock or RealClock()
         
-        # Create signal directory if it doesn't exist
-        if not os.path.exists(signal_dir):
-            os.makedirs(signal_dir)
+        # Signals are rows in one SQLite database instead of a JSON and an SMS file each,
+        # opened when the first signal is saved
+        self._signal_store = None
             
         # Initialize data collector
         self.data_collector = BitcoinDataCollector(data_dir=data_dir)
@@ -55,6 +63,35 @@ class SignalGenerator:
         
         logger.info("Signal generator initialized")
     
+    @property
+    def signal_store(self):
+        """
+        Signal database, opened on first use so that backtests and benchmarks that never
+        save a signal do not create one.
+        
+        Returns:
+            SignalStore: Store at signal_dir/signals.db
+        """
+        if self._signal_store is None:
+            self._signal_store = SignalStore(os.path.join(self.signal_dir, 'signals.db'))
+        return self._signal_store
+    
+    @staticmethod
+    def trading_window(hour):
+        """
+        Find the trading window containing a UTC hour.
+        
+        Args:
+            hour (int): UTC hour (0-23)
+            
+        Returns:
+            tuple: (start, end) of the window, or None if outside all windows
+        """
+        for start, end in SignalGenerator.TIME_WINDOWS:
+            if start <= hour < end:
+                return start, end
+        return None
+    
     def check_buy_signal(self, data):
         """
         Check if a buy (call) signal should be generated.
@@ -63,56 +100,12 @@ class SignalGenerator:
             data (pandas.DataFrame): DataFrame with price and indicator data
             
         Returns:
-            bool: True if buy signal, False otherwise
+            tuple: (is_signal, signal_strength) where strength is "Strong", "Moderate" or None
         """
-        # Get the latest data point
-        latest = data.iloc[-1]
-        previous = data.iloc[-2]
-        
-        # Primary indicators check
-        rsi_condition = previous['rsi'] < 30 and latest['rsi'] > 30
-        bb_condition = latest['close'] <= latest['bb_lower']
-        macd_condition = previous['macd'] < previous['macd_signal'] and latest['macd'] > latest['macd_signal']
-        stoch_condition = (previous['stoch_k'] < previous['stoch_d'] and latest['stoch_k'] > latest['stoch_d'] and 
-                          latest['stoch_k'] < 20 and latest['stoch_d'] < 20)
-        
-        # Volume check
-        volume_increasing = latest['volume'] > data['volume'].rolling(window=5).mean().iloc[-1]
-        
-        # Ichimoku check
-        ichimoku_condition = latest['close'] > latest['ichimoku_span_a'] or (
-            previous['close'] < previous['ichimoku_span_a'] and latest['close'] > latest['ichimoku_span_a']
-        )
-        
-        # Fibonacci check - simplified for implementation
-        # In a real system, this would check if price is near a Fibonacci level
-        fib_levels = TechnicalIndicators.calculate_fibonacci_retracement(data)
-        close_price = latest['close']
+        buy_strength, _ = SignalCore.strict_signals(SignalCore.extract(data))
+        strength = SignalCore.STRENGTH_LABELS.get(int(buy_strength[-1]))
         
-        # Handle different return types (Series or ndarray)
-        if hasattr(fib_levels, 'values'):
-            fib_values = fib_levels.values
-        else:
-            fib_values = fib_levels
-            
-        fib_condition = any(abs(close_price - level) / close_price < 0.01 for level in fib_values)
-        
-        # Primary signal conditions
-        primary_conditions = rsi_condition and bb_condition and macd_condition and stoch_condition
-        
-        # Secondary confirmation conditions
-        secondary_conditions = [volume_increasing, ichimoku_condition, fib_condition]
-        secondary_count = sum(secondary_conditions)
-        
-        # Signal strength classification
-        if primary_conditions and secondary_count >= 2:
-            signal_strength = "Strong"
-            return True, signal_strength
-        elif primary_conditions:
-            signal_strength = "Moderate"
-            return True, signal_strength
-        else:
-            return False, None
+        return strength is not None, strength
     
     def check_sell_signal(self, data):
         """
@@ -122,64 +115,22 @@ class SignalGenerator:
             data (pandas.DataFrame): DataFrame with price and indicator data
             
         Returns:
-            bool: True if sell signal, False otherwise
+            tuple: (is_signal, signal_strength) where strength is "Strong", "Moderate" or None
         """
-        # Get the latest data point
-        latest = data.iloc[-1]
-        previous = data.iloc[-2]
-        
-        # Primary indicators check
-        rsi_condition = previous['rsi'] > 70 and latest['rsi'] < 70
-        bb_condition = latest['close'] >= latest['bb_upper']
-        macd_condition = previous['macd'] > previous['macd_signal'] and latest['macd'] < latest['macd_signal']
-        stoch_condition = (previous['stoch_k'] > previous['stoch_d'] and latest['stoch_k'] < latest['stoch_d'] and 
-                          latest['stoch_k'] > 80 and latest['stoch_d'] > 80)
-        
-        # Volume check
-        volume_increasing = latest['volume'] > data['volume'].rolling(window=5).mean().iloc[-1]
-        
-        # Ichimoku check
-        ichimoku_condition = latest['close'] < latest['ichimoku_span_a'] or (
-            previous['close'] > previous['ichimoku_span_a'] and latest['close'] < latest['ichimoku_span_a']
-        )
-        
-        # Fibonacci check - simplified for implementation
-        # In a real system, this would check if price is near a Fibonacci level
-        fib_levels = TechnicalIndicators.calculate_fibonacci_retracement(data)
-        close_price = latest['close']
+        _, sell_strength = SignalCore.strict_signals(SignalCore.extract(data))
+        strength = SignalCore.STRENGTH_LABELS.get(int(sell_strength[-1]))
         
-        # Handle different return types (Series or ndarray)
-        if hasattr(fib_levels, 'values'):
-            fib_values = fib_levels.values
-        else:
-            fib_values = fib_levels
-            
-        fib_condition = any(abs(close_price - level) / close_price < 0.01 for level in fib_values)
-        
-        # Primary signal conditions
-        primary_conditions = rsi_condition and bb_condition and macd_condition and stoch_condition
-        
-        # Secondary confirmation conditions
-        secondary_conditions = [volume_increasing, ichimoku_condition, fib_condition]
-        secondary_count = sum(secondary_conditions)
-        
-        # Signal strength classification
-        if primary_conditions and secondary_count >= 2:
-            signal_strength = "Strong"
-            return True, signal_strength
-        elif primary_conditions:
-            signal_strength = "Moderate"
-            return True, signal_strength
-        else:
-            return False, None
-    
-    def calculate_risk_management(self, data, signal_type):
+        return strength is not None, strength
+        
+    def calculate_risk_management(self, data, signal_type, signal_strength=None):
         """
         Calculate risk management parameters for a signal.
         
         Args:
             data (pandas.DataFrame): DataFrame with price and indicator data
             signal_type (str): 'BUY' or 'SELL'
+            signal_strength (str, optional): Precomputed signal strength. If None,
+                the strict check is evaluated on the data.
             
         Returns:
             dict: Risk management parameters
@@ -199,10 +150,11 @@ class SignalGenerator:
         base_position_size = 0.02  # 2% of capital
         
         # Adjust based on signal strength
-        if signal_type == 'BUY':
-            _, signal_strength = self.check_buy_signal(data)
-        else:  # SELL
-            _, signal_strength = self.check_sell_signal(data)
+        if signal_strength is None:
+            if signal_type == 'BUY':
+                _, signal_strength = self.check_buy_signal(data)
+            else:  # SELL
+                _, signal_strength = self.check_sell_signal(data)
         
         if signal_strength == "Strong":
             adjusted_position_size = base_position_size
@@ -232,7 +184,7 @@ class SignalGenerator:
             dict: Signal data or None if no signal
         """
         # Check if we've already sent 6 signals today
-        current_date = datetime.datetime.now().date()
+        current_date = self.clock.now().date()
         if self.last_signal_date != current_date:
             self.daily_signal_count = 0
             self.last_signal_date = current_date
@@ -241,34 +193,20 @@ class SignalGenerator:
             logger.info("Maximum daily signal count reached (6)")
             return None
         
-        # MODIFIED: Expanded time windows to cover more hours for better signal generation
-        # Early morning: 03:00-12:00 UTC (04:00-13:00 Dutch time)
-        # Extended evening: 15:00-20:00 UTC (16:00-21:00 Dutch time)  
-        # Late night: 22:00-03:00 UTC (23:00-04:00 Dutch time) for active traders
-        current_hour = datetime.datetime.utcnow().hour
-        time_windows = [
-            (3, 12),   # Early morning: 04:00-13:00 Dutch time
-            (15, 20),  # Extended evening: 16:00-21:00 Dutch time
-            (22, 24),  # Late night part 1: 23:00-00:00 Dutch time
-            (0, 3)     # Late night part 2: 01:00-04:00 Dutch time (extended)
-        ]
-        
-        in_time_window = False
-        for start, end in time_windows:
-            if start <= current_hour < end:
-                in_time_window = True
-                break
-        
-        if not in_time_window:
+        current_hour = self.clock.utcnow().hour
+        if self.trading_window(current_hour) is None:
             logger.info(f"Current UTC hour {current_hour} is outside extended trading windows")
             return None
         
         # Add indicators to data
-        data_with_indicators = TechnicalIndicators.add_all_indicators(data)
+        with span('signal.indicators'):
+            data_with_indicators = TechnicalIndicators.add_all_indicators(data)
         
         # MODIFIED: More flexible signal generation - use scoring system instead of requiring ALL conditions
-        buy_score = self._calculate_buy_score(data_with_indicators)
-        sell_score = self._calculate_sell_score(data_with_indicators)
+        with span('signal.conditions'):
+            buy_conditions, sell_conditions = SignalCore.score_conditions(SignalCore.extract(data_with_indicators))
+        buy_score = int(buy_conditions[-1].sum())
+        sell_score = int(sell_conditions[-1].sum())
         
         # Generate signal if score is high enough (threshold: 2 out of 5 conditions for testing)
         if buy_score >= 2 and buy_score > sell_score:
@@ -283,7 +221,7 @@ class SignalGenerator:
             
             signal = {
                 'type': signal_type,
-                'timestamp': datetime.datetime.now().isoformat(),
+                'timestamp': self.clock.now().isoformat(),
                 'price': data_with_indicators['close'].iloc[-1],
                 'expiry': '5 minutes',
                 'stop_loss': risk_params['stop_loss'],
@@ -310,7 +248,7 @@ class SignalGenerator:
             
             signal = {
                 'type': signal_type,
-                'timestamp': datetime.datetime.now().isoformat(),
+                'timestamp': self.clock.now().isoformat(),
                 'price': data_with_indicators['close'].iloc[-1],
                 'expiry': '5 minutes',
                 'stop_loss': risk_params['stop_loss'],
@@ -330,61 +268,13 @@ class SignalGenerator:
     
     def _calculate_buy_score(self, data):
         """Calculate buy signal score (0-5) based on multiple conditions."""
-        latest = data.iloc[-1]
-        previous = data.iloc[-2]
-        score = 0
-        
-        # 1. RSI oversold recovery (more flexible)
-        if latest['rsi'] < 40 and latest['rsi'] > previous['rsi']:  # RSI improving from oversold
-            score += 1
-            
-        # 2. Price near or below Bollinger Lower Band
-        if latest['close'] <= latest['bb_lower'] * 1.01:  # Within 1% of lower band
-            score += 1
-            
-        # 3. MACD improvement (more flexible)
-        if latest['macd'] > previous['macd']:  # MACD improving
-            score += 1
-            
-        # 4. Stochastic oversold (more flexible)
-        if latest['stoch_k'] < 30 and latest['stoch_k'] > previous['stoch_k']:  # Improving from oversold
-            score += 1
-            
-        # 5. Volume confirmation
-        volume_avg = data['volume'].rolling(window=10).mean().iloc[-1]
-        if latest['volume'] > volume_avg * 1.2:  # Volume 20% above average
-            score += 1
-            
-        return score
+        buy_conditions, _ = SignalCore.score_conditions(SignalCore.extract(data))
+        return int(buy_conditions[-1].sum())
     
     def _calculate_sell_score(self, data):
         """Calculate sell signal score (0-5) based on multiple conditions."""
-        latest = data.iloc[-1]
-        previous = data.iloc[-2]
-        score = 0
-        
-        # 1. RSI overbought decline (more flexible)
-        if latest['rsi'] > 60 and latest['rsi'] < previous['rsi']:  # RSI declining from overbought
-            score += 1
-            
-        # 2. Price near or above Bollinger Upper Band
-        if latest['close'] >= latest['bb_upper'] * 0.99:  # Within 1% of upper band
-            score += 1
-            
-        # 3. MACD deterioration (more flexible)
-        if latest['macd'] < previous['macd']:  # MACD declining
-            score += 1
-            
-        # 4. Stochastic overbought (more flexible)
-        if latest['stoch_k'] > 70 and latest['stoch_k'] < previous['stoch_k']:  # Declining from overbought
-            score += 1
-            
-        # 5. Volume confirmation
-        volume_avg = data['volume'].rolling(window=10).mean().iloc[-1]
-        if latest['volume'] > volume_avg * 1.2:  # Volume 20% above average
-            score += 1
-            
-        return score
+        _, sell_conditions = SignalCore.score_conditions(SignalCore.extract(data))
+        return int(sell_conditions[-1].sum())
     
     def format_sms_message(self, signal):
         """
@@ -409,25 +299,16 @@ Conviction: {signal['conviction']}
     
     def save_signal(self, signal):
         """
-        Save a signal to file.
+        Save a signal to the signal store.
+        
+        The SMS text is no longer written next to it; format_sms_message rebuilds it
+        from the stored signal.
         
         Args:
             signal (dict): Signal data
         """
-        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"{self.signal_dir}/signal_{timestamp}.json"
-        
-        with open(filename, 'w') as f:
-            json.dump(signal, f, indent=2)
-            
-        logger.info(f"Saved signal to {filename}")
-        
-        # Also save SMS format
-        sms_filename = f"{self.signal_dir}/sms_{timestamp}.txt"
-        with open(sms_filename, 'w') as f:
-            f.write(self.format_sms_message(signal))
-            
-        logger.info(f"Saved SMS format to {sms_filename}")
+        self.signal_store.insert(signal, source='signal')
+        logger.info(f"Saved signal {signal['timestamp']} to {self.signal_store.path}")
     
     def run_signal_generation(self, interval=60):
         """
@@ -453,7 +334,7 @@ Conviction: {signal['conviction']}
                     # self.send_sms(self.format_sms_message(signal))
                 
                 # Wait for next update
-                time.sleep(interval)
+                self.clock.sleep(interval)
                 
         except KeyboardInterrupt:
             logger.info("Signal generation stopped by user")
@@ -462,6 +343,8 @@ Conviction: {signal['conviction']}
             raise
 
 if __name__ == "__main__":
+    setup_logging("signal_generator.log")
+    
     # Example usage
     generator = SignalGenerator()
     
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Signal History Module
+---------------------
+This module keeps a bounded history of completed scalping signals together with
+aggregates that are updated as each outcome arrives: lifetime totals, streaks,
+per-quality statistics, and rolling windows over the last N signals and the last
+K hours. Memory stays flat in long-running deployments and statistics are O(1);
+the complete history remains in the state journal.
+"""
+
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+
+
+class _Window:
+    """
+    Running count, wins and P&L of the signals in a window.
+    """
+    
+    __slots__ = ('count', 'wins', 'pnl')
+    
+    def __init__(self):
+        self.count = 0
+        self.wins = 0
+        self.pnl = 0.0
+    
+    def add(self, win, pnl, sign=1):
+        self.count += sign
+        self.wins += sign * win
+        self.pnl += sign * pnl
+    
+    def summary(self):
+        return {
+            'count': self.count,
+            'wins': self.wins,
+            'losses': self.count - self.wins,
+            'win_rate': self.wins / self.count if self.count else 0.0,
+            'pnl_percent': self.pnl,
+            'avg_pnl_percent': self.pnl / self.count if self.count else 0.0
+        }
+
+
+class SignalHistory:
+    """
+    Bounded history of completed signals with incrementally maintained aggregates.
+    """
+    
+    def __init__(self, maxlen=500, last_n=50, last_hours=24):
+        """
+        Initialize an empty history.
+        
+        Args:
+            maxlen (int): Completed signals kept in memory (default: 500)
+            last_n (int): Size of the rolling window in signals (default: 50)
+            last_hours (float): Length of the rolling window in hours (default: 24)
+        """
+        self.signals = deque(maxlen=maxlen)
+        self.last_n = last_n
+        self.last_hours = last_hours
+        
+        self.lifetime = _Window()
+        self.by_quality = {}
+        self.current_streak = 0  # Positive for wins, negative for losses
+        self.longest_win_streak = 0
+        self.longest_loss_streak = 0
+        
+        # (win, pnl) of the last N signals and (time, win, pnl) of the last K hours
+        self._recent = deque()
+        self._recent_window = _Window()
+        self._timed = deque()
+        self._timed_window = _Window()
+        
+        # The metrics server reads the stats from its own thread
+        self._lock = threading.Lock()
+    
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self.signals)
+    
+    def __iter__(self):
+        return iter(self.signals)
+    
+    def __bool__(self):
+        return self.lifetime.count > 0
+    
+    @staticmethod
+    def signal_pnl(signal):
+        """
+        P&L of a completed signal in percent, positive when the price moved in the signal direction.
+        
+        Args:
+            signal (dict): Signal with 'type', 'price' and 'outcome_price'
+            
+        Returns:
+            float: P&L in percent
+        """
+        change = (signal['outcome_price'] / signal['price'] - 1) * 100
+        return change if signal['type'] == 'BUY' else -change
+    
+    def append(self, signal):
+        """
+        Add a completed signal and update the aggregates.
+        
+        Args:
+            signal (dict): Signal with 'outcome', 'outcome_time', 'quality', 'type', 'price' and 'outcome_price'
+        """
+        win = signal['outcome'] == 'WIN'
+        pnl = self.signal_pnl(signal)
+        outcome_time = datetime.fromisoformat(signal['outcome_time'])
+        
+        with self._lock:
+            self._add(signal, win, pnl, outcome_time)
+    
+    def _add(self, signal, win, pnl, outcome_time):
+        """
+        Update the history and aggregates; called with the lock held.
+        """
+        self.signals.append(signal)
+        self.lifetime.add(win, pnl)
+        self.by_quality.setdefault(signal.get('quality'), _Window()).add(win, pnl)
+        
+        if win:
+            self.current_streak = self.current_streak + 1 if self.current_streak > 0 else 1
+            self.longest_win_streak = max(self.longest_win_streak, self.current_streak)
+        else:
+            self.current_streak = self.current_streak - 1 if self.current_streak < 0 else -1
+            self.longest_loss_streak = max(self.longest_loss_streak, -self.current_streak)
+        
+        self._recent.append((win, pnl))
+        self._recent_window.add(win, pnl)
+        if len(self._recent) > self.last_n:
+            self._recent_window.add(*self._recent.popleft(), sign=-1)
+        
+        self._timed.append((outcome_time, win, pnl))
+        self._timed_window.add(win, pnl)
+        self._expire(outcome_time)
+    
+    def _expire(self, now):
+        """
+        Drop signals older than the time window from its aggregates; called with the lock held.
+        """
+        cutoff = now - timedelta(hours=self.last_hours)
+        while self._timed and self._timed[0][0] < cutoff:
+            _, win, pnl = self._timed.popleft()
+            self._timed_window.add(win, pnl, sign=-1)
+    
+    def stats(self, now=None):
+        """
+        Summarize the history.
+        
+        Args:
+            now (datetime.datetime, optional): Current time for the time window (default: last outcome time)
+            
+        Returns:
+            dict: 'lifetime', f'last_{N}', f'last_{K}h' and per-quality summaries (count, wins,
+                losses, win_rate, pnl_percent, avg_pnl_percent), and the streaks
+        """
+        with self._lock:
+            if now is not None:
+                self._expire(now)
+            return self._summary()
+    
+    def _summary(self):
+        """
+        Summaries of the aggregates; called with the lock held.
+        """
+        return {
+            'lifetime': self.lifetime.summary(),
+            f'last_{self.last_n}': self._recent_window.summary(),
+            f'last_{self.last_hours:g}h': self._timed_window.summary(),
+            'by_quality': {quality: window.summary() for quality, window in self.by_quality.items()},
+            'current_streak': self.current_streak,
+            'longest_win_streak': self.longest_win_streak,
+            'longest_loss_streak': self.longest_loss_streak
+        }
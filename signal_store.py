@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Signal Store Module
+-------------------
+This module stores generated signals in one SQLite database in WAL mode instead
+of one JSON file per signal. Signals are rows with indexed timestamp, type,
+quality and outcome columns plus the full signal as JSON, so range queries and
+win-rate aggregates over months of signals run in SQL instead of globbing and
+parsing thousands of files. A migration imports an existing signals/ directory
+and the outcomes recorded in the state journal.
+"""
+
+import os
+import json
+import sqlite3
+import argparse
+import logging
+from datetime import datetime
+from logging_setup import setup_logging
+
+logger = logging.getLogger("SignalStore")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS signals (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    type TEXT NOT NULL,
+    quality TEXT,
+    price REAL NOT NULL,
+    score TEXT,
+    stop_loss REAL,
+    take_profit REAL,
+    position_size REAL,
+    outcome TEXT,
+    outcome_price REAL,
+    outcome_time TEXT,
+    pnl_percent REAL,
+    data TEXT NOT NULL,
+    UNIQUE (source, timestamp)
+);
+CREATE INDEX IF NOT EXISTS signals_timestamp ON signals (timestamp);
+CREATE INDEX IF NOT EXISTS signals_type ON signals (type, timestamp);
+CREATE INDEX IF NOT EXISTS signals_quality ON signals (quality, timestamp);
+CREATE INDEX IF NOT EXISTS signals_outcome ON signals (outcome, timestamp);
+"""
+
+# Signed move in the signal direction, in percent; NULL until the outcome is known
+_PNL = "CASE WHEN type = 'BUY' THEN (outcome_price / price - 1) * 100 ELSE (1 - outcome_price / price) * 100 END"
+
+_INSERT = """
+INSERT INTO signals (source, timestamp, type, quality, price, score, stop_loss, take_profit,
+                     position_size, outcome, outcome_price, outcome_time, data)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (source, timestamp) DO UPDATE SET
+    outcome = coalesce(excluded.outcome, outcome),
+    outcome_price = coalesce(excluded.outcome_price, outcome_price),
+    outcome_time = coalesce(excluded.outcome_time, outcome_time)
+"""
+
+# Expressions the aggregates can be grouped by
+GROUPS = {
+    'source': 'source',
+    'type': 'type',
+    'quality': 'quality',
+    'outcome': 'outcome',
+    'day': 'substr(timestamp, 1, 10)',
+    'hour': 'substr(timestamp, 12, 2)'
+}
+
+class SignalStore:
+    """
+    SQLite-backed store of generated signals and their outcomes.
+    """
+    
+    def __init__(self, path='signals/signals.db'):
+        """
+        Open or create the store.
+        
+        Args:
+            path (str): Database file (default: 'signals/signals.db')
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        
+        # WAL lets analysis read while the live system writes; NORMAL only fsyncs at checkpoints
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+    
+    def close(self):
+        """
+        Close the database connection.
+        """
+        self.conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def __len__(self):
+        return self.conn.execute("SELECT count(*) FROM signals").fetchone()[0]
+    
+    @staticmethod
+    def _row(signal, source):
+        """
+        Column values of a signal for the insert statement.
+        """
+        def number(key):
+            value = signal.get(key)
+            return None if value is None else float(value)
+        
+        return (
+            source,
+            signal['timestamp'],
+            signal['type'],
+            signal.get('quality') or signal.get('conviction'),
+            float(signal['price']),
+            signal.get('score'),
+            number('stop_loss'),
+            number('take_profit') if 'take_profit' in signal else number('target'),
+            number('position_size'),
+            signal.get('outcome'),
+            number('outcome_price'),
+            signal.get('outcome_time'),
+            json.dumps(signal, default=str)
+        )
+    
+    def insert(self, signal, source='scalping'):
+        """
+        Store one signal; storing a signal again updates its outcome.
+        
+        Args:
+            signal (dict): Signal with at least 'timestamp', 'type' and 'price'
+            source (str): Generator that produced it, 'scalping' or 'signal' (default: 'scalping')
+        """
+        self.insert_many([signal], source)
+    
+    def insert_many(self, signals, source='scalping'):
+        """
+        Store signals in a single transaction.
+        
+        Args:
+            signals (iterable): Signal dictionaries
+            source (str): Generator that produced them (default: 'scalping')
+            
+        Returns:
+            int: Number of signals written
+        """
+        rows = [self._row(signal, source) for signal in signals]
+        with self.conn:
+            self.conn.executemany(_INSERT, rows)
+            if any(row[10] is not None for row in rows):
+                self.conn.execute(f"UPDATE signals SET pnl_percent = {_PNL} "
+                                  "WHERE pnl_percent IS NULL AND outcome_price IS NOT NULL")
+        return len(rows)
+    
+    def update_outcome(self, timestamp, outcome, outcome_price, outcome_time, source='scalping'):
+        """
+        Record the outcome of a stored signal.
+        
+        Args:
+            timestamp (str): Timestamp of the signal
+            outcome (str): 'WIN' or 'LOSS'
+            outcome_price (float): Price when the outcome was decided
+            outcome_time (str): ISO time the outcome was decided
+            source (str): Generator that produced the signal (default: 'scalping')
+            
+        Returns:
+            bool: True if the signal was found
+        """
+        with self.conn:
+            cursor = self.conn.execute(
+                f"UPDATE signals SET outcome = ?, outcome_price = ?, outcome_time = ?, "
+                f"pnl_percent = {_PNL.replace('outcome_price', '?')} WHERE source = ? AND timestamp = ?",
+                (outcome, float(outcome_price), outcome_time, float(outcome_price), float(outcome_price),
+                 source, timestamp))
+        return cursor.rowcount > 0
+    
+    @staticmethod
+    def _where(start=None, end=None, source=None, signal_type=None, quality=None, outcome=None):
+        """
+        WHERE clause and parameters for the common filters; the time range is [start, end).
+        """
+        clauses, params = [], []
+        for clause, value in (("timestamp >= ?", start), ("timestamp < ?", end), ("source = ?", source),
+                              ("type = ?", signal_type), ("quality = ?", quality), ("outcome = ?", outcome)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value.isoformat() if isinstance(value, datetime) else value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+    
+    def query(self, start=None, end=None, source=None, signal_type=None, quality=None, outcome=None, limit=None):
+        """
+        Signals in a time range, oldest first.
+        
+        Args:
+            start (datetime or str, optional): Inclusive start time
+            end (datetime or str, optional): Exclusive end time
+            source (str, optional): Only signals from this generator
+            signal_type (str, optional): 'BUY' or 'SELL'
+            quality (str, optional): Signal quality, e.g. 'PREMIUM'
+            outcome (str, optional): 'WIN' or 'LOSS'
+            limit (int, optional): Maximum number of signals
+            
+        Returns:
+            list: Signal dictionaries including their outcome fields
+        """
+        where, params = self._where(start, end, source, signal_type, quality, outcome)
+        sql = f"SELECT data, outcome, outcome_price, outcome_time FROM signals{where} ORDER BY timestamp"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        
+        signals = []
+        for row in self.conn.execute(sql, params):
+            signal = json.loads(row['data'])
+            if row['outcome'] is not None:
+                signal.update(outcome=row['outcome'], outcome_price=row['outcome_price'],
+                              outcome_time=row['outcome_time'])
+            signals.append(signal)
+        return signals
+    
+    def aggregate(self, group_by=None, start=None, end=None, source=None, signal_type=None, quality=None):
+        """
+        Win rate and P&L of completed signals, optionally grouped.
+        
+        Args:
+            group_by (str, optional): One of GROUPS ('source', 'type', 'quality', 'outcome', 'day', 'hour')
+            start (datetime or str, optional): Inclusive start time
+            end (datetime or str, optional): Exclusive end time
+            source (str, optional): Only signals from this generator
+            signal_type (str, optional): 'BUY' or 'SELL'
+            quality (str, optional): Signal quality
+            
+        Returns:
+            dict: Group value (None without group_by) to a summary with count, wins, losses,
+                win_rate, pnl_percent and avg_pnl_percent
+        """
+        if group_by is not None and group_by not in GROUPS:
+            raise ValueError(f"Cannot group by {group_by!r}; choose one of {', '.join(GROUPS)}")
+        
+        where, params = self._where(start, end, source, signal_type, quality)
+        where += (" AND " if where else " WHERE ") + "outcome IS NOT NULL"
+        key = GROUPS[group_by] if group_by else "NULL"
+        sql = (f"SELECT {key} AS grp, count(*) AS count, sum(outcome = 'WIN') AS wins, "
+               f"total(pnl_percent) AS pnl FROM signals{where} GROUP BY grp ORDER BY grp")
+        
+        summary = {}
+        for row in self.conn.execute(sql, params):
+            count, wins = row['count'], row['wins']
+            summary[row['grp']] = {
+                'count': count,
+                'wins': wins,
+                'losses': count - wins,
+                'win_rate': wins / count,
+                'pnl_percent': row['pnl'],
+                'avg_pnl_percent': row['pnl'] / count
+            }
+        return summary
+    
+    def migrate_directory(self, signal_dir, remove=False):
+        """
+        Import the signal_*.json and scalping_signal_*.json files of a signal directory.
+        
+        SMS text files are not imported; format_sms_message rebuilds them from the signal.
+        Importing the same directory twice does not duplicate signals.
+        
+        Args:
+            signal_dir (str): Directory written by the old save_signal
+            remove (bool): Delete the imported JSON and SMS files afterwards (default: False)
+            
+        Returns:
+            int: Number of signals imported
+        """
+        batches = {'signal': [], 'scalping': []}
+        imported = []
+        for name in sorted(os.listdir(signal_dir)):
+            if not name.endswith('.json'):
+                continue
+            if name.startswith('scalping_signal_'):
+                source = 'scalping'
+            elif name.startswith('signal_'):
+                source = 'signal'
+            else:
+                continue
+            
+            path = os.path.join(signal_dir, name)
+            try:
+                with open(path) as f:
+                    batches[source].append(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable signal file {path}: {e}")
+                continue
+            imported.append(path)
+        
+        count = sum(self.insert_many(signals, source) for source, signals in batches.items())
+        logger.info(f"Imported {count} signals from {signal_dir}")
+        
+        if remove:
+            for path in imported:
+                os.remove(path)
+                sms = os.path.join(signal_dir, os.path.basename(path).replace('signal_', 'sms_', 1)[:-len('.json')] + '.txt')
+                if os.path.exists(sms):
+                    os.remove(sms)
+        
+        return count
+    
+    def migrate_journal(self, state_dir):
+        """
+        Import the scalping signals and outcomes recorded in a state journal.
+        
+        Args:
+            state_dir (str): Directory of the StateStore journal
+            
+        Returns:
+            int: Number of completed signals imported
+        """
+        from state_store import StateStore
+        count = self.insert_many(StateStore(state_dir).completed_signals(), 'scalping')
+        logger.info(f"Imported {count} completed signals from the journal in {state_dir}")
+        return count
+
+def main():
+    """
+    Command-line entry point to migrate signal files and query the store.
+    """
+    setup_logging("signal_store.log")
+    
+    parser = argparse.ArgumentParser(description='Signal store migration and queries')
+    parser.add_argument('--db', default='signals/signals.db', help='Signal database (default: signals/signals.db)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    migrate = commands.add_parser('migrate', help='Import a signal directory and optionally a state journal')
+    migrate.add_argument('signal_dir', nargs='?', default='signals', help='Signal directory (default: signals)')
+    migrate.add_argument('--state-dir', help='Also import the outcomes of this state journal directory')
+    migrate.add_argument('--remove', action='store_true', help='Delete the imported JSON and SMS files')
+    
+    for name, help_text in (('query', 'Print stored signals as JSON lines'), ('stats', 'Print win rate and P&L')):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument('--start', help='Inclusive ISO start time')
+        command.add_argument('--end', help='Exclusive ISO end time')
+        command.add_argument('--source', choices=['scalping', 'signal'], help='Only signals from this generator')
+        command.add_argument('--type', dest='signal_type', choices=['BUY', 'SELL'], help='Only BUY or SELL signals')
+        command.add_argument('--quality', help='Only signals of this quality')
+    commands.choices['query'].add_argument('--outcome', choices=['WIN', 'LOSS'], help='Only signals with this outcome')
+    commands.choices['query'].add_argument('--limit', type=int, help='Maximum number of signals')
+    commands.choices['stats'].add_argument('--group-by', choices=list(GROUPS), help='Group the statistics')
+    args = parser.parse_args()
+    
+    with SignalStore(args.db) as store:
+        if args.command == 'migrate':
+            store.migrate_directory(args.signal_dir, remove=args.remove)
+            if args.state_dir:
+                store.migrate_journal(args.state_dir)
+            print(f"{len(store)} signals in {args.db}")
+        elif args.command == 'query':
+            for signal in store.query(args.start, args.end, args.source, args.signal_type, args.quality,
+                                      args.outcome, args.limit):
+                print(json.dumps(signal, default=str))
+        else:
+            summary = store.aggregate(args.group_by, args.start, args.end, args.source, args.signal_type, args.quality)
+            for group, stats in summary.items():
+                label = f"{group}: " if args.group_by else ""
+                print(f"{label}{stats['count']} signals, {stats['wins']} wins ({stats['win_rate'] * 100:.1f}%), "
+                      f"P&L {stats['pnl_percent']:+.2f}% (avg {stats['avg_pnl_percent']:+.3f}%)")
+
+if __name__ == "__main__":
+    main()
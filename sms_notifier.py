@@ -10,16 +10,8 @@ import json
 import logging
 import requests
 from datetime import datetime
+from logging_setup import setup_logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("sms_notifier.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger("SMSNotifier")
 
 class SMSNotifier:
@@ -243,6 +235,8 @@ Conviction: {signal.get('conviction', 'N/A')}
         return self.send_sms(message)
 
 if __name__ == "__main__":
+    setup_logging("sms_notifier.log")
+    
     # Example usage
     notifier = SMSNotifier()
     
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+State Store Module
+------------------
+This module persists the live scalping state across restarts. Every state change
+is appended to a JSON-lines event journal as it happens, and a compact pickled
+snapshot of the full state is written atomically at intervals. A restart loads
+the latest snapshot and replays only the journal events written after it.
+"""
+
+import os
+import json
+import time
+import pickle
+import logging
+
+logger = logging.getLogger("StateStore")
+
+# Bumped when the snapshot layout changes; older snapshots are ignored
+SNAPSHOT_VERSION = 2
+
+class StateStore:
+    """
+    Atomic state snapshots plus an append-only event journal.
+    """
+    
+    def __init__(self, state_dir='state', snapshot_interval=300):
+        """
+        Initialize the state store.
+        
+        Args:
+            state_dir (str): Directory for the snapshot and the journal (default: 'state')
+            snapshot_interval (float): Minimum seconds between periodic snapshots (default: 300)
+        """
+        self.state_dir = state_dir
+        self.snapshot_interval = snapshot_interval
+        self.snapshot_file = os.path.join(state_dir, 'snapshot.pkl')
+        self.journal_file = os.path.join(state_dir, 'journal.jsonl')
+        self._last_snapshot = time.monotonic()
+        self._journal_checked = False
+        
+        os.makedirs(state_dir, exist_ok=True)
+    
+    def _repair_journal(self):
+        """
+        Cut a partially written last line, left by a crash during an append, off the journal.
+        
+        Without this the next append would be glued onto the partial line and both
+        would be unreadable. Runs once, before this process first writes.
+        """
+        if self._journal_checked:
+            return
+        self._journal_checked = True
+        
+        if not os.path.exists(self.journal_file):
+            return
+        
+        with open(self.journal_file, 'rb+') as f:
+            end = f.seek(0, os.SEEK_END)
+            position = end
+            # Search backwards for the newline that ends the last complete event
+            while position > 0:
+                start = max(0, position - 65536)
+                f.seek(start)
+                chunk = f.read(position - start)
+                if position == end and chunk.endswith(b"\n"):
+                    return
+                newline = chunk.rfind(b"\n")
+                if newline >= 0:
+                    position = start + newline + 1
+                    break
+                position = start
+            
+            logger.warning(f"Truncating {end - position} bytes of a partially written event from {self.journal_file}")
+            f.truncate(position)
+            f.flush()
+            os.fsync(f.fileno())
+    
+    def append_event(self, event):
+        """
+        Append an event to the journal and flush it to disk.
+        
+        Args:
+            event (dict): JSON-serializable event with an 'event' key
+        """
+        self._repair_journal()
+        line = json.dumps(event, default=str) + "\n"
+        with open(self.journal_file, 'a') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+    
+    def read_events(self, offset=0):
+        """
+        Read journal events from a byte offset.
+        
+        A partially written last line, left by a crash during an append, is skipped;
+        it is cut off before this process appends again.
+        
+        Args:
+            offset (int): Byte offset to start reading at (default: 0)
+            
+        Returns:
+            list: Events in journal order
+        """
+        if not os.path.exists(self.journal_file):
+            return []
+        
+        events = []
+        with open(self.journal_file, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping unreadable journal line in {self.journal_file}")
+        return events
+    
+    def completed_signals(self):
+        """
+        Reconstruct the complete signal history from the journal.
+        
+        Yields:
+            dict: Each signal with its outcome fields, in outcome order
+        """
+        open_signals = {}
+        for event in self.read_events():
+            if event['event'] == 'signal':
+                open_signals[event['signal']['timestamp']] = event['signal']
+            elif event['event'] == 'outcome' and event['timestamp'] in open_signals:
+                signal = open_signals.pop(event['timestamp'])
+                signal.update(outcome=event['outcome'], outcome_price=event['outcome_price'],
+                              outcome_time=event['outcome_time'])
+                yield signal
+    
+    def journal_size(self):
+        """
+        Current size of the journal.
+        
+        Returns:
+            int: Size in bytes, 0 without a journal
+        """
+        return os.path.getsize(self.journal_file) if os.path.exists(self.journal_file) else 0
+    
+    def snapshot_due(self):
+        """
+        Check whether the snapshot interval has passed since the last snapshot.
+        
+        Returns:
+            bool: True if a periodic snapshot should be written
+        """
+        return time.monotonic() - self._last_snapshot >= self.snapshot_interval
+    
+    def save_snapshot(self, state):
+        """
+        Write a snapshot atomically, recording the journal position it covers.
+        
+        Args:
+            state (dict): Picklable state
+            
+        Returns:
+            str: Path to the snapshot, or None if it could not be written
+        """
+        # The recorded offset must not point past a partial line that a later append cuts off
+        self._repair_journal()
+        snapshot = {
+            'version': SNAPSHOT_VERSION,
+            'saved_at': time.time(),
+            'journal_offset': self.journal_size(),
+            'state': state
+        }
+        
+        temporary = f"{self.snapshot_file}.tmp"
+        try:
+            with open(temporary, 'wb') as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary, self.snapshot_file)
+        except (OSError, pickle.PicklingError) as e:
+            logger.error(f"Error writing state snapshot: {e}")
+            return None
+        
+        self._last_snapshot = time.monotonic()
+        return self.snapshot_file
+    
+    def load(self):
+        """
+        Load the latest snapshot and the journal events written after it.
+        
+        Without a usable snapshot the whole journal is returned.
+        
+        Returns:
+            tuple: (state dict or None, list of events to replay)
+        """
+        snapshot = None
+        if os.path.exists(self.snapshot_file):
+            try:
+                with open(self.snapshot_file, 'rb') as f:
+                    snapshot = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+                logger.error(f"Error reading state snapshot, replaying the journal instead: {e}")
+            
+            if snapshot is not None and snapshot.get('version') != SNAPSHOT_VERSION:
+                logger.warning(f"Ignoring state snapshot version {snapshot.get('version')}")
+                snapshot = None
+        
+        if snapshot is None:
+            return None, self.read_events()
+        
+        offset = snapshot['journal_offset']
+        if offset > self.journal_size():
+            logger.warning("Journal is shorter than the snapshot expects; not replaying it")
+            return snapshot['state'], []
+        
+        return snapshot['state'], self.read_events(offset)
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Support/Resistance Level Index
+------------------------------
+This module maintains an incremental index of swing-high and swing-low price levels
+for the scalping signal generator.
+"""
+
+from bisect import bisect_left
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+
+class LevelBook:
+    """
+    Sorted book of price levels with touch counts and age-based expiry.
+    """
+    
+    def __init__(self, merge_tolerance=0.001, max_age=240):
+        """
+        Initialize the level book.
+        
+        Args:
+            merge_tolerance (float): Relative distance under which a new pivot counts as
+                a touch of an existing level (default: 0.001)
+            max_age (int): Bars since the last touch after which a level expires (default: 240)
+        """
+        self.merge_tolerance = merge_tolerance
+        self.max_age = max_age
+        
+        # Parallel lists kept sorted by price
+        self.prices = []
+        self.touches = []
+        self.last_touch = []
+    
+    def __len__(self):
+        return len(self.prices)
+    
+    def _closest_index(self, price):
+        """
+        Find the index of the level closest to a price.
+        
+        Args:
+            price (float): Price to look up
+            
+        Returns:
+            int: Index of the closest level, or None if the book is empty
+        """
+        if not self.prices:
+            return None
+        
+        idx = bisect_left(self.prices, price)
+        if idx == 0:
+            return 0
+        if idx == len(self.prices):
+            return idx - 1
+        
+        # Compare the neighbours on both sides of the insertion point
+        if price - self.prices[idx - 1] <= self.prices[idx] - price:
+            return idx - 1
+        return idx
+    
+    def add(self, price, bar):
+        """
+        Add a pivot price, merging it into an existing level if one is close enough.
+        
+        Args:
+            price (float): Pivot price
+            bar (int): Bar number of the pivot
+        """
+        idx = self._closest_index(price)
+        if idx is not None and abs(self.prices[idx] - price) / self.prices[idx] < self.merge_tolerance:
+            self.touches[idx] += 1
+            self.last_touch[idx] = bar
+            return
+        
+        insert_at = bisect_left(self.prices, price)
+        self.prices.insert(insert_at, price)
+        self.touches.insert(insert_at, 1)
+        self.last_touch.insert(insert_at, bar)
+    
+    def expire(self, bar):
+        """
+        Drop levels that have not been touched within max_age bars.
+        
+        Args:
+            bar (int): Current bar number
+        """
+        keep = [i for i, last in enumerate(self.last_touch) if bar - last <= self.max_age]
+        if len(keep) == len(self.prices):
+            return
+        
+        self.prices = [self.prices[i] for i in keep]
+        self.touches = [self.touches[i] for i in keep]
+        self.last_touch = [self.last_touch[i] for i in keep]
+    
+    def nearest(self, price, tolerance=0.002):
+        """
+        Find the nearest level within a relative tolerance in O(log n).
+        
+        Args:
+            price (float): Price to look up
+            tolerance (float): Maximum relative distance to the level (default: 0.002)
+            
+        Returns:
+            tuple: (level_price, touches) or None if no level is close enough
+        """
+        idx = self._closest_index(price)
+        if idx is None:
+            return None
+        
+        level = self.prices[idx]
+        if abs(price - level) / level < tolerance:
+            return level, self.touches[idx]
+        return None
+
+
+class SupportResistanceIndex:
+    """
+    Incrementally maintained swing-high/swing-low level index.
+    
+    A bar is a swing low (high) when its low (high) is the extreme of the
+    pivot_window bars on each side of it. Pivots are therefore confirmed
+    pivot_window bars later and never use future data. Only closed candles
+    newer than the last processed timestamp are consumed on each update.
+    """
+    
+    def __init__(self, pivot_window=3, merge_tolerance=0.001, max_age=240):
+        """
+        Initialize the level index.
+        
+        Args:
+            pivot_window (int): Bars on each side needed to confirm a pivot (default: 3)
+            merge_tolerance (float): Relative distance for merging pivots into a level (default: 0.001)
+            max_age (int): Bars since the last touch after which a level expires (default: 240)
+        """
+        self.pivot_window = pivot_window
+        self.support = LevelBook(merge_tolerance=merge_tolerance, max_age=max_age)
+        self.resistance = LevelBook(merge_tolerance=merge_tolerance, max_age=max_age)
+        
+        self.bar_count = 0
+        self.last_timestamp = None
+        self._highs = deque(maxlen=2 * pivot_window + 1)
+        self._lows = deque(maxlen=2 * pivot_window + 1)
+    
+    def reset(self):
+        """
+        Clear all levels and the pivot buffer.
+        """
+        self.support = LevelBook(merge_tolerance=self.support.merge_tolerance, max_age=self.support.max_age)
+        self.resistance = LevelBook(merge_tolerance=self.resistance.merge_tolerance, max_age=self.resistance.max_age)
+        self.bar_count = 0
+        self.last_timestamp = None
+        self._highs.clear()
+        self._lows.clear()
+    
+    def add_candle(self, high, low):
+        """
+        Append one candle and register any pivot it confirms.
+        
+        Args:
+            high (float): Candle high
+            low (float): Candle low
+        """
+        self._highs.append(high)
+        self._lows.append(low)
+        self.bar_count += 1
+        
+        if len(self._highs) == self._highs.maxlen:
+            k = self.pivot_window
+            pivot_bar = self.bar_count - 1 - k
+            highs = list(self._highs)
+            lows = list(self._lows)
+            
+            # Strict on the left side so flat tops/bottoms register only once
+            if highs[k] > max(highs[:k]) and highs[k] >= max(highs[k + 1:]):
+                self.resistance.add(highs[k], pivot_bar)
+            if lows[k] < min(lows[:k]) and lows[k] <= min(lows[k + 1:]):
+                self.support.add(lows[k], pivot_bar)
+        
+        self.support.expire(self.bar_count)
+        self.resistance.expire(self.bar_count)
+    
+    def update(self, data, now=None, interval='1min'):
+        """
+        Consume the closed candles of a DataFrame that have not been processed yet.
+        
+        Args:
+            data (pandas.DataFrame): DataFrame with 'high' and 'low' columns and a sorted index
+            now (datetime, optional): Current time (naive UTC); candles that have not closed by then
+                are left for a later update. All candles are consumed when omitted.
+            interval (str): Candle interval used to tell whether a candle has closed (default: '1min')
+        """
+        start = 0
+        if self.last_timestamp is not None:
+            start = data.index.searchsorted(self.last_timestamp, side='right')
+        
+        end = len(data)
+        if now is not None:
+            # The still-forming candle has a partial high/low and is processed once it has closed
+            end = data.index.searchsorted(pd.Timestamp(now) - pd.Timedelta(interval), side='right')
+        
+        if start >= end:
+            return
+        
+        highs = data['high'].to_numpy(dtype=float)[start:end]
+        lows = data['low'].to_numpy(dtype=float)[start:end]
+        for high, low in zip(highs, lows):
+            if np.isnan(high) or np.isnan(low):
+                continue
+            self.add_candle(high, low)
+        
+        self.last_timestamp = data.index[end - 1]
+    
+    def proximity_masks(self, data, tolerance=0.002):
+        """
+        Replay a full series through the index and flag, for every bar, whether its
+        low sits at a support level and its high at a resistance level.
+        
+        Each bar only sees levels confirmed by the bars before it: when a bar is the
+        latest candle it is still forming live, and update(now=...) only consumes
+        closed candles. The bar is added to the index after it has been checked.
+        
+        Args:
+            data (pandas.DataFrame): DataFrame with 'high' and 'low' columns
+            tolerance (float): Maximum relative distance to a level (default: 0.002)
+            
+        Returns:
+            tuple: (support_near, resistance_near) boolean arrays
+        """
+        highs = data['high'].to_numpy(dtype=float)
+        lows = data['low'].to_numpy(dtype=float)
+        support_near = np.zeros(len(data), dtype=bool)
+        resistance_near = np.zeros(len(data), dtype=bool)
+        
+        for i, (high, low) in enumerate(zip(highs, lows)):
+            if np.isnan(high) or np.isnan(low):
+                continue
+            support_near[i] = self.support.nearest(low, tolerance) is not None
+            resistance_near[i] = self.resistance.nearest(high, tolerance) is not None
+            self.add_candle(high, low)
+        
+        if len(data):
+            self.last_timestamp = data.index[-1]
+        
+        return support_near, resistance_near
+    
+    def nearest_support(self, price, tolerance=0.002):
+        """
+        Find the nearest support level within tolerance.
+        
+        Args:
+            price (float): Price to look up
+            tolerance (float): Maximum relative distance (default: 0.002)
+            
+        Returns:
+            tuple: (level_price, touches) or None
+        """
+        return self.support.nearest(price, tolerance)
+    
+    def nearest_resistance(self, price, tolerance=0.002):
+        """
+        Find the nearest resistance level within tolerance.
+        
+        Args:
+            price (float): Price to look up
+            tolerance (float): Maximum relative distance (default: 0.002)
+            
+        Returns:
+            tuple: (level_price, touches) or None
+        """
+        return self.resistance.nearest(price, tolerance)
@@ -8,19 +8,10 @@ This module generates synthetic Bitcoin price data for testing and backtesting.
 import os
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 import logging
+from logging_setup import setup_logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("synthetic_data.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger("SyntheticDataGenerator")
 
 class SyntheticDataGenerator:
@@ -111,7 +102,7 @@ class SyntheticDataGenerator:
         
         return df
     
-    def generate_realistic_price_action(self, start_price=50000, days=30, interval_minutes=1):
+    def generate_realistic_price_action(self, start_price=50000, days=30, interval_minutes=1, seed=42):
         """
         Generate more realistic synthetic price data with trends, volatility clusters, and patterns.
         
@@ -119,6 +110,7 @@ class SyntheticDataGenerator:
             start_price (float): Starting price (default: 50000)
             days (int): Number of days to generate (default: 30)
             interval_minutes (int): Time interval in minutes (default: 1)
+            seed (int): Random seed (default: 42)
             
         Returns:
             pandas.DataFrame: DataFrame with synthetic OHLCV data
@@ -139,7 +131,7 @@ class SyntheticDataGenerator:
         volatility_cluster_factor = 2.0
         
         # Generate price data with trends and volatility clusters
-        np.random.seed(42)  # For reproducibility
+        np.random.seed(seed)  # For reproducibility
         
         # Initialize arrays
         volatilities = np.ones(intervals) * base_volatility
@@ -217,6 +209,8 @@ class SyntheticDataGenerator:
         Returns:
             str: Path to saved plot file
         """
+        import matplotlib.pyplot as plt
+        
         # Create figure
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8), gridspec_kw={'height_ratios': [3, 1]})
         
@@ -246,12 +240,15 @@ class SyntheticDataGenerator:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f"{self.data_dir}/synthetic_data_plot_{timestamp}.png"
         plt.savefig(filename)
+        plt.close(fig)
         
         logger.info(f"Saved plot to {filename}")
         
         return filename
 
 if __name__ == "__main__":
+    setup_logging("synthetic_data.log")
+    
     # Example usage
     generator = SyntheticDataGenerator()
     
@@ -12,16 +12,10 @@ import requests
 import pytz
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Union
+from tracing import span
+from http_client import get_client
+from logging_setup import setup_logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("telegram_notifier.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger("TelegramNotifier")
 
 class TelegramNotifier:
@@ -29,17 +23,21 @@ class TelegramNotifier:
     Class to handle Telegram notifications for trading signals.
     """
     
-    def __init__(self, config_file: str = 'config/telegram_config.json'):
+    def __init__(self, config_file: str = 'config/telegram_config.json', client=None):
         """
         Initialize the Telegram notifier.
         
         Args:
-            config_file (str): Path to Telegram configuration file
+            config_file (str): Path to Telegram configuration file; an optional "api_url"
+                entry points the notifier at another Bot API server, e.g. a local stub
+            client (HttpClient, optional): HTTP client (default: the shared client)
         """
         self.config_file = config_file
         self.config = self._load_config()
-        self.base_url = f"https://api.telegram.org/bot{self.config['bot_token']}"
-        self.timeout = 30  # Request timeout in seconds
+        api_url = self.config.get('api_url', 'https://api.telegram.org').rstrip('/')
+        self.base_url = f"{api_url}/bot{self.config['bot_token']}"
+        self.timeout = (5, 30)  # Connect and read timeout in seconds
+        self.client = client or get_client()
         
         # Setup Dutch timezone
         self.dutch_tz = pytz.timezone('Europe/Amsterdam')
@@ -114,7 +112,7 @@ class TelegramNotifier:
             bool: True if connection successful, False otherwise
         """
         try:
-            response = requests.get(
+            response = self.client.get(
                 f"{self.base_url}/getMe",
                 timeout=self.timeout
             )
@@ -161,16 +159,17 @@ class TelegramNotifier:
         success = True
         for chat_id in chat_ids:
             try:
-                response = requests.post(
-                    f"{self.base_url}/sendMessage",
-                    json={
-                        "chat_id": chat_id,
-                        "text": message,
-                        "parse_mode": "HTML",
-                        "disable_web_page_preview": True
-                    },
-                    timeout=self.timeout
-                )
+                with span('telegram.http'):
+                    response = self.client.post(
+                        f"{self.base_url}/sendMessage",
+                        json={
+                            "chat_id": chat_id,
+                            "text": message,
+                            "parse_mode": "HTML",
+                            "disable_web_page_preview": True
+                        },
+                        timeout=self.timeout
+                    )
                 response.raise_for_status()
                 
                 result = response.json()
@@ -212,67 +211,64 @@ class TelegramNotifier:
         
         return utc_now.astimezone(self.dutch_tz)
     
-    def send_signal_notification(self, signal: Dict) -> bool:
+    def format_signal_message(self, signal: Dict) -> str:
         """
-        Send a signal notification via Telegram.
+        Format a signal as a Telegram message with HTML formatting.
         
         Args:
             signal (dict): Signal data
             
         Returns:
-            bool: True if successful, False otherwise
+            str: Message text
         """
+        signal_type = signal.get('type', 'N/A')
+        signal_emoji = "🟢" if signal_type == "BUY" else "🔴" if signal_type == "SELL" else "⚪"
+        quality = signal.get('quality', 'N/A')
+        score = signal.get('score', 'N/A')
+        
+        # Quality emojis
+        quality_emoji = {
+            "VERY STRONG": "🔥🔥🔥",
+            "STRONG": "🔥🔥", 
+            "MODERATE": "🔥",
+            "WEAK": "⚠️"
+        }.get(quality, "")
+        
+        # Conditions met
+        conditions = signal.get('conditions', [])
+        conditions_text = "\n".join([f"✓ {cond}" for cond in conditions])
+        
+        # Handle timestamp and convert to Dutch time
+        timestamp_str = signal.get('timestamp', datetime.now().isoformat())
         try:
-            # Format the signal as a Telegram message with HTML formatting
-            signal_type = signal.get('type', 'N/A')
-            signal_emoji = "🟢" if signal_type == "BUY" else "🔴" if signal_type == "SELL" else "⚪"
-            quality = signal.get('quality', 'N/A')
-            score = signal.get('score', 'N/A')
+            if isinstance(timestamp_str, str):
+                signal_timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
+            else:
+                signal_timestamp = timestamp_str
             
-            # Quality emojis
-            quality_emoji = {
-                "VERY STRONG": "🔥🔥🔥",
-                "STRONG": "🔥🔥", 
-                "MODERATE": "🔥",
-                "WEAK": "⚠️"
-            }.get(quality, "")
+            dutch_time = self._get_dutch_time(signal_timestamp)
+            formatted_time = dutch_time.strftime('%H:%M:%S')
+            formatted_date = dutch_time.strftime('%d-%m-%Y')
+            timezone_name = dutch_time.strftime('%Z')  # CET or CEST
             
-            # Conditions met
-            conditions = signal.get('conditions', [])
-            conditions_text = "\n".join([f"✓ {cond}" for cond in conditions])
+            # Calculate optimal entry time (add 2-3 minutes for preparation)
+            optimal_entry_time = dutch_time + timedelta(minutes=2)
+            entry_time_str = optimal_entry_time.strftime('%H:%M')
             
-            # Handle timestamp and convert to Dutch time
-            timestamp_str = signal.get('timestamp', datetime.now().isoformat())
-            try:
-                if isinstance(timestamp_str, str):
-                    signal_timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-                else:
-                    signal_timestamp = timestamp_str
+        except Exception as e:
+            logger.warning(f"Error parsing timestamp {timestamp_str}: {e}")
+            dutch_time = self._get_dutch_time()
+            formatted_time = dutch_time.strftime('%H:%M:%S')
+            formatted_date = dutch_time.strftime('%d-%m-%Y')
+            timezone_name = dutch_time.strftime('%Z')
                 
-                dutch_time = self._get_dutch_time(signal_timestamp)
-                formatted_time = dutch_time.strftime('%H:%M:%S')
-                formatted_date = dutch_time.strftime('%d-%m-%Y')
-                timezone_name = dutch_time.strftime('%Z')  # CET or CEST
+            optimal_entry_time = dutch_time + timedelta(minutes=2)
+            entry_time_str = optimal_entry_time.strftime('%H:%M')
                 
-                # Calculate optimal entry time (add 2-3 minutes for preparation)
-                optimal_entry_time = dutch_time + timedelta(minutes=2)
-                entry_time_str = optimal_entry_time.strftime('%H:%M')
+        # Determine trade action
+        action_text = "📈 <b>CALL (UP)</b>" if signal_type == "BUY" else "📉 <b>PUT (DOWN)</b>"
                 
-            except Exception as e:
-                logger.warning(f"Error parsing timestamp {timestamp_str}: {e}")
-                dutch_time = self._get_dutch_time()
-                formatted_time = dutch_time.strftime('%H:%M:%S')
-                formatted_date = dutch_time.strftime('%d-%m-%Y')
-                timezone_name = dutch_time.strftime('%Z')
-                
-                from datetime import timedelta
-                optimal_entry_time = dutch_time + timedelta(minutes=2)
-                entry_time_str = optimal_entry_time.strftime('%H:%M')
-            
-            # Determine trade action
-            action_text = "📈 <b>CALL (UP)</b>" if signal_type == "BUY" else "📉 <b>PUT (DOWN)</b>"
-            
-            message = f"""
+        message = f"""
 {signal_emoji} <b>SCALPING SIGNAL - {signal_type}</b> {quality_emoji}
 
 📊 <b>Signal Quality:</b> {quality} ({score})
@@ -307,7 +303,23 @@ class TelegramNotifier:
 5️⃣ Use recommended position size
 
 <i>Professional scalping signal - Trade at your own risk.</i>
-            """.strip()
+        """.strip()
+        
+        return message
+    
+    def send_signal_notification(self, signal: Dict) -> bool:
+        """
+        Send a signal notification via Telegram.
+        
+        Args:
+            signal (dict): Signal data
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            # Format the signal as a Telegram message with HTML formatting
+            message = self.format_signal_message(signal)
             
             # Send the message
             return self.send_message(message)
@@ -317,6 +329,8 @@ class TelegramNotifier:
             return False
 
 if __name__ == "__main__":
+    setup_logging("telegram_notifier.log")
+    
     # Example usage
     try:
         notifier = TelegramNotifier()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+import tempfile
+import numpy as np
+import pandas as pd
+from synthetic_data import SyntheticDataGenerator
+from support_resistance import SupportResistanceIndex
+
+print("Testing support/resistance parity between the backtest masks and the live path...")
+
+with tempfile.TemporaryDirectory() as data_dir:
+    data = SyntheticDataGenerator(data_dir=data_dir).generate_realistic_price_action(days=3, seed=7).iloc[:3000]
+data.index = pd.date_range('2024-01-01', periods=len(data), freq='min', name='timestamp')
+
+support_near, resistance_near = SupportResistanceIndex().proximity_masks(data)
+
+# Live: every cycle sees a window whose last candle is still forming
+live = SupportResistanceIndex()
+live_support = np.zeros(len(data), dtype=bool)
+live_resistance = np.zeros(len(data), dtype=bool)
+for i in range(len(data)):
+    window = data.iloc[max(0, i - 99):i + 1]
+    live.update(window, now=data.index[i] + pd.Timedelta(seconds=30))
+    latest = window.iloc[-1]
+    live_support[i] = live.nearest_support(latest['low']) is not None
+    live_resistance[i] = live.nearest_resistance(latest['high']) is not None
+
+# Replay: the window ends with a closed candle, which the generator leaves out of the index
+replay = SupportResistanceIndex()
+replay_support = np.zeros(len(data), dtype=bool)
+for i in range(len(data)):
+    window = data.iloc[max(0, i - 99):i + 1]
+    replay.update(window.iloc[:-1], now=data.index[i] + pd.Timedelta(minutes=1))
+    replay_support[i] = replay.nearest_support(window['low'].iloc[-1]) is not None
+
+print(f"Support flags: backtest {support_near.sum()}, live {live_support.sum()}, replay {replay_support.sum()}")
+print(f"Resistance flags: backtest {resistance_near.sum()}, live {live_resistance.sum()}")
+assert (support_near == live_support).all(), np.flatnonzero(support_near != live_support)
+assert (resistance_near == live_resistance).all(), np.flatnonzero(resistance_near != live_resistance)
+assert (support_near == replay_support).all(), np.flatnonzero(support_near != replay_support)
+
+print("Support/resistance parity: OK")
@@ -6,24 +6,20 @@ This module tests the Bitcoin trading signal system using synthetic data.
 """
 
 import os
+import sys
 import json
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 import logging
 from indicators import TechnicalIndicators
 from signal_generator import SignalGenerator
+from signal_core import SignalCore
+from performance_metrics import PerformanceMetrics
+from trade_log import TradeLog, BacktestResults
+from trade_analytics import TradeAnalytics
+from logging_setup import setup_logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("test_synthetic.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger("SyntheticTester")
 
 class SyntheticTester:
@@ -99,11 +95,19 @@ class SyntheticTester:
         # Add indicators
         data_with_indicators = TechnicalIndicators.add_all_indicators(data)
         
-        # Initialize results
-        results = []
+        # Evaluate the strict buy/sell checks for every bar in one pass
+        buy_strength, sell_strength = SignalCore.strict_signals(SignalCore.extract(data_with_indicators))
+        decisions = SignalCore.strict_decisions(buy_strength, sell_strength)
+        closes = data_with_indicators['close'].to_numpy()
+        timestamps = data_with_indicators.index
+        
+        # Preallocate per-bar results; bars outside the time windows are not recorded
         capital = initial_capital
         position = None
-        trades = []
+        trades = TradeLog()
+        equity = np.full(len(closes), np.nan)
+        sides = np.zeros(len(closes), dtype=np.int8)
+        recorded = np.zeros(len(closes), dtype=bool)
         
         # Set up time windows for signal generation (6 per day)
         time_windows = [
@@ -121,8 +125,8 @@ class SyntheticTester:
         
         # Process each data point
         for i in range(100, len(data_with_indicators)):  # Start after warmup period
-            current_row = data_with_indicators.iloc[i]
-            timestamp = data_with_indicators.index[i]
+            close_price = closes[i]
+            timestamp = timestamps[i]
             
             # Check if we're in a new day
             if current_date != timestamp.date():
@@ -141,54 +145,29 @@ class SyntheticTester:
             if not in_time_window or daily_signal_count >= 6:
                 continue
             
-            # Check for signals
-            window_data = data_with_indicators.iloc[i-100:i+1]
-            
-            # Check for buy signal
-            buy_signal, buy_strength = self.signal_generator.check_buy_signal(window_data)
-            
-            # Check for sell signal
-            sell_signal, sell_strength = self.signal_generator.check_sell_signal(window_data)
-            
             # Execute trades based on signals
             if position is None:  # No active position
-                if buy_signal and (not sell_signal or buy_strength == "Strong"):
-                    # Generate buy signal
-                    risk_params = self.signal_generator.calculate_risk_management(window_data, "BUY")
-                    
-                    # Calculate position size
-                    position_size = capital * risk_params['position_size']
-                    entry_price = current_row['close']
-                    stop_loss = risk_params['stop_loss']
-                    target = risk_params['primary_target']
-                    
-                    # Open position
-                    position = {
-                        'type': 'BUY',
-                        'entry_time': timestamp,
-                        'entry_price': entry_price,
-                        'size': position_size,
-                        'stop_loss': stop_loss,
-                        'target': target,
-                        'strength': risk_params['signal_strength']
-                    }
-                    
-                    daily_signal_count += 1
-                    logger.info(f"BUY signal at {timestamp} - Price: {entry_price}")
+                if decisions[i] != 0:
+                    if decisions[i] == SignalCore.BUY:
+                        signal_type, strength = 'BUY', buy_strength[i]
+                    else:
+                        signal_type, strength = 'SELL', sell_strength[i]
                     
-                elif sell_signal and (not buy_signal or sell_strength == "Strong"):
-                    # Generate sell signal
-                    risk_params = self.signal_generator.calculate_risk_management(window_data, "SELL")
+                    risk_params = self.signal_generator.calculate_risk_management(
+                        data_with_indicators.iloc[:i + 1],
+                        signal_type,
+                        signal_strength=SignalCore.STRENGTH_LABELS[int(strength)]
+                    )
                     
                     # Calculate position size
                     position_size = capital * risk_params['position_size']
-                    entry_price = current_row['close']
+                    entry_price = close_price
                     stop_loss = risk_params['stop_loss']
                     target = risk_params['primary_target']
                     
                     # Open position
                     position = {
-                        'type': 'SELL',
+                        'type': signal_type,
                         'entry_time': timestamp,
                         'entry_price': entry_price,
                         'size': position_size,
@@ -198,13 +177,13 @@ class SyntheticTester:
                     }
                     
                     daily_signal_count += 1
-                    logger.info(f"SELL signal at {timestamp} - Price: {entry_price}")
+                    logger.info(f"{signal_type} signal at {timestamp} - Price: {entry_price}")
             
             elif position is not None:  # Active position
                 # Check if 1 minute has passed (contract expiry)
                 if timestamp >= position['entry_time'] + timedelta(minutes=1):
                     # Close position at current price
-                    exit_price = current_row['close']
+                    exit_price = close_price
                     
                     # Calculate profit/loss
                     if position['type'] == 'BUY':
@@ -216,35 +195,36 @@ class SyntheticTester:
                     capital += pnl
                     
                     # Record trade
-                    trade = {
-                        'type': position['type'],
-                        'entry_time': position['entry_time'],
-                        'entry_price': position['entry_price'],
-                        'exit_time': timestamp,
-                        'exit_price': exit_price,
-                        'size': position['size'],
-                        'pnl': pnl,
-                        'pnl_percent': pnl / position['size'] * 100,
-                        'strength': position['strength']
-                    }
-                    trades.append(trade)
+                    pnl_percent = pnl / position['size'] * 100
+                    trades.append(
+                        type=position['type'],
+                        entry_time=position['entry_time'],
+                        entry_price=position['entry_price'],
+                        exit_time=timestamp,
+                        exit_price=exit_price,
+                        size=position['size'],
+                        pnl=pnl,
+                        pnl_percent=pnl_percent,
+                        strength=position['strength']
+                    )
                     
-                    logger.info(f"Closed {position['type']} position at {timestamp} - P&L: {pnl:.2f} ({trade['pnl_percent']:.2f}%)")
+                    logger.info(f"Closed {position['type']} position at {timestamp} - P&L: {pnl:.2f} ({pnl_percent:.2f}%)")
                     
                     # Reset position
                     position = None
             
             # Record results
-            results.append({
-                'timestamp': timestamp,
-                'close': current_row['close'],
-                'capital': capital,
-                'position': position['type'] if position else None
-            })
-        
-        # Convert results to DataFrame
-        results_df = pd.DataFrame(results)
-        results_df.set_index('timestamp', inplace=True)
+            equity[i] = capital
+            recorded[i] = True
+            if position:
+                sides[i] = SignalCore.BUY if position['type'] == 'BUY' else SignalCore.SELL
+        
+        # Build the results DataFrame from the recorded bars
+        results_df = pd.DataFrame({
+            'close': closes[recorded],
+            'capital': equity[recorded],
+            'position': TradeLog.position_labels(sides[recorded])
+        }, index=timestamps[recorded].rename('timestamp'))
         
         # Calculate performance metrics
         performance_metrics = self._calculate_performance_metrics(trades, initial_capital)
@@ -256,88 +236,13 @@ class SyntheticTester:
         Calculate performance metrics from test results.
         
         Args:
-            trades (list): List of trade dictionaries
+            trades (TradeLog): Trade log
             initial_capital (float): Initial capital
             
         Returns:
             dict: Performance metrics
         """
-        if not trades:
-            return {
-                'total_trades': 0,
-                'win_rate': 0,
-                'avg_profit': 0,
-                'avg_loss': 0,
-                'profit_factor': 0,
-                'max_drawdown': 0,
-                'sharpe_ratio': 0,
-                'total_return': 0,
-                'annualized_return': 0
-            }
-        
-        # Calculate basic metrics
-        total_trades = len(trades)
-        winning_trades = [t for t in trades if t['pnl'] > 0]
-        losing_trades = [t for t in trades if t['pnl'] <= 0]
-        
-        win_rate = len(winning_trades) / total_trades if total_trades > 0 else 0
-        
-        avg_profit = np.mean([t['pnl'] for t in winning_trades]) if winning_trades else 0
-        avg_loss = np.mean([t['pnl'] for t in losing_trades]) if losing_trades else 0
-        
-        total_profit = sum([t['pnl'] for t in winning_trades]) if winning_trades else 0
-        total_loss = sum([t['pnl'] for t in losing_trades]) if losing_trades else 0
-        
-        profit_factor = abs(total_profit / total_loss) if total_loss != 0 else float('inf')
-        
-        # Calculate equity curve
-        equity_curve = [initial_capital]
-        for trade in trades:
-            equity_curve.append(equity_curve[-1] + trade['pnl'])
-        
-        # Calculate drawdown
-        max_equity = initial_capital
-        drawdowns = []
-        
-        for equity in equity_curve:
-            if equity > max_equity:
-                max_equity = equity
-            drawdown = (max_equity - equity) / max_equity
-            drawdowns.append(drawdown)
-        
-        max_drawdown = max(drawdowns) if drawdowns else 0
-        
-        # Calculate returns
-        total_return = (equity_curve[-1] - initial_capital) / initial_capital
-        
-        # Calculate Sharpe ratio (simplified)
-        returns = np.diff(equity_curve) / np.array(equity_curve[:-1])
-        sharpe_ratio = np.mean(returns) / np.std(returns) * np.sqrt(252) if len(returns) > 0 and np.std(returns) > 0 else 0
-        
-        # Calculate annualized return (assuming 252 trading days)
-        if trades:
-            first_trade_date = trades[0]['entry_time']
-            last_trade_date = trades[-1]['exit_time']
-            trading_days = (last_trade_date - first_trade_date).days / 365 * 252
-            
-            if trading_days > 0:
-                annualized_return = (1 + total_return) ** (252 / trading_days) - 1
-            else:
-                annualized_return = 0
-        else:
-            annualized_return = 0
-        
-        return {
-            'total_trades': total_trades,
-            'win_rate': win_rate,
-            'avg_profit': avg_profit,
-            'avg_loss': avg_loss,
-            'profit_factor': profit_factor,
-            'max_drawdown': max_drawdown,
-            'sharpe_ratio': sharpe_ratio,
-            'total_return': total_return,
-            'annualized_return': annualized_return
-        }
+        return PerformanceMetrics.from_trades(trades, initial_capital)
     
     def plot_results(self, results_df, trades, performance_metrics):
         """
@@ -345,12 +250,14 @@ class SyntheticTester:
         
         Args:
             results_df (pandas.DataFrame): DataFrame with test results
-            trades (list): List of trade dictionaries
+            trades (TradeLog): Trade log
             performance_metrics (dict): Performance metrics
             
         Returns:
             str: Path to saved plot file
         """
+        import matplotlib.pyplot as plt
+        
         # Create figure
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10), gridspec_kw={'height_ratios': [3, 1]})
         
@@ -358,13 +265,11 @@ class SyntheticTester:
         ax1.plot(results_df.index, results_df['close'], label='BTC/USDT', color='black', alpha=0.7)
         
         # Plot buy and sell signals
-        for trade in trades:
-            if trade['type'] == 'BUY':
-                ax1.scatter(trade['entry_time'], trade['entry_price'], marker='^', color='green', s=100)
-                ax1.scatter(trade['exit_time'], trade['exit_price'], marker='o', color='blue', s=50)
-            else:  # SELL
-                ax1.scatter(trade['entry_time'], trade['entry_price'], marker='v', color='red', s=100)
-                ax1.scatter(trade['exit_time'], trade['exit_price'], marker='o', color='blue', s=50)
+        columns = trades.arrays()
+        buys = columns['type'] == 'BUY'
+        ax1.scatter(columns['entry_time'][buys], columns['entry_price'][buys], marker='^', color='green', s=100)
+        ax1.scatter(columns['entry_time'][~buys], columns['entry_price'][~buys], marker='v', color='red', s=100)
+        ax1.scatter(columns['exit_time'], columns['exit_price'], marker='o', color='blue', s=50)
         
         # Plot equity curve
         ax2.plot(results_df.index, results_df['capital'], label='Capital', color='blue')
@@ -400,6 +305,29 @@ class SyntheticTester:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f"{self.results_dir}/test_results_{timestamp}.png"
         plt.savefig(filename)
+        plt.close(fig)
+        
+        logger.info(f"Saved test plot to {filename}")
+        
+        return filename
+    
+    def save_results(self, results_df, trades, performance_metrics):
+        """
+        Save test results: per-bar equity and the trade log to a compressed NumPy
+        archive, and the performance metrics to JSON.
+        
+        Args:
+            results_df (pandas.DataFrame): DataFrame with test results
+            trades (TradeLog): Trade log
+            performance_metrics (dict): Performance metrics
+            
+        Returns:
+            str: Path to saved results archive
+        """
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = BacktestResults.save(
+            f"{self.results_dir}/test_results_{timestamp}.npz", results_df, trades, performance_metrics
+        )
         
         # Save metrics to file
         metrics_file = f"{self.results_dir}/test_metrics_{timestamp}.json"
@@ -415,119 +343,24 @@ class SyntheticTester:
         Analyze the distribution of signals throughout the day.
         
         Args:
-            trades (list): List of trade dictionaries
+            trades (TradeLog): Trade log
             
         Returns:
             dict: Signal distribution analysis
         """
-        if not trades:
-            return {
-                'signals_per_day': 0,
-                'hour_distribution': {},
-                'day_distribution': {},
-                'strength_distribution': {}
-            }
-        
-        # Extract timestamps and signal strengths
-        timestamps = [trade['entry_time'] for trade in trades]
-        strengths = [trade['strength'] for trade in trades]
-        
-        # Count signals per day
-        days = set([ts.date() for ts in timestamps])
-        signals_per_day = len(timestamps) / len(days) if days else 0
-        
-        # Count signals per hour
-        hour_distribution = {}
-        for ts in timestamps:
-            hour = ts.hour
-            hour_distribution[hour] = hour_distribution.get(hour, 0) + 1
-        
-        # Count signals per day of week
-        day_distribution = {}
-        for ts in timestamps:
-            day = ts.strftime('%A')  # Day name
-            day_distribution[day] = day_distribution.get(day, 0) + 1
-        
-        # Count signals by strength
-        strength_distribution = {}
-        for strength in strengths:
-            strength_distribution[strength] = strength_distribution.get(strength, 0) + 1
-        
-        return {
-            'signals_per_day': signals_per_day,
-            'hour_distribution': hour_distribution,
-            'day_distribution': day_distribution,
-            'strength_distribution': strength_distribution
-        }
+        return TradeAnalytics.signal_distribution(trades)
     
     def analyze_performance_by_time(self, trades):
         """
         Analyze performance by time of day.
         
         Args:
-            trades (list): List of trade dictionaries
+            trades (TradeLog): Trade log
             
         Returns:
             dict: Performance by time analysis
         """
-        if not trades:
-            return {
-                'hour_performance': {},
-                'day_performance': {}
-            }
-        
-        # Initialize performance by hour
-        hour_performance = {}
-        for hour in range(24):
-            hour_performance[hour] = {
-                'count': 0,
-                'win_count': 0,
-                'win_rate': 0,
-                'avg_pnl': 0
-            }
-        
-        # Initialize performance by day
-        days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        day_performance = {}
-        for day in days:
-            day_performance[day] = {
-                'count': 0,
-                'win_count': 0,
-                'win_rate': 0,
-                'avg_pnl': 0
-            }
-        
-        # Analyze trades
-        for trade in trades:
-            # Hour analysis
-            hour = trade['entry_time'].hour
-            hour_performance[hour]['count'] += 1
-            if trade['pnl'] > 0:
-                hour_performance[hour]['win_count'] += 1
-            hour_performance[hour]['avg_pnl'] += trade['pnl']
-            
-            # Day analysis
-            day = trade['entry_time'].strftime('%A')
-            day_performance[day]['count'] += 1
-            if trade['pnl'] > 0:
-                day_performance[day]['win_count'] += 1
-            day_performance[day]['avg_pnl'] += trade['pnl']
-        
-        # Calculate averages and win rates
-        for hour, perf in hour_performance.items():
-            if perf['count'] > 0:
-                perf['win_rate'] = perf['win_count'] / perf['count']
-                perf['avg_pnl'] = perf['avg_pnl'] / perf['count']
-        
-        for day, perf in day_performance.items():
-            if perf['count'] > 0:
-                perf['win_rate'] = perf['win_count'] / perf['count']
-                perf['avg_pnl'] = perf['avg_pnl'] / perf['count']
-        
-        return {
-            'hour_performance': hour_performance,
-            'day_performance': day_performance
-        }
+        return TradeAnalytics.performance_by_time(trades)
     
     def generate_test_report(self, performance_metrics, signal_distribution, time_performance):
         """
@@ -622,6 +455,8 @@ class SyntheticTester:
         return filename
 
 if __name__ == "__main__":
+    setup_logging("test_synthetic.log")
+    
     # Example usage
     tester = SyntheticTester()
     
@@ -631,8 +466,10 @@ if __name__ == "__main__":
     # Run backtest
     results, trades, metrics = tester.run_backtest(data)
     
-    # Plot results
-    plot_file = tester.plot_results(results, trades, metrics)
+    # Save results; plotting is an optional separate step
+    results_file = tester.save_results(results, trades, metrics)
+    if '--plot' in sys.argv:
+        tester.plot_results(results, trades, metrics)
     
     # Analyze signal distribution
     signal_distribution = tester.analyze_signal_distribution(trades)
@@ -643,7 +480,7 @@ if __name__ == "__main__":
     # Generate test report
     report_file = tester.generate_test_report(metrics, signal_distribution, time_performance)
     
-    print(f"Test completed. Results saved to {plot_file}")
+    print(f"Test completed. Results saved to {results_file}")
     print(f"Test report generated: {report_file}")
     print("\nPerformance Metrics:")
     for key, value in metrics.items():
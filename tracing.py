@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Latency Tracing Module
+----------------------
+This module provides lightweight tracing spans for the live signal pipeline. Each
+named stage keeps a rolling window of recent durations from which p50/p95/p99
+latencies and histogram buckets are computed, and the summary can be exported to
+a local JSON metrics file. Tracing is disabled by default; a disabled span is a
+shared no-op context manager.
+"""
+
+import os
+import json
+import bisect
+import functools
+import itertools
+import threading
+from time import perf_counter
+from datetime import datetime
+import numpy as np
+import logging
+
+logger = logging.getLogger("Tracing")
+
+
+class _NullSpan:
+    """
+    No-op span returned while tracing is disabled.
+    """
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """
+    Times one execution of a stage and records it on exit, also when the stage raises.
+    """
+    
+    __slots__ = ('tracker', 'name', 'start')
+    
+    def __init__(self, tracker, name):
+        self.tracker = tracker
+        self.name = name
+    
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.tracker.record(self.name, perf_counter() - self.start)
+        return False
+
+
+class LatencyHistogram:
+    """
+    Rolling window of stage durations plus lifetime count, total and bucket counts.
+    """
+    
+    def __init__(self, window=1000, buckets_ms=()):
+        """
+        Initialize an empty histogram.
+        
+        Args:
+            window (int): Number of recent durations kept for percentiles (default: 1000)
+            buckets_ms (tuple): Upper bucket bounds in milliseconds (default: none)
+        """
+        self.durations = np.zeros(window)
+        self.buckets_ms = tuple(buckets_ms)
+        self.bucket_counts = [0] * len(self.buckets_ms)
+        self.count = 0
+        self.total = 0.0
+    
+    def add(self, seconds):
+        """
+        Add one duration, overwriting the oldest once the window is full.
+        
+        Args:
+            seconds (float): Duration in seconds
+        """
+        self.durations[self.count % len(self.durations)] = seconds
+        self.count += 1
+        self.total += seconds
+    
+        bucket = bisect.bisect_left(self.buckets_ms, seconds * 1000)
+        if bucket < len(self.bucket_counts):
+            self.bucket_counts[bucket] += 1
+    
+    def snapshot(self):
+        """
+        Summarize the histogram.
+            
+        Returns:
+            dict: Lifetime count and total, window mean/p50/p95/p99/max in milliseconds,
+                and lifetime cumulative bucket counts
+        """
+        window_ms = self.durations[:min(self.count, len(self.durations))] * 1000
+        p50, p95, p99 = np.percentile(window_ms, [50, 95, 99])
+        cumulative = itertools.accumulate(self.bucket_counts)
+        
+        return {
+            'count': self.count,
+            'total_s': self.total,
+            'window': len(window_ms),
+            'mean_ms': float(window_ms.mean()),
+            'p50_ms': float(p50),
+            'p95_ms': float(p95),
+            'p99_ms': float(p99),
+            'max_ms': float(window_ms.max()),
+            'buckets': {f"le_{bound:g}ms": n for bound, n in zip(self.buckets_ms, cumulative)}
+        }
+
+
+class LatencyTracker:
+    """
+    Collects span durations per stage and exports their rolling summaries.
+    """
+    
+    # Upper bounds of the latency histogram buckets in milliseconds
+    BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+    
+    def __init__(self, enabled=False, window=1000, export_path=None, export_interval=60):
+        """
+        Initialize the tracker.
+        
+        Args:
+            enabled (bool): Record spans (default: False)
+            window (int): Recent durations kept per stage (default: 1000)
+            export_path (str, optional): JSON file that summaries are exported to
+            export_interval (float): Minimum seconds between automatic exports (default: 60)
+        """
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._last_export = None
+        self.configure(enabled, window, export_path, export_interval)
+    
+    def configure(self, enabled=True, window=1000, export_path=None, export_interval=60):
+        """
+        Change the tracker settings; recorded durations are kept unless the window changes.
+        
+        Args:
+            enabled (bool): Record spans (default: True)
+            window (int): Recent durations kept per stage (default: 1000)
+            export_path (str, optional): JSON file that summaries are exported to
+            export_interval (float): Minimum seconds between automatic exports (default: 60)
+        """
+        with self._lock:
+            if getattr(self, 'window', window) != window:
+                self._histograms = {}
+            self.enabled = enabled
+            self.window = window
+            self.export_path = export_path
+            self.export_interval = export_interval
+    
+    def span(self, name):
+        """
+        Context manager timing one execution of a stage.
+        
+        Args:
+            name (str): Stage name
+            
+        Returns:
+            Context manager; a shared no-op while tracing is disabled
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+    
+    def record(self, name, seconds):
+        """
+        Record a stage duration and export when the export interval has passed.
+        
+        Args:
+            name (str): Stage name
+            seconds (float): Duration in seconds
+        """
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram(self.window, self.BUCKETS_MS)
+            histogram.add(seconds)
+            
+            due = self.export_path is not None and (
+                self._last_export is None or perf_counter() - self._last_export >= self.export_interval
+            )
+            if due:
+                self._last_export = perf_counter()
+        
+        if due:
+            self.export()
+    
+    def summary(self):
+        """
+        Rolling latency summary per stage.
+        
+        Returns:
+            dict: Stage name to the output of LatencyHistogram.snapshot
+        """
+        with self._lock:
+            return {name: histogram.snapshot() for name, histogram in sorted(self._histograms.items())}
+    
+    def export(self, path=None):
+        """
+        Write the summary to a JSON file, replacing it atomically.
+        
+        Args:
+            path (str, optional): Output file (default: export_path)
+            
+        Returns:
+            str: Path to the JSON file, or None without a path
+        """
+        path = path or self.export_path
+        if path is None:
+            return None
+        
+        report = {'updated': datetime.now().isoformat(), 'stages': self.summary()}
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{path}.tmp"
+        try:
+            with open(temporary, 'w') as f:
+                json.dump(report, f, indent=2)
+            os.replace(temporary, path)
+        except OSError as e:
+            logger.error(f"Error exporting latency metrics to {path}: {e}")
+            return None
+        
+        return path
+    
+    def reset(self):
+        """
+        Drop all recorded durations.
+        """
+        with self._lock:
+            self._histograms = {}
+
+# Process-wide tracker used by the pipeline modules
+_tracker = LatencyTracker()
+
+def get_tracker():
+    """
+    Get the process-wide latency tracker.
+    
+    Returns:
+        LatencyTracker: Shared tracker
+    """
+    return _tracker
+
+def span(name):
+    """
+    Time a stage on the process-wide tracker.
+    
+    Args:
+        name (str): Stage name
+        
+    Returns:
+        Context manager; a shared no-op while tracing is disabled
+    """
+    return _tracker.span(name) if _tracker.enabled else _NULL_SPAN
+
+def traced(name):
+    """
+    Decorator timing every call of a function as a stage on the process-wide tracker.
+    
+    Args:
+        name (str): Stage name
+        
+    Returns:
+        callable: Decorator
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _tracker.enabled:
+                return function(*args, **kwargs)
+            with _Span(_tracker, name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Trade Analytics Module
+----------------------
+This module breaks backtest trades down by time of day, day of week and signal
+strength. Trades are reduced to arrays once, and every grouping is a single
+np.bincount over an integer key, so large trade sets from optimization runs are
+analyzed and sliced without Python loops over trades.
+"""
+
+import numpy as np
+import pandas as pd
+from trade_log import TradeLog
+
+
+class TradeAnalytics:
+    """
+    Vectorized time and strength analytics over trade arrays.
+    """
+    
+    DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    
+    @staticmethod
+    def columns(trades):
+        """
+        Reduce trades to the arrays used by the analytics.
+        
+        Args:
+            trades (TradeLog, pandas.DataFrame, list or dict): Trade log, trades DataFrame,
+                trade dictionaries, or the output of columns (returned as is)
+                
+        Returns:
+            dict: 'pnl', 'strength', 'hour', 'weekday' (0 = Monday) and 'day' (days since epoch) arrays
+        """
+        if isinstance(trades, dict):
+            return trades
+        
+        if isinstance(trades, TradeLog):
+            entry_times, pnl, strength = trades.column('entry_time'), trades.column('pnl'), trades.column('strength')
+        elif isinstance(trades, pd.DataFrame):
+            entry_times, pnl, strength = trades['entry_time'], trades['pnl'], trades['strength']
+        else:
+            entry_times = [t['entry_time'] for t in trades]
+            pnl = [t['pnl'] for t in trades]
+            strength = [t['strength'] for t in trades]
+        
+        # DatetimeIndex keeps the local wall-clock time of timezone-aware entries
+        entry_times = pd.DatetimeIndex(entry_times)
+        days = entry_times.normalize()
+        if days.tz is not None:
+            days = days.tz_localize(None)
+        
+        return {
+            'pnl': np.asarray(pnl, dtype=float),
+            'strength': np.asarray(strength, dtype=str),
+            'hour': entry_times.hour.to_numpy(dtype=np.int64),
+            'weekday': entry_times.dayofweek.to_numpy(dtype=np.int64),
+            'day': days.values.astype('datetime64[D]').astype(np.int64)
+        }
+    
+    @staticmethod
+    def subset(columns, mask):
+        """
+        Select trades from analytics arrays.
+        
+        Args:
+            columns (dict): Output of columns
+            mask (numpy.ndarray): Boolean mask or indices of the trades to keep
+            
+        Returns:
+            dict: Analytics arrays of the selected trades
+        """
+        return {key: values[mask] for key, values in columns.items()}
+    
+    @staticmethod
+    def _grouped(keys, pnl, size):
+        """
+        Trade count, win count and total P&L per integer key.
+        """
+        counts = np.bincount(keys, minlength=size)
+        wins = np.bincount(keys, weights=pnl > 0, minlength=size)
+        totals = np.bincount(keys, weights=pnl, minlength=size)
+        return counts, wins, totals
+    
+    @staticmethod
+    def _rates(counts, wins, totals):
+        """
+        Win rate and average P&L per group (0 for empty groups).
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            win_rate = np.where(counts > 0, wins / counts, 0.0)
+            avg_pnl = np.where(counts > 0, totals / counts, 0.0)
+        return win_rate, avg_pnl
+    
+    @staticmethod
+    def heatmaps(trades):
+        """
+        Day-of-week by hour-of-day trade statistics.
+        
+        Args:
+            trades: Trades in any form accepted by columns
+            
+        Returns:
+            dict: 'count', 'win_rate', 'avg_pnl' and 'total_pnl' DataFrames (days x hours)
+        """
+        columns = TradeAnalytics.columns(trades)
+        keys = columns['weekday'] * 24 + columns['hour']
+        counts, wins, totals = TradeAnalytics._grouped(keys, columns['pnl'], 7 * 24)
+        win_rate, avg_pnl = TradeAnalytics._rates(counts, wins, totals)
+        
+        def frame(values):
+            return pd.DataFrame(values.reshape(7, 24), index=TradeAnalytics.DAYS, columns=range(24))
+        
+        return {
+            'count': frame(counts),
+            'win_rate': frame(win_rate),
+            'avg_pnl': frame(avg_pnl),
+            'total_pnl': frame(totals)
+        }
+    
+    @staticmethod
+    def strength_breakdown(trades):
+        """
+        Trade statistics per signal strength.
+        
+        Args:
+            trades: Trades in any form accepted by columns
+            
+        Returns:
+            pandas.DataFrame: 'count', 'win_rate', 'avg_pnl' and 'total_pnl' per strength
+        """
+        columns = TradeAnalytics.columns(trades)
+        labels, keys = np.unique(columns['strength'], return_inverse=True)
+        counts, wins, totals = TradeAnalytics._grouped(keys.ravel(), columns['pnl'], len(labels))
+        win_rate, avg_pnl = TradeAnalytics._rates(counts, wins, totals)
+        
+        return pd.DataFrame({
+            'count': counts,
+            'win_rate': win_rate,
+            'avg_pnl': avg_pnl,
+            'total_pnl': totals
+        }, index=pd.Index(labels, name='strength'))
+    
+    @staticmethod
+    def signal_distribution(trades):
+        """
+        Distribution of signals over hours, days of the week and strengths.
+        
+        Args:
+            trades: Trades in any form accepted by columns
+            
+        Returns:
+            dict: 'signals_per_day', 'hour_distribution', 'day_distribution' and
+                'strength_distribution' (only groups with signals)
+        """
+        columns = TradeAnalytics.columns(trades)
+        if len(columns['pnl']) == 0:
+            return {
+                'signals_per_day': 0,
+                'hour_distribution': {},
+                'day_distribution': {},
+                'strength_distribution': {}
+            }
+        
+        hour_counts = np.bincount(columns['hour'], minlength=24)
+        day_counts = np.bincount(columns['weekday'], minlength=7)
+        labels, strength_counts = np.unique(columns['strength'], return_counts=True)
+        
+        return {
+            'signals_per_day': len(columns['pnl']) / len(np.unique(columns['day'])),
+            'hour_distribution': {hour: int(count) for hour, count in enumerate(hour_counts) if count},
+            'day_distribution': {TradeAnalytics.DAYS[day]: int(count) for day, count in enumerate(day_counts) if count},
+            'strength_distribution': {str(label): int(count) for label, count in zip(labels, strength_counts)}
+        }
+    
+    @staticmethod
+    def performance_by_time(trades):
+        """
+        Trade count, win rate and average P&L per hour of day and per day of week.
+        
+        Args:
+            trades: Trades in any form accepted by columns
+            
+        Returns:
+            dict: 'hour_performance' (all 24 hours) and 'day_performance' (all 7 days)
+        """
+        columns = TradeAnalytics.columns(trades)
+        if len(columns['pnl']) == 0:
+            return {
+                'hour_performance': {},
+                'day_performance': {}
+            }
+        
+        # One bincount over the hour x weekday cells; hours and days are its marginals
+        keys = columns['weekday'] * 24 + columns['hour']
+        cells = [values.reshape(7, 24) for values in TradeAnalytics._grouped(keys, columns['pnl'], 7 * 24)]
+        
+        def table(labels, counts, wins, totals):
+            win_rate, avg_pnl = TradeAnalytics._rates(counts, wins, totals)
+            return {
+                label: {
+                    'count': int(counts[k]),
+                    'win_count': int(wins[k]),
+                    'win_rate': float(win_rate[k]),
+                    'avg_pnl': float(avg_pnl[k])
+                }
+                for k, label in enumerate(labels)
+            }
+        
+        return {
+            'hour_performance': table(range(24), *(values.sum(axis=0) for values in cells)),
+            'day_performance': table(TradeAnalytics.DAYS, *(values.sum(axis=1) for values in cells))
+        }
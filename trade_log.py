@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Trade Log Module
+----------------
+This module stores backtest trades as preallocated columns instead of a list of
+dictionaries, and saves backtest results (per-bar equity, trades and metrics) to a
+compressed NumPy archive.
+"""
+
+import json
+import numpy as np
+import pandas as pd
+
+
+class TradeLog:
+    """
+    Columnar, growable trade log.
+    
+    Iterating or indexing yields trade dictionaries, so code written against the
+    old list-of-dicts trades keeps working.
+    """
+    
+    # Column name to dtype; times are stored as datetime64[ns]
+    COLUMNS = {
+        'type': 'U4',
+        'entry_time': 'datetime64[ns]',
+        'entry_price': float,
+        'exit_time': 'datetime64[ns]',
+        'exit_price': float,
+        'size': float,
+        'pnl': float,
+        'pnl_percent': float,
+        'strength': 'U16'
+    }
+    
+    # Per-bar position labels indexed by side code (0 flat, 1 BUY, -1 SELL)
+    POSITION_LABELS = np.array([None, 'BUY', 'SELL'], dtype=object)
+    
+    def __init__(self, capacity=256, extra_columns=None):
+        """
+        Initialize an empty trade log.
+        
+        Args:
+            capacity (int): Initially allocated rows, doubled when full (default: 256)
+            extra_columns (dict, optional): Additional column name to dtype
+        """
+        self.columns = dict(self.COLUMNS)
+        if extra_columns:
+            self.columns.update(extra_columns)
+        
+        self._size = 0
+        self._data = {name: np.empty(max(capacity, 1), dtype=dtype) for name, dtype in self.columns.items()}
+    
+    def __len__(self):
+        return self._size
+    
+    def _grow(self):
+        """
+        Double the allocated rows.
+        """
+        for name, values in self._data.items():
+            grown = np.empty(len(values) * 2, dtype=values.dtype)
+            grown[:self._size] = values[:self._size]
+            self._data[name] = grown
+    
+    def append(self, **trade):
+        """
+        Append one trade.
+        
+        Args:
+            **trade: Value for every column
+        """
+        if self._size == len(self._data['pnl']):
+            self._grow()
+        
+        row = self._size
+        for name in self.columns:
+            self._data[name][row] = trade[name]
+        self._size += 1
+    
+    @staticmethod
+    def position_labels(sides):
+        """
+        Convert per-bar side codes to position labels.
+        
+        Args:
+            sides (numpy.ndarray): 1 for BUY, -1 for SELL, 0 for no position
+            
+        Returns:
+            numpy.ndarray: 'BUY', 'SELL' or None per bar
+        """
+        return TradeLog.POSITION_LABELS[sides]
+    
+    def column(self, name):
+        """
+        Get one column as an array view.
+        
+        Args:
+            name (str): Column name
+            
+        Returns:
+            numpy.ndarray: Column values for the logged trades
+        """
+        return self._data[name][:self._size]
+    
+    def arrays(self):
+        """
+        Get all columns as array views.
+        
+        Returns:
+            dict: Column name to numpy array
+        """
+        return {name: self.column(name) for name in self.columns}
+    
+    def _row(self, row):
+        trade = {}
+        for name in self.columns:
+            value = self._data[name][row]
+            if np.issubdtype(self._data[name].dtype, np.datetime64):
+                value = pd.Timestamp(value)
+            elif isinstance(value, np.generic):
+                value = value.item()
+            trade[name] = value
+        return trade
+    
+    def __getitem__(self, row):
+        if row < 0:
+            row += self._size
+        if not 0 <= row < self._size:
+            raise IndexError("trade index out of range")
+        return self._row(row)
+    
+    def __iter__(self):
+        for row in range(self._size):
+            yield self._row(row)
+    
+    def to_dataframe(self):
+        """
+        Convert the trade log to a DataFrame.
+        
+        Returns:
+            pandas.DataFrame: One row per trade
+        """
+        return pd.DataFrame(self.arrays())
+    
+    @classmethod
+    def from_arrays(cls, arrays):
+        """
+        Build a trade log from column arrays.
+        
+        Args:
+            arrays (dict): Column name to array, as returned by arrays()
+            
+        Returns:
+            TradeLog: Trade log holding the given trades
+        """
+        extra = {name: values.dtype for name, values in arrays.items() if name not in cls.COLUMNS}
+        log = cls(capacity=len(arrays['pnl']), extra_columns=extra)
+        for name in log.columns:
+            log._data[name][:len(arrays[name])] = arrays[name]
+        log._size = len(arrays['pnl'])
+        return log
+
+
+class BacktestResults:
+    """
+    Binary storage of backtest results.
+    """
+    
+    @staticmethod
+    def save(filename, results_df, trades, performance_metrics):
+        """
+        Save per-bar results, trades and metrics to a compressed .npz archive.
+        
+        Args:
+            filename (str): Output path (.npz)
+            results_df (pandas.DataFrame): Per-bar results with 'close' and 'capital'
+            trades (TradeLog): Trade log
+            performance_metrics (dict): Performance metrics
+            
+        Returns:
+            str: Path to the archive
+        """
+        arrays = {
+            'bar_time': results_df.index.values.astype('datetime64[ns]'),
+            'bar_close': results_df['close'].to_numpy(dtype=float),
+            'bar_capital': results_df['capital'].to_numpy(dtype=float),
+            'metrics': np.array(json.dumps(performance_metrics, default=float))
+        }
+        arrays.update({f'trade_{name}': values for name, values in trades.arrays().items()})
+        
+        np.savez_compressed(filename, **arrays)
+        return filename
+    
+    @staticmethod
+    def load(filename):
+        """
+        Load results saved by save.
+        
+        Args:
+            filename (str): Path to the .npz archive
+            
+        Returns:
+            tuple: (results_df, trades, performance_metrics)
+        """
+        with np.load(filename) as archive:
+            results_df = pd.DataFrame({
+                'close': archive['bar_close'],
+                'capital': archive['bar_capital']
+            }, index=pd.DatetimeIndex(archive['bar_time'], name='timestamp'))
+            trades = TradeLog.from_arrays({
+                key[len('trade_'):]: archive[key] for key in archive.files if key.startswith('trade_')
+            })
+            performance_metrics = json.loads(str(archive['metrics']))
+        
+        return results_df, trades, performance_metrics
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Walk-Forward Optimization Module
+--------------------------------
+This module runs walk-forward optimization of the scalping strategy. The history is
+split into rolling train/test folds; each fold is grid-searched on its train window
+and the winning parameters are evaluated out-of-sample on the following test window.
+Folds run in parallel and share one set of precomputed indicator arrays.
+"""
+
+import os
+import json
+import argparse
+import pandas as pd
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import logging
+from scalping_backtester import ScalpingBacktester
+from replay import ReplayDataCollector
+from logging_setup import setup_logging
+
+logger = logging.getLogger("WalkForward")
+
+# Default grid around the live scalping parameters
+DEFAULT_PARAMETER_GRID = {
+    'take_profit': [0.005, 0.01],
+    'stop_loss': [0.003, 0.005],
+    'min_score': [4, 5],
+    'expiry_minutes': [3, 5]
+}
+
+# Per-process state for fold workers: the prepared arrays and a backtester
+_worker_state = {}
+
+def _init_worker(prepared, results_dir):
+    """
+    Initialize a fold worker with the shared prepared arrays.
+    """
+    _worker_state['prepared'] = prepared
+    _worker_state['backtester'] = ScalpingBacktester(results_dir=results_dir)
+
+def _run_fold(fold, parameter_grid, metric, min_trades, initial_capital):
+    """
+    Optimize one fold on its train window and evaluate it on its test window.
+    
+    Args:
+        fold (dict): Fold bar ranges from WalkForwardOptimizer.make_folds
+        parameter_grid (dict): Parameter name to list of values
+        metric (str): Performance metric to maximize
+        min_trades (int): Minimum train trades for a parameter set to be eligible
+        initial_capital (float): Initial capital per window
+        
+    Returns:
+        dict: One row of the per-fold results table
+    """
+    prepared = _worker_state['prepared']
+    backtester = _worker_state['backtester']
+    
+    best_params, train_metrics = backtester.run_parameter_optimization(
+        None, parameter_grid, metric=metric, min_trades=min_trades,
+        prepared=prepared, start=fold['train_start'], end=fold['train_end']
+    )
+    
+    index = prepared['index']
+    row = {
+        'fold': fold['fold'],
+        'train_start': index[fold['train_start']],
+        'train_end': index[fold['train_end'] - 1],
+        'test_start': index[fold['test_start']],
+        'test_end': index[fold['test_end'] - 1]
+    }
+    
+    if best_params is None:
+        logger.warning(f"Fold {fold['fold']}: no parameter set reached {min_trades} train trades")
+        return row
+    
+    original = backtester.get_parameters()
+    try:
+        test_trades, test_metrics = backtester.evaluate(
+            prepared, best_params, initial_capital=initial_capital,
+            start=fold['test_start'], end=fold['test_end']
+        )
+    finally:
+        backtester.set_parameters(**original)
+    
+    row.update(best_params)
+    row.update({
+        f'train_{metric}': train_metrics[metric],
+        'train_trades': train_metrics['total_trades'],
+        'test_trades': len(test_trades),
+        'test_win_rate': test_metrics['outcome_win_rate'],
+        'test_total_return': test_metrics['total_return'],
+        'test_sharpe_ratio': test_metrics['sharpe_ratio'],
+        'test_max_drawdown': test_metrics['max_drawdown'],
+        'test_profit_factor': test_metrics['profit_factor']
+    })
+    return row
+
+class WalkForwardOptimizer:
+    """
+    Rolling train/test walk-forward optimization of ScalpingBacktester parameters.
+    """
+    
+    def __init__(self, parameter_grid=None, train_days=30, test_days=7, step_days=None,
+                 metric='sharpe_ratio', min_trades=5, max_workers=None, initial_capital=10000.0,
+                 results_dir='backtest_results'):
+        """
+        Initialize the walk-forward optimizer.
+        
+        Args:
+            parameter_grid (dict, optional): Parameter name to list of values (default: DEFAULT_PARAMETER_GRID)
+            train_days (int): Length of each train window in days (default: 30)
+            test_days (int): Length of each test window in days (default: 7)
+            step_days (int, optional): Days between fold starts (default: test_days)
+            metric (str): Performance metric to maximize on the train window (default: 'sharpe_ratio')
+            min_trades (int): Minimum train trades for a parameter set to be eligible (default: 5)
+            max_workers (int, optional): Worker processes; 1 runs in-process (default: CPU count)
+            initial_capital (float): Initial capital per window (default: 10000.0)
+            results_dir (str): Directory for the results table (default: 'backtest_results')
+        """
+        self.parameter_grid = parameter_grid or DEFAULT_PARAMETER_GRID
+        self.train_days = train_days
+        self.test_days = test_days
+        self.step_days = step_days or test_days
+        self.metric = metric
+        self.min_trades = min_trades
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.initial_capital = initial_capital
+        self.results_dir = results_dir
+        
+        os.makedirs(results_dir, exist_ok=True)
+    
+    def make_folds(self, index):
+        """
+        Split a timestamp index into rolling train/test folds.
+        
+        Args:
+            index (pandas.DatetimeIndex): Sorted bar timestamps
+            
+        Returns:
+            list: Dicts with 'fold' and train/test start/end bar positions (end exclusive)
+        """
+        folds = []
+        if len(index) == 0:
+            return folds
+        
+        train = pd.Timedelta(days=self.train_days)
+        test = pd.Timedelta(days=self.test_days)
+        step = pd.Timedelta(days=self.step_days)
+        
+        train_from = index[0]
+        while train_from + train + test <= index[-1] + pd.Timedelta(minutes=1):
+            test_from = train_from + train
+            bounds = index.searchsorted([train_from, test_from, test_from + test])
+            if bounds[1] > bounds[0] and bounds[2] > bounds[1]:
+                folds.append({
+                    'fold': len(folds) + 1,
+                    'train_start': int(bounds[0]),
+                    'train_end': int(bounds[1]),
+                    'test_start': int(bounds[1]),
+                    'test_end': int(bounds[2])
+                })
+            train_from += step
+        
+        return folds
+    
+    def run(self, data):
+        """
+        Run walk-forward optimization over a price history.
+        
+        Args:
+            data (pandas.DataFrame): DataFrame with historical 1-minute price data
+            
+        Returns:
+            pandas.DataFrame: Per-fold results table
+        """
+        backtester = ScalpingBacktester(results_dir=self.results_dir)
+        prepared = backtester.prepare(data)
+        folds = self.make_folds(prepared['index'])
+        
+        combinations = len(backtester._parameter_combinations(self.parameter_grid))
+        logger.info(f"Walk-forward: {len(folds)} folds x {combinations} parameter sets on {self.max_workers} worker(s)")
+        
+        if not folds:
+            logger.warning("Not enough data for a single train/test fold")
+            return pd.DataFrame()
+        
+        args = (self.parameter_grid, self.metric, self.min_trades, self.initial_capital)
+        if self.max_workers == 1:
+            _init_worker(prepared, self.results_dir)
+            rows = [_run_fold(fold, *args) for fold in folds]
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(folds)),
+                                     initializer=_init_worker,
+                                     initargs=(prepared, self.results_dir)) as executor:
+                futures = [executor.submit(_run_fold, fold, *args) for fold in folds]
+                rows = [future.result() for future in futures]
+        
+        table = pd.DataFrame(rows).set_index('fold')
+        
+        if 'test_trades' in table:
+            logger.info(
+                f"Out-of-sample: {int(table['test_trades'].sum())} trades, "
+                f"mean return {table['test_total_return'].mean():.2%}, "
+                f"mean win rate {table['test_win_rate'].mean():.2%}"
+            )
+        
+        return table
+    
+    def save_results(self, table):
+        """
+        Save the per-fold results table as CSV.
+        
+        Args:
+            table (pandas.DataFrame): Output of run
+            
+        Returns:
+            str: Path to the CSV file
+        """
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f"{self.results_dir}/walk_forward_{timestamp}.csv"
+        table.to_csv(filename, float_format='%.6g')
+        
+        logger.info(f"Saved walk-forward results to {filename}")
+        return filename
+
+def main():
+    """
+    Command-line entry point for walk-forward optimization.
+    """
+    setup_logging("walk_forward.log")
+    
+    parser = argparse.ArgumentParser(description='Walk-forward optimization of the scalping strategy')
+    parser.add_argument('--data', default='data', help='CSV file or candle store directory (default: data)')
+    parser.add_argument('--grid', help='JSON file with a parameter grid (default: built-in grid)')
+    parser.add_argument('--train-days', type=int, default=30, help='Train window in days (default: 30)')
+    parser.add_argument('--test-days', type=int, default=7, help='Test window in days (default: 7)')
+    parser.add_argument('--step-days', type=int, help='Days between folds (default: test window)')
+    parser.add_argument('--metric', default='sharpe_ratio', help='Metric to maximize (default: sharpe_ratio)')
+    parser.add_argument('--min-trades', type=int, default=5, help='Minimum train trades per parameter set (default: 5)')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: CPU count)')
+    args = parser.parse_args()
+    
+    parameter_grid = None
+    if args.grid:
+        with open(args.grid) as f:
+            parameter_grid = json.load(f)
+    
+    optimizer = WalkForwardOptimizer(
+        parameter_grid=parameter_grid,
+        train_days=args.train_days,
+        test_days=args.test_days,
+        step_days=args.step_days,
+        metric=args.metric,
+        min_trades=args.min_trades,
+        max_workers=args.workers
+    )
+    
+    data = ReplayDataCollector.load_candles(args.data)
+    table = optimizer.run(data)
+    
+    if not table.empty:
+        print(table.to_string())
+        optimizer.save_results(table)
+
+if __name__ == "__main__":
+    main()